@@ -0,0 +1,175 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+"""Archive URL formatting time
+
+Usage: python3 benchmarks/catchup.py [channels count] [programmes per channel]
+
+Formats archive URLs of every channel with compiled catchup templates
+and with str.replace() and re.findall() passes done before.
+"""
+import os
+import re
+import sys
+import time
+import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(os.path.dirname(__file__), "..", "usr", "lib", "yuki-iptv")))
+
+from yuki_iptv.catchup import (  # noqa: E402
+    get_catchup_template,
+    format_placeholders,
+)
+
+CATCHUP_SOURCES = (
+    ("default", "http://127.0.0.1/archive/{i}/{utc}-{duration}.m3u8?lutc={lutc}"),
+    ("default", "http://127.0.0.1/{i}/${start}/{Y}{m}{d}-{H}{M}{S}/{catchup-id}"),
+    ("append", "?start={utc:Y-m-d-H-M-S}&end={end:YmdHMS}&now={now:H-M}"),
+    ("default", "http://127.0.0.1/{i}/{offset:1}/{duration:60}/index.m3u8"),
+    ("shift", ""),
+    ("flussonic", ""),
+    ("xc", ""),
+)
+
+SIMPLE_PLACEHOLDERS = (
+    "utc",
+    "start",
+    "lutc",
+    "now",
+    "timestamp",
+    "utcend",
+    "end",
+    "Y",
+    "m",
+    "d",
+    "H",
+    "M",
+    "S",
+    "duration",
+    "catchup-id",
+)
+
+
+def format_placeholders_old(start_timestamp, end_timestamp, catchup_id, orig_url):
+    """Placeholders as they were formatted before"""
+    duration = int(end_timestamp - start_timestamp)
+    current_utc = int(time.time())
+    utcend = start_timestamp + duration
+    offset2 = int(current_utc - start_timestamp)
+    utc_time = (
+        datetime.datetime.fromtimestamp(start_timestamp)
+        .strftime("%Y-%m-%d-%H-%M-%S")
+        .split("-")
+    )
+    lutc_time = (
+        datetime.datetime.fromtimestamp(current_utc)
+        .strftime("%Y-%m-%d-%H-%M-%S")
+        .split("-")
+    )
+    utcend_time = (
+        datetime.datetime.fromtimestamp(utcend).strftime("%Y-%m-%d-%H-%M-%S").split("-")
+    )
+    values = [start_timestamp, start_timestamp] + [current_utc] * 3 + [utcend] * 2
+    values += utc_time + [duration, catchup_id]
+    for name, value in zip(SIMPLE_PLACEHOLDERS, values):
+        orig_url = orig_url.replace("${" + name + "}", str(value))
+        orig_url = orig_url.replace("{" + name + "}", str(value))
+    for name, value in (("duration", duration), ("offset", offset2)):
+        for placeholder in sorted(re.findall(r"\$?{" + name + r":\d+}", orig_url)):
+            divisor = int(placeholder.split(":")[1].split("}")[0])
+            orig_url = orig_url.replace(placeholder, str(int(value / divisor)))
+    specifiers_re = re.findall(
+        re.compile(
+            "((\\$?){(utc|start|lutc|now|timestamp|utcend|end):"
+            "([YmdHMS])(-?)([YmdHMS]?)(-?)([YmdHMS]?)(-?)"
+            "([YmdHMS]?)(-?)([YmdHMS]?)(-?)([YmdHMS]?)})"
+        ),
+        orig_url,
+    )
+    for specifier in specifiers_re:
+        spec_name = str(specifier[0].split("{")[1].split(":")[0])
+        spec_val = str(specifier[0].split(":")[1].split("}")[0])
+        if spec_name in ("utc", "start"):
+            spec_time = utc_time
+        elif spec_name in ("lutc", "now", "timestamp"):
+            spec_time = lutc_time
+        else:
+            spec_time = utcend_time
+        for char, field in zip("YmdHMS", spec_time):
+            spec_val = spec_val.replace(char, str(field))
+        orig_url = orig_url.replace(specifier[0], spec_val)
+    return orig_url
+
+
+def generate_channels(count):
+    channels = []
+    for i in range(count):
+        catchup, catchup_source = CATCHUP_SOURCES[i % len(CATCHUP_SOURCES)]
+        channels.append(
+            (
+                f"http://127.0.0.1:8080/live/user/password/{i}.m3u8",
+                catchup,
+                catchup_source.replace("{i}", str(i)),
+            )
+        )
+    return channels
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    programmes_count = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    channels = generate_channels(count)
+    time_now = int(time.time())
+    # Same current time for both passes, it is part of URLs
+    time.time = lambda: time_now
+    programmes = [
+        (time_now - 3600 * (i + 1), time_now - 3600 * i, f"id{i}")
+        for i in range(programmes_count)
+    ]
+    templates = [get_catchup_template(*channel) for channel in channels]
+
+    time_start = time.perf_counter()
+    urls_old = [
+        url_prefix + format_placeholders_old(start, stop, catchup_id, template)
+        for url_prefix, template in templates
+        for start, stop, catchup_id in programmes
+    ]
+    old_time = time.perf_counter() - time_start
+
+    time_start = time.perf_counter()
+    urls = [
+        url_prefix + format_placeholders(start, stop, catchup_id, template)
+        for url_prefix, template in templates
+        for start, stop, catchup_id in programmes
+    ]
+    new_time = time.perf_counter() - time_start
+
+    if urls != urls_old:
+        raise Exception("Compiled templates differ from old placeholders")
+    print(f"Channels: {count}, programmes per channel: {programmes_count}")
+    print(f"replace() passes: {old_time:.3f} s")
+    print(f"Compiled templates: {new_time:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
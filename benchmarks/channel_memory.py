@@ -0,0 +1,88 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+"""Playlist memory usage
+
+Usage: python3 benchmarks/channel_memory.py [channels count]
+
+Measures memory held by parsed channels with Channel records
+and with plain dicts used before.
+"""
+import gc
+import os
+import sys
+import gettext
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(str(Path(os.path.dirname(__file__), "..", "usr", "lib", "yuki-iptv")))
+
+import yuki_iptv.m3u  # noqa: E402
+from yuki_iptv.m3u import M3UParser  # noqa: E402
+from yuki_iptv.channel import Channel  # noqa: E402
+
+
+def generate_m3u(count):
+    m3u = ["#EXTM3U"]
+    for i in range(count):
+        m3u.append(
+            f'#EXTINF:-1 tvg-id="channel{i}" tvg-name="Channel {i}" '
+            f'tvg-logo="http://127.0.0.1/logos/{i}.png" '
+            f'group-title="Group {i % 50}" catchup="shift" catchup-days="7"'
+            f",Channel {i}"
+        )
+        m3u.append("#EXTVLCOPT:http-user-agent=Example/1.0")
+        m3u.append(f"http://127.0.0.1/live/{i}.m3u8")
+    return "\n".join(m3u)
+
+
+def measure(m3u):
+    """Bytes allocated by parsed channels"""
+    gc.collect()
+    tracemalloc.start()
+    channels = list(M3UParser("", gettext.gettext).iter_m3u(m3u))
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return channels, size
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    m3u = generate_m3u(count)
+
+    # Parser output as it was before Channel records
+    yuki_iptv.m3u.Channel = dict
+    dict_channels, dict_size = measure(m3u)
+    yuki_iptv.m3u.Channel = Channel
+    channels, size = measure(m3u)
+    if channels != dict_channels:
+        raise Exception("Channel records differ from dicts")
+
+    print(f"Channels: {count}")
+    print(f"dict: {round(dict_size / count)} bytes per channel")
+    print(f"Channel: {round(size / count)} bytes per channel")
+    print(f"Saved: {round((1 - size / dict_size) * 100)}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+"""M3U parser benchmark
+
+Usage: python3 benchmarks/m3u_parser.py [channels count]
+
+Compares current M3UParser with the previous implementation,
+which searched every EXTINF attribute with a separate regexp.
+"""
+import os
+import re
+import sys
+import time
+import gettext
+from pathlib import Path
+
+sys.path.append(str(Path(os.path.dirname(__file__), "..", "usr", "lib", "yuki-iptv")))
+
+from yuki_iptv.m3u import M3UParser  # noqa: E402
+
+
+class LegacyAttributes:
+    """Searches attribute only when it is requested"""
+
+    def __init__(self, parser, line_info):
+        self.parser = parser
+        self.line_info = line_info
+
+    def get(self, name, default):
+        return self.parser.parse_regexp(name, self.line_info, default)
+
+
+class LegacyM3UParser(M3UParser):
+    """Parser with one regexp search per attribute"""
+
+    def parse_attributes(self, line_info):
+        return LegacyAttributes(self, line_info)
+
+    def get_title(self, line_info):
+        title_regex = re.sub('\\="(.*?)"', "", line_info).split(",", 1)
+        if len(title_regex) < 2:
+            title = ""
+        else:
+            title = title_regex[1].strip()
+        return title
+
+
+def generate_m3u(count):
+    m3u = ['#EXTM3U x-tvg-url="http://127.0.0.1/epg.xml.gz"']
+    for i in range(count):
+        m3u.append(
+            f'#EXTINF:-1 tvg-id="channel{i}" tvg-name="Channel {i}" '
+            f'tvg-logo="http://127.0.0.1/logos/{i}.png" '
+            f'group-title="Group {i % 50}" catchup="shift" catchup-days="{i % 7}"'
+            f",Channel {i} HD"
+        )
+        if i % 10 == 0:
+            m3u.append("#EXTVLCOPT:http-user-agent=Example/1.0")
+        m3u.append(f"http://127.0.0.1/live/{i}.m3u8")
+    return "\n".join(m3u)
+
+
+def run(parser, m3u, repeat=3):
+    """Best time of several runs"""
+    best_time = None
+    for _ in range(repeat):
+        time_start = time.perf_counter()
+        channels = parser.parse_m3u(m3u)
+        run_time = time.perf_counter() - time_start
+        if best_time is None or run_time < best_time:
+            best_time = run_time
+    return channels, best_time
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 80000
+    m3u = generate_m3u(count)
+    legacy_channels, legacy_time = run(LegacyM3UParser("", gettext.gettext), m3u)
+    channels, current_time = run(M3UParser("", gettext.gettext), m3u)
+    if channels != legacy_channels:
+        raise Exception("Parser output differs from previous implementation")
+    print(f"Channels: {count}")
+    print(f"Before: {round(count / legacy_time)} channels/s")
+    print(f"After: {round(count / current_time)} channels/s")
+
+
+if __name__ == "__main__":
+    main()
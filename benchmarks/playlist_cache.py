@@ -0,0 +1,123 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+"""Playlist cache loading time
+
+Usage: python3 benchmarks/playlist_cache.py [channels count]
+
+Compares loading of binary playlist cache with
+playlistcache.json used before.
+"""
+import os
+import sys
+import json
+import time
+import gettext
+import tempfile
+from pathlib import Path
+
+sys.path.append(str(Path(os.path.dirname(__file__), "..", "usr", "lib", "yuki-iptv")))
+
+from yuki_iptv.m3u import M3UParser  # noqa: E402
+from yuki_iptv.channel import Channel  # noqa: E402
+from yuki_iptv.playlist_cache import (  # noqa: E402
+    load_playlist_cache,
+    save_playlist_cache,
+)
+
+
+def generate_m3u(count):
+    m3u = ["#EXTM3U"]
+    for i in range(count):
+        m3u.append(
+            f'#EXTINF:-1 tvg-id="channel{i}" tvg-name="Channel {i}" '
+            f'tvg-logo="http://127.0.0.1/logos/{i}.png" '
+            f'group-title="Group {i % 50}" catchup="shift" catchup-days="7"'
+            f",Channel {i}"
+        )
+        m3u.append(f"http://127.0.0.1/live/{i}.m3u8")
+    return "\n".join(m3u)
+
+
+def load_json_cache(cache_file):
+    """Loading as it was done before"""
+    with open(cache_file, "r", encoding="utf8") as cache_fd:
+        cm3u = json.loads(cache_fd.read())
+    return {
+        cached_name: Channel(cached_channel)
+        for cached_name, cached_channel in cm3u["array"].items()
+    }
+
+
+def best_time(func, *args):
+    times = []
+    for i in range(3):
+        time_start = time.perf_counter()
+        result = func(*args)
+        times.append(time.perf_counter() - time_start)
+    return result, min(times)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    m3u = generate_m3u(count)
+    array = {}
+    groups = []
+    for channel in M3UParser("", gettext.gettext).iter_m3u(m3u):
+        array[channel["title"]] = channel
+        if channel["tvg-group"] not in groups:
+            groups.append(channel["tvg-group"])
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        json_file = str(Path(tmp_dir, "playlistcache.json"))
+        with open(json_file, "w", encoding="utf8") as cache_fd:
+            cache_fd.write(
+                json.dumps(
+                    {
+                        "url": "http://127.0.0.1/1.m3u",
+                        "array": array,
+                        "groups": groups,
+                        "m3u": m3u,
+                        "epgurl": "",
+                        "movies": {},
+                    },
+                    default=dict,
+                )
+            )
+        cache_file = str(Path(tmp_dir, "playlist.cache"))
+        save_playlist_cache(
+            cache_file, "http://127.0.0.1/1.m3u", {}, array, groups, {}, ""
+        )
+        json_array, json_time = best_time(load_json_cache, json_file)
+        playlist_cache, cache_time = best_time(load_playlist_cache, cache_file)
+        if playlist_cache["array"] != json_array:
+            raise Exception("Cached playlists differ")
+        json_size = os.path.getsize(json_file)
+        cache_size = os.path.getsize(cache_file)
+
+    print(f"Channels: {count}")
+    print(f"playlistcache.json: {json_time:.3f} s, {json_size // 1024} KiB")
+    print(f"playlist.cache: {cache_time:.3f} s, {cache_size // 1024} KiB")
+
+
+if __name__ == "__main__":
+    main()
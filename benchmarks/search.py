@@ -0,0 +1,100 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+"""Channel search time
+
+Usage: python3 benchmarks/search.py [channels count]
+
+Compares SearchIndex queries with unidecode() scan
+over every title done before.
+"""
+import os
+import sys
+import time
+import random
+from pathlib import Path
+from unidecode import unidecode
+
+sys.path.append(str(Path(os.path.dirname(__file__), "..", "usr", "lib", "yuki-iptv")))
+
+from yuki_iptv.search import SearchIndex  # noqa: E402
+
+QUERIES = ("s", "uk", "sport", "kanal", "uk sport", "sport hd", "nothing")
+
+
+def generate_titles(count):
+    random.seed(1)
+    syllables = ("ka", "ro", "ne", "sport", "ti", "ma", "lo", "ka", "news", "ру")
+    syllables += ("та", "пе", "мо", "ки", "нал", "bi")
+    words = [
+        "".join(random.choice(syllables) for i in range(random.randint(1, 3)))
+        for i in range(3000)
+    ]
+    titles = []
+    for i in range(count):
+        titles.append(
+            " ".join(
+                (
+                    random.choice(("UK:", "US:", "DE:", "RU:", "")),
+                    random.choice(words).capitalize(),
+                    random.choice(words).capitalize(),
+                    random.choice(("HD", "FHD", "4K", "+1", "")),
+                    str(i % 10),
+                )
+            )
+        )
+    return titles
+
+
+def scan(titles, query):
+    """Search as it was done before"""
+    return [
+        i
+        for i, title in enumerate(titles)
+        if unidecode(query).lower().strip() in unidecode(title).lower().strip()
+    ]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    titles = generate_titles(count)
+    time_start = time.perf_counter()
+    search_index = SearchIndex(titles)
+    print(f"Titles: {count}")
+    print(f"Index: {time.perf_counter() - time_start:.3f} s")
+    for query in QUERIES:
+        time_start = time.perf_counter()
+        found_old = scan(titles, query)
+        scan_time = time.perf_counter() - time_start
+        time_start = time.perf_counter()
+        found = search_index.find(query)
+        index_time = time.perf_counter() - time_start
+        if not set(found_old) <= set(found):
+            raise Exception(f"Search results differ for '{query}'")
+        print(
+            f"'{query}': {len(found)} found, scan {scan_time * 1000:.1f} ms, "
+            f"index {index_time * 1000:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
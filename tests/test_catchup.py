@@ -23,6 +23,7 @@
 #
 import os
 import sys
+import time
 import datetime
 from pathlib import Path
 
@@ -32,6 +33,7 @@ from yuki_iptv.catchup import (  # noqa: E402
     get_catchup_url,
     parse_specifiers_now_url,
     format_placeholders,
+    get_archive_programmes,
 )
 
 
@@ -97,3 +99,52 @@ def test_catchup_placeholders():
         "",
         "http://127.0.0.1/index.m3u8?now={now:Ymd}",
     ) == "http://127.0.0.1/index.m3u8?now=" + datetime.datetime.now().strftime("%Y%m%d")
+
+
+def test_catchup_placeholders_epoch():
+    url = "http://127.0.0.1/{Y}-{m}-{d}:{H}-{M}-{S}/{utc}/{duration}/{catchup-id}"
+    start = time.mktime(time.strptime("02.03.2023 04:05:06", "%d.%m.%Y %H:%M:%S"))
+    assert (
+        format_placeholders(start, start + 3600, "abc", url)
+        == format_placeholders("02.03.2023 04:05:06", "02.03.2023 05:05:06", "abc", url)
+        == f"http://127.0.0.1/2023-03-02:04-05-06/{int(start)}/3600/abc"
+    )
+
+
+def test_archive_programmes():
+    programmes = [
+        {"start": 0, "stop": 60, "title": "First"},
+        {"start": 60, "stop": 120, "desc": "Second", "catchup-id": "id2"},
+    ]
+    archive_programmes = get_archive_programmes(programmes, [1])
+    assert len(archive_programmes) == 1
+    assert archive_programmes[0].index == 1
+    assert archive_programmes[0].title == ""
+    assert archive_programmes[0].catchup_id == "id2"
+    assert (
+        get_catchup_url(
+            "http://127.0.0.1/index.m3u8",
+            {"catchup": "shift"},
+            archive_programmes[0].start,
+            archive_programmes[0].stop,
+            archive_programmes[0].catchup_id,
+        ).split("&")[0]
+        == "http://127.0.0.1/index.m3u8?utc=60"
+    )
+
+
+def test_catchup_template():
+    url = "http://127.0.0.1/{utc}/${lutc}/{now:Y-m}/{duration:60}/{offset:0}/{x}"
+    now = datetime.datetime.now()
+    assert parse_specifiers_now_url(url) == (
+        "http://127.0.0.1/{utc}/"
+        + str(int(time.time()))
+        + "/"
+        + now.strftime("%Y-%m")
+        + "/{duration:60}/{offset:0}/{x}"
+    )
+    assert format_placeholders(0, 600, "", url).split("/")[6:] == [
+        "10",
+        "{offset:0}",
+        "{x}",
+    ]
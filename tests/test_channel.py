@@ -0,0 +1,69 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import os
+import sys
+import json
+import pickle
+from pathlib import Path
+
+sys.path.append(str(Path(os.getcwd(), "usr", "lib", "yuki-iptv")))
+
+from yuki_iptv.channel import Channel  # noqa: E402
+
+
+def test_channel():
+    channel_dict = {
+        "title": "Example 1",
+        "tvg-name": "Example 1",
+        "tvg-ID": "EX1",
+        "tvg-logo": "",
+        "tvg-group": "".join(["Example ", "group"]),
+        "tvg-url": "",
+        "catchup": "default",
+        "catchup-source": "",
+        "catchup-days": "1",
+        "useragent": "",
+        "referer": "",
+        "url": "http://127.0.0.1/1.mp4",
+    }
+    channel = Channel(channel_dict)
+    assert channel == channel_dict
+    assert channel_dict == channel
+    assert list(channel) == list(channel_dict)
+    assert len(channel) == 12
+    assert json.dumps(channel, default=dict) == json.dumps(channel_dict)
+    assert pickle.loads(pickle.dumps(channel)) == channel_dict
+    channel_2 = Channel(dict(channel_dict, **{"tvg-group": "Example group"}))
+    assert channel["tvg-group"] is channel_2["tvg-group"]
+
+    channel["catchup"] = "shift"
+    channel["custom"] = "1"
+    del channel["tvg-logo"]
+    assert "tvg-logo" not in channel
+    assert "custom" in channel
+    assert channel.get("tvg-logo", "none") == "none"
+    assert list(channel)[-1] == "custom"
+    assert channel.copy() == channel
+    assert pickle.loads(pickle.dumps(channel)) == channel
+    assert channel != channel_dict
+    assert Channel() == {}
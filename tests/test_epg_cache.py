@@ -0,0 +1,80 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import os
+import sys
+import pickle
+from pathlib import Path
+
+sys.path.append(str(Path(os.getcwd(), "usr", "lib", "yuki-iptv")))
+
+from yuki_iptv.epg_cache import EPGCache, write_epg_cache  # noqa: E402
+
+
+def test_epg_cache(tmp_path):
+    programmes = {
+        "channel 1": [
+            {
+                "start": 1700000000,
+                "stop": 1700003600,
+                "title": "Test programme",
+                "desc": "Описание",
+                "catchup-id": "",
+            },
+            {
+                "start": 1700003600,
+                "stop": 1700007200,
+                "title": "Test programme",
+                "desc": None,
+                "catchup-id": "123",
+            },
+        ],
+        "channel 2": [{"start": 10, "stop": 0, "title": "Test", "desc": ""}],
+        "channel 3": [],
+    }
+    metadata = {"prog_ids": {"chan1": ["channel 1"]}, "epg_icons": {}}
+    cache_file = str(tmp_path / "epg.cache")
+    write_epg_cache(cache_file, programmes, metadata)
+
+    epg_cache = EPGCache(cache_file)
+    assert epg_cache.metadata == metadata
+    assert list(epg_cache) == ["channel 1", "channel 2", "channel 3"]
+    assert "channel 2" in epg_cache
+    assert "channel 4" not in epg_cache
+    assert not epg_cache.decoded
+    assert epg_cache["channel 1"] == programmes["channel 1"]
+    assert list(epg_cache.decoded) == ["channel 1"]
+    assert dict(epg_cache) == programmes
+    assert pickle.loads(pickle.dumps(epg_cache)) == programmes
+    assert epg_cache.has_programme_at(1700003601)
+    assert not epg_cache.has_programme_at(1800000000)
+
+
+def test_epg_cache_version(tmp_path):
+    cache_file = tmp_path / "epg.cache"
+    cache_file.write_bytes(b"x\x9c" + b"\x00" * 32)
+    try:
+        EPGCache(str(cache_file))
+    except Exception:
+        pass
+    else:
+        assert False
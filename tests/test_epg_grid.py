@@ -0,0 +1,51 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(os.getcwd(), "usr", "lib", "yuki-iptv")))
+
+from yuki_iptv.epg_grid import EPG_GRID_SLOT_SIZE, get_window_start  # noqa: E402
+
+
+def test_epg_grid_window_start():
+    old_tz = os.environ.get("TZ")
+    # UTC+05:45, UTC aligned slots would start at :15 and :45 local time
+    os.environ["TZ"] = "Asia/Kathmandu"
+    time.tzset()
+    try:
+        current_time = 1700000000
+        for i in range(0, 86400, 7 * 60 + 13):
+            window_start = get_window_start(current_time + i)
+            local_start = time.localtime(window_start)
+            assert local_start.tm_min in (0, 30)
+            assert local_start.tm_sec == 0
+            assert 0 <= current_time + i - window_start < EPG_GRID_SLOT_SIZE
+    finally:
+        if old_tz is None:
+            del os.environ["TZ"]
+        else:
+            os.environ["TZ"] = old_tz
+        time.tzset()
@@ -0,0 +1,99 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import os
+import sys
+import random
+from pathlib import Path
+
+sys.path.append(str(Path(os.getcwd(), "usr", "lib", "yuki-iptv")))
+
+from yuki_iptv.epg_index import ProgrammeIndex, split_into_slots  # noqa: E402
+
+
+def get_current_linear(programmes, current_time):
+    for programme in programmes:
+        if current_time > programme["start"] and current_time < programme["stop"]:
+            return programme
+    return None
+
+
+def test_epg_index():
+    random_gen = random.Random(1)
+    programmes = {}
+    for channel_i in range(20):
+        channel_programmes = []
+        start = 1000
+        for _ in range(50):
+            stop = start + random_gen.choice([0, 10, 30, 60])
+            if random_gen.random() < 0.1:
+                stop = 0
+            channel_programmes.append({"start": start, "stop": stop, "title": ""})
+            # Some programmes overlap
+            start = max(start, stop - random_gen.choice([0, 0, 5]))
+        if channel_i == 0:
+            random_gen.shuffle(channel_programmes)
+        programmes[f"channel {channel_i}"] = channel_programmes
+
+    programme_index = ProgrammeIndex(programmes)
+    for channel_name, channel_programmes in programmes.items():
+        for current_time in range(990, 3000, 7):
+            assert programme_index.get_current(
+                channel_name, current_time
+            ) is get_current_linear(channel_programmes, current_time)
+            assert programme_index.get_range(
+                channel_name, current_time, float("inf")
+            ) == [
+                programme
+                for programme in channel_programmes
+                if programme["stop"] > current_time
+            ]
+            assert programme_index.get_range_positions(
+                channel_name, float("-inf"), current_time
+            ) == [
+                position
+                for position, programme in enumerate(channel_programmes)
+                if programme["start"] < current_time
+            ]
+    assert programme_index.get_next("channel 1", 2, 999) == programmes["channel 1"][:2]
+    assert programme_index.get_current("channel 100") is None
+    assert programme_index.has_programme_at(1001)
+    assert not programme_index.has_programme_at(10**10)
+    assert not ProgrammeIndex({}).has_programme_at(1001)
+
+
+def test_split_into_slots():
+    programmes = [
+        {"start": 900, "stop": 1010},
+        {"start": 1010, "stop": 1030},
+        {"start": 1030, "stop": 1100},
+        {"start": 1100, "stop": 1100},
+        {"start": 1100, "stop": 2000},
+    ]
+    slots = split_into_slots(programmes, 1000, 30, 4)
+    assert slots == [
+        programmes[0:2],
+        programmes[2:3],
+        programmes[2:3],
+        programmes[2:3] + programmes[4:5],
+    ]
+    assert split_into_slots(programmes, 5000, 30, 2) == [[], []]
@@ -0,0 +1,113 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(os.getcwd(), "usr", "lib", "yuki-iptv")))
+
+from yuki_iptv.epg_merge import (  # noqa: E402
+    EPGMerger,
+    EPG_MERGE_LAST,
+    EPG_MERGE_FIRST,
+    EPG_MERGE_UNION,
+)
+
+
+def get_sources():
+    source1 = {
+        "Channel 1": [
+            {"start": 10, "stop": 20, "title": "A"},
+            {"start": 20, "stop": 30, "title": "B"},
+        ],
+        "Channel 2": [{"start": 10, "stop": 20, "title": "C"}],
+    }
+    source2 = {
+        "Channel 1": [
+            {"start": 5, "stop": 10, "title": "D"},
+            {"start": 20, "stop": 30, "title": "B"},
+        ],
+        "Channel 3": [{"start": 10, "stop": 20, "title": "E"}],
+    }
+    return [
+        [source1, {"chan1": ["Channel 1"]}, {"channel 1": "1.png"}],
+        [source2, {"chan1": ["Channel 1 HD"]}, {"channel 1": "2.png"}],
+    ]
+
+
+def get_titles(epg_merger, name):
+    return [programme["title"] for programme in epg_merger.programmes[name]]
+
+
+def test_epg_merge():
+    epg_merger = EPGMerger(EPG_MERGE_LAST)
+    for source in get_sources():
+        epg_merger.add(*source)
+    assert get_titles(epg_merger, "Channel 1") == ["D", "B"]
+    assert sorted(epg_merger.programmes) == ["Channel 1", "Channel 2", "Channel 3"]
+    assert epg_merger.prog_ids == {"chan1": ["Channel 1 HD"]}
+    assert epg_merger.icons == {"channel 1": "2.png"}
+
+    epg_merger = EPGMerger(EPG_MERGE_FIRST)
+    for source in get_sources():
+        epg_merger.add(*source)
+    assert get_titles(epg_merger, "Channel 1") == ["A", "B"]
+    assert get_titles(epg_merger, "Channel 3") == ["E"]
+    assert epg_merger.prog_ids == {"chan1": ["Channel 1"]}
+    assert epg_merger.icons == {"channel 1": "1.png"}
+
+    epg_merger = EPGMerger(EPG_MERGE_UNION)
+    for source in get_sources():
+        epg_merger.add(*source)
+    assert get_titles(epg_merger, "Channel 1") == ["D", "A", "B"]
+    assert get_titles(epg_merger, "Channel 2") == ["C"]
+    assert epg_merger.prog_ids == {"chan1": ["Channel 1", "Channel 1 HD"]}
+
+
+def test_epg_merge_union_duplicates():
+    epg_merger = EPGMerger(EPG_MERGE_UNION)
+    epg_merger.add(
+        {
+            "Channel 1": [
+                {"start": 10, "stop": 20, "title": "A"},
+                {"start": 10, "stop": 20, "title": "A"},
+                {"start": 30, "stop": 40, "title": "C"},
+            ]
+        },
+        {},
+        {},
+    )
+    assert get_titles(epg_merger, "Channel 1") == ["A", "C"]
+    epg_merger.add(
+        {
+            "Channel 1": [
+                {"start": 10, "stop": 20, "title": "A"},
+                {"start": 20, "stop": 30, "title": "B"},
+                {"start": 20, "stop": 30, "title": "B"},
+                {"start": 40, "stop": 50, "title": "D"},
+            ]
+        },
+        {},
+        {},
+    )
+    assert get_titles(epg_merger, "Channel 1") == ["A", "B", "C", "D"]
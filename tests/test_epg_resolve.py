@@ -0,0 +1,73 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(os.getcwd(), "usr", "lib", "yuki-iptv")))
+
+from yuki_iptv.epg_resolve import resolve_epg_name, resolve_epg_names  # noqa: E402
+
+
+def test_epg_resolve():
+    programmes = {
+        "custom": [],
+        "example 2": [],
+        "example_3": [],
+        "example 4": [],
+    }
+    prog_ids = {"EX1": ["Example 1 EPG"]}
+    array = {
+        "Example 1": {"tvg-ID": "EX1", "tvg-name": ""},
+        "Example 2": {"tvg-ID": "", "tvg-name": "Example 2"},
+        "Example 3": {"tvg-ID": "", "tvg-name": "Example 3"},
+        "Example 4": {"tvg-ID": "", "tvg-name": ""},
+        "Example 5": {"tvg-ID": "", "tvg-name": ""},
+        "Example 6": {"tvg-ID": "EX1", "tvg-name": ""},
+    }
+    channel_settings = {
+        "Example 6": {"epgname": "Custom"},
+        "Example 5": {"epgname": "Missing"},
+    }
+    epg_names, report = resolve_epg_names(array, channel_settings, programmes, prog_ids)
+    assert epg_names == {
+        "example 1": "example 1 epg",
+        "example 2": "example 2",
+        "example 3": "example_3",
+        "example 4": "example 4",
+        "example 5": "example 5",
+        "example 6": "custom",
+    }
+    assert report == {
+        "epgname": 1,
+        "tvg-id": 1,
+        "tvg-name": 2,
+        "title": 1,
+        "none": 1,
+    }
+    assert resolve_epg_name(
+        "Example 6", array["Example 6"], {}, programmes, prog_ids
+    ) == (
+        "example 1 epg",
+        "tvg-id",
+    )
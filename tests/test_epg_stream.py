@@ -0,0 +1,102 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import io
+import os
+import sys
+import gzip
+import lzma
+import zipfile
+from pathlib import Path
+
+sys.path.append(str(Path(os.getcwd(), "usr", "lib", "yuki-iptv")))
+
+from yuki_iptv.chunks import prefetch_chunks  # noqa: E402
+from yuki_iptv.epg_stream import gzip_chunks, parse_epg_stream  # noqa: E402
+
+
+def small_chunks(data, size=7):
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+def test_epg_stream():
+    with open(Path("tests", "xmltv.xml"), "rb") as xmltv_file_fd:
+        xmltv_file = xmltv_file_fd.read()
+    zip_file = io.BytesIO()
+    with zipfile.ZipFile(zip_file, "w") as zip_file_fd:
+        zip_file_fd.writestr("xmltv.xml", xmltv_file)
+    variants = [
+        xmltv_file,
+        gzip.compress(xmltv_file),
+        gzip.compress(xmltv_file[:100]) + gzip.compress(xmltv_file[100:]),
+        lzma.compress(xmltv_file),
+        zip_file.getvalue(),
+    ]
+    stages = []
+    for variant in variants:
+        epg = parse_epg_stream(
+            prefetch_chunks(small_chunks(variant)),
+            {"epgoffset": 0},
+            stages.append,
+        )
+        assert list(epg[0]) == ["Test channel 1"]
+        assert len(epg[0]["Test channel 1"]) == 2
+        assert epg[1] == {"testchan": ["Test channel 1"]}
+        assert epg[2] == {"test channel 1": "http://127.0.0.1/testchannel1.png"}
+    assert "unpacking" in stages
+
+
+def test_gzip_chunks():
+    members = [gzip.compress(b"A"), gzip.compress(b"B"), gzip.compress(b"C" * 100)]
+    data = b"".join(members)
+    # Every chunk size, so members end at chunk boundary and magic is split
+    for size in range(1, len(data) + 1):
+        assert b"".join(gzip_chunks(small_chunks(data, size))) == b"AB" + b"C" * 100
+    assert b"".join(gzip_chunks(members)) == b"AB" + b"C" * 100
+    assert b"".join(gzip_chunks([members[0], b"garbage", members[1]])) == b"A"
+    assert b"".join(gzip_chunks(small_chunks(members[0] + b"\x1f", 1))) == b"A"
+
+
+def test_epg_stream_broken():
+    try:
+        parse_epg_stream(small_chunks(b"<tv><programme>"), {"epgoffset": 0})
+    except Exception as exc:
+        assert "Unknown EPG format" in str(exc)
+    else:
+        assert False
+
+
+def test_prefetch_chunks_close():
+    closed = []
+
+    def endless_chunks():
+        try:
+            while True:
+                yield b"A"
+        finally:
+            closed.append(True)
+
+    chunks = prefetch_chunks(endless_chunks(), maxsize=2)
+    assert next(chunks) == b"A"
+    chunks.close()
+    assert closed == [True]
@@ -0,0 +1,77 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.append(str(Path(os.getcwd(), "usr", "lib", "yuki-iptv")))
+
+from yuki_iptv.logo_atlas import (  # noqa: E402
+    LOGO_TILE_BYTES,
+    LogoAtlas,
+    LogoTranscoder,
+)
+
+
+def test_logo_atlas(tmp_path):
+    atlas_writer = LogoAtlas(str(tmp_path), max_tiles=2)
+    atlas_reader = LogoAtlas(str(tmp_path))
+    assert atlas_reader.get_tile("1.png") is None
+
+    atlas_writer.add_tile("1.png", b"\1" * LOGO_TILE_BYTES)
+    assert atlas_reader.get_tile("1.png") == b"\1" * LOGO_TILE_BYTES
+    atlas_writer.add_tile("2.png", b"\2" * LOGO_TILE_BYTES)
+    atlas_writer.add_tile("2.png", b"\3" * LOGO_TILE_BYTES)
+    assert atlas_reader.get_tile("2.png") == b"\2" * LOGO_TILE_BYTES
+    assert atlas_writer.has_tile("2.png")
+
+    # Full atlas is started again, readers forget old tiles
+    atlas_writer.add_tile("3.png", b"\3" * LOGO_TILE_BYTES)
+    assert not atlas_writer.has_tile("1.png")
+    assert atlas_reader.get_tile("3.png") == b"\3" * LOGO_TILE_BYTES
+    assert atlas_reader.get_tile("1.png") is None
+    assert os.path.getsize(tmp_path / "atlas.rgba") == LOGO_TILE_BYTES
+
+    # Index of existing atlas is loaded
+    assert LogoAtlas(str(tmp_path)).has_tile("3.png")
+
+
+def test_logo_transcoder():
+    batches = []
+
+    def transcode(contents):
+        batches.append(len(contents))
+        return [content.upper() for content in contents]
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        logo_transcoder = LogoTranscoder(transcode, executor, batch_size=32)
+        with ThreadPoolExecutor(max_workers=100) as fetch_executor:
+            results = list(
+                fetch_executor.map(
+                    logo_transcoder.transcode, [f"logo{i}" for i in range(100)]
+                )
+            )
+    assert results == [f"LOGO{i}" for i in range(100)]
+    assert sum(batches) == 100
+    assert len(batches) <= 10
@@ -0,0 +1,90 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(os.getcwd(), "usr", "lib", "yuki-iptv")))
+
+from yuki_iptv.logo_cache import (  # noqa: E402
+    LOGO_REFRESH_AGE,
+    LOGO_RETRY_DELAY,
+    LogoCache,
+    get_legacy_logo_file,
+)
+
+
+def save_logo(logo_cache, logo_url, content, current_time, etag=None):
+    logo_path = logo_cache.get_content_file(content)
+    with open(logo_path, "wb") as logo_fd:
+        logo_fd.write(content)
+    return logo_cache.store(logo_url, logo_path, etag, None, current_time)
+
+
+def test_logo_cache(tmp_path):
+    logo_cache = LogoCache(str(tmp_path), max_size=250)
+    assert logo_cache.lookup("http://127.0.0.1/1.png", 1000) == (None, {})
+
+    # Same image for two URLs is stored once
+    logo_file = save_logo(logo_cache, "http://127.0.0.1/1.png", b"1" * 100, 1000, "a")
+    assert save_logo(logo_cache, "http://127.0.0.1/2.png", b"1" * 100, 1000) == (
+        logo_file
+    )
+    assert logo_cache.lookup("http://127.0.0.1/1.png", 1010) == (logo_file, None)
+    # Old logo is checked with conditional request
+    assert logo_cache.lookup("http://127.0.0.1/1.png", 1000 + LOGO_REFRESH_AGE) == (
+        logo_file,
+        {"If-None-Match": "a"},
+    )
+    logo_cache.not_modified("http://127.0.0.1/1.png", 1000 + LOGO_REFRESH_AGE)
+    assert logo_cache.lookup("http://127.0.0.1/1.png", 1010 + LOGO_REFRESH_AGE)[1] is (
+        None
+    )
+
+    # Failed logo waits longer after every failure
+    logo_cache.failed("http://127.0.0.1/404.png", 2000)
+    assert logo_cache.lookup("http://127.0.0.1/404.png", 2001) == (None, None)
+    assert logo_cache.lookup("http://127.0.0.1/404.png", 2000 + LOGO_RETRY_DELAY) == (
+        None,
+        {},
+    )
+    logo_cache.failed("http://127.0.0.1/404.png", 3000)
+    assert logo_cache.lookup("http://127.0.0.1/404.png", 3000 + LOGO_RETRY_DELAY)[
+        1
+    ] is (None)
+
+    # Least recently used logos are evicted on save
+    save_logo(logo_cache, "http://127.0.0.1/3.png", b"3" * 100, 3000)
+    logo_cache.lookup("http://127.0.0.1/2.png", 4000)
+    save_logo(logo_cache, "http://127.0.0.1/4.png", b"4" * 100, 5000)
+    logo_cache.save()
+    assert os.path.isfile(logo_file)
+    assert logo_cache.lookup("http://127.0.0.1/3.png", 5000) == (None, {})
+
+    # Manifest is loaded again, logos of older versions are used
+    legacy_file = tmp_path / get_legacy_logo_file("http://127.0.0.1/5.png")
+    legacy_file.write_bytes(b"5")
+    logo_cache = LogoCache(str(tmp_path))
+    assert logo_cache.lookup("http://127.0.0.1/2.png", 5000) == (logo_file, None)
+    assert logo_cache.lookup("http://127.0.0.1/404.png", 3100) == (None, None)
+    assert logo_cache.lookup("http://127.0.0.1/5.png")[0] == str(legacy_file)
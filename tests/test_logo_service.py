@@ -0,0 +1,104 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import os
+import sys
+import time
+import threading
+from pathlib import Path
+
+sys.path.append(str(Path(os.getcwd(), "usr", "lib", "yuki-iptv")))
+
+from yuki_iptv.logo_service import LogoService  # noqa: E402
+
+
+def test_logo_service():
+    fetched = []
+    logos = {}
+    idle = threading.Event()
+
+    def fetch(session, logo_url, user_agent, referer):
+        fetched.append(logo_url)
+        time.sleep(0.2)
+        if "broken" in logo_url:
+            raise Exception("Broken logo")
+        return logo_url.split("/")[-1]
+
+    def logo_ready(channel_name, channel_logos):
+        logos[channel_name] = channel_logos
+
+    logo_service = LogoService(fetch, logo_ready, idle.set)
+    # 100 channels with 20 logos, downloaded at the same time
+    time_start = time.time()
+    logo_service.request(
+        {
+            f"Channel {i}": [f"http://127.0.0.1/{i % 20}.png", "", "UA", ""]
+            for i in range(100)
+        }
+    )
+    assert idle.wait(5)
+    assert time.time() - time_start < 1
+    assert sorted(fetched) == sorted(f"http://127.0.0.1/{i}.png" for i in range(20))
+    assert logos["Channel 42"] == ["2.png", None]
+    assert logo_service.get_session("http://127.0.0.1/1.png") is (
+        logo_service.get_session("http://127.0.0.1/2.png")
+    )
+
+    # Known logos are given without download, failed ones are tried again
+    fetched.clear()
+    idle.clear()
+    logo_service.request(
+        {"Channel 1": ["http://127.0.0.1/1.png", "http://127.0.0.1/broken.png", "", ""]}
+    )
+    assert idle.wait(5)
+    idle.clear()
+    logo_service.request(
+        {"Channel 1": ["http://127.0.0.1/1.png", "http://127.0.0.1/broken.png", "", ""]}
+    )
+    assert idle.wait(5)
+    assert fetched == ["http://127.0.0.1/broken.png"] * 2
+    assert logos["Channel 1"] == ["1.png", None]
+    # Nothing is left waiting
+    assert logo_service.channels == {}
+    assert logo_service.url_channels == {}
+    logo_service.stop()
+
+
+def test_logo_service_priority():
+    fetched = []
+    release = threading.Event()
+
+    def fetch(session, logo_url, user_agent, referer):
+        fetched.append(logo_url)
+        release.wait(5)
+        return logo_url
+
+    logo_service = LogoService(fetch, lambda *args: None, workers=1)
+    logo_service.request({f"Channel {i}": [f"a{i}", "", "", ""] for i in range(5)})
+    time.sleep(0.1)
+    # Scrolled to other channels
+    logo_service.request({f"Other {i}": [f"b{i}", "", "", ""] for i in range(2)})
+    release.set()
+    while logo_service.is_busy():
+        time.sleep(0.01)
+    assert fetched == ["a0", "b0", "b1", "a1", "a2", "a3", "a4"]
+    logo_service.stop()
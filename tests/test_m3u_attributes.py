@@ -0,0 +1,50 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import os
+import sys
+import gettext
+from pathlib import Path
+
+sys.path.append(str(Path(os.getcwd(), "usr", "lib", "yuki-iptv")))
+
+from yuki_iptv.m3u import M3UParser, EXTINF_ATTRIBUTES  # noqa: E402
+
+m3u_parser = M3UParser("", gettext.gettext)
+
+
+def test_m3u_attributes():
+    lines = [
+        '#EXTINF:-1 tvg-id="1" tvg-ID="2" tvg-id="3",Title',
+        '#EXTINF:-1 x-tvg-url="http://127.0.0.1/x.xml" tvg-url="y",Title',
+        '#EXTINF:-1 tvg-name="a tvg-logo="b" c" tvg-logo="d",Title',
+        '#EXTINF:-1 catchup-days="abc" catchup-type="shift",Title',
+        '#EXTINF:-1 catchup-days=" 7 " group-title=" Group ",Title',
+        '#EXTINF:-1 catchup="" catchup-source="?utc={utc}" tvg-name="unclosed,Title',
+        "#EXTINF:-1,Title without attributes",
+    ]
+    for line in lines:
+        attributes = m3u_parser.parse_attributes(line)
+        for name in EXTINF_ATTRIBUTES:
+            assert attributes.get(name, "default") == m3u_parser.parse_regexp(
+                name, line, "default"
+            )
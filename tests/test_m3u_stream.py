@@ -0,0 +1,84 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import io
+import os
+import sys
+import gettext
+from pathlib import Path
+
+sys.path.append(str(Path(os.getcwd(), "usr", "lib", "yuki-iptv")))
+
+from yuki_iptv.m3u import M3UParser, M3U_PREFIX_SIZE  # noqa: E402
+
+
+def small_chunks(data, size=5):
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+def test_m3u_stream():
+    for m3u_path in sorted(Path("tests", "m3u").glob("*.m3u")):
+        m3u_bytes = m3u_path.read_bytes()
+        m3u_str = m3u_bytes.decode("utf-8")
+        m3u_parser = M3UParser("", gettext.gettext)
+        try:
+            expected = m3u_parser.parse_m3u(m3u_str)
+        except Exception as exc:
+            expected = str(exc)
+        for m3u in (
+            m3u_str.splitlines(),
+            small_chunks(m3u_bytes),
+            io.BytesIO(m3u_bytes),
+        ):
+            m3u_parser = M3UParser("", gettext.gettext)
+            try:
+                channels = list(m3u_parser.iter_m3u(m3u))
+                got = [channels, m3u_parser.epg_url_final]
+            except Exception as exc:
+                got = str(exc)
+            assert got == expected
+
+
+def test_m3u_stream_incremental():
+    def chunks():
+        # Encoding is detected from first M3U_PREFIX_SIZE bytes
+        yield b"#EXTM3U\n" + b"#\n" * M3U_PREFIX_SIZE + b"#EXTINF:-1,\xd0\x9a"
+        yield b"\xd0\xb0\xd0\xbd\xd0\xb0\xd0\xbb 1\nhttp://127.0.0.1/1\n"
+        raise Exception("Playlist tail must not be read yet")
+
+    m3u_parser = M3UParser("", gettext.gettext)
+    assert next(m3u_parser.iter_m3u(chunks()))["title"] == "Канал 1"
+
+
+def test_m3u_stream_malformed():
+    def chunks():
+        yield b"#EXTINF:-1,Channel 1\nhttp://127.0.0.1/1\n"
+        yield b"#EXTM3U\n"
+
+    m3u_parser = M3UParser("", gettext.gettext)
+    try:
+        next(m3u_parser.iter_m3u(chunks()))
+    except Exception as exc:
+        assert str(exc) == "Malformed M3U"
+    else:
+        assert False
@@ -0,0 +1,90 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import os
+import sys
+import marshal
+from pathlib import Path
+
+sys.path.append(str(Path(os.getcwd(), "usr", "lib", "yuki-iptv")))
+
+from yuki_iptv.channel import Channel  # noqa: E402
+from yuki_iptv.playlist_cache import (  # noqa: E402
+    PLAYLIST_CACHE_HEADER,
+    PLAYLIST_CACHE_MAGIC,
+    load_playlist_cache,
+    save_playlist_cache,
+    get_playlist_validators,
+    get_revalidation_headers,
+)
+
+
+def test_playlist_cache(tmp_path):
+    channel_1 = Channel(
+        {
+            "title": "Example 1",
+            "tvg-name": "Example 1",
+            "tvg-group": "Example group",
+            "url": "http://127.0.0.1/1.mp4",
+            "custom": "1",
+        }
+    )
+    channel_2 = Channel(dict(channel_1, **{"title": "Example 2"}))
+    del channel_2["tvg-name"]
+    array = {"Example 1": channel_1, "Example 2": channel_2}
+    movies = {"Movie": {"title": "Movie", "tvg-group": "VOD"}}
+    validators = get_playlist_validators(
+        {"ETag": '"abc"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    )
+    cache_file = str(Path(tmp_path, "playlist.cache"))
+    save_playlist_cache(
+        cache_file,
+        "http://127.0.0.1/1.m3u",
+        validators,
+        array,
+        ["Example group"],
+        movies,
+        "http://127.0.0.1/epg.xml",
+    )
+    playlist_cache = load_playlist_cache(cache_file)
+    assert playlist_cache["url"] == "http://127.0.0.1/1.m3u"
+    assert playlist_cache["array"] == array
+    assert isinstance(playlist_cache["array"]["Example 2"], Channel)
+    assert "tvg-name" not in playlist_cache["array"]["Example 2"]
+    assert list(playlist_cache["array"]["Example 1"]) == list(channel_1)
+    assert playlist_cache["movies"] == movies
+    assert playlist_cache["groups"] == ["Example group"]
+    assert playlist_cache["epgurl"] == "http://127.0.0.1/epg.xml"
+    assert get_revalidation_headers(playlist_cache["validators"]) == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+    }
+    assert get_revalidation_headers(get_playlist_validators({})) == {}
+
+    with open(cache_file, "wb") as cache_fd:
+        cache_fd.write(PLAYLIST_CACHE_HEADER.pack(PLAYLIST_CACHE_MAGIC, 0))
+        cache_fd.write(marshal.dumps({}))
+    try:
+        load_playlist_cache(cache_file)
+        assert False
+    except Exception as exc:
+        assert str(exc) == "Playlist cache version changed"
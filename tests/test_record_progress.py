@@ -0,0 +1,69 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(os.getcwd(), "usr", "lib", "yuki-iptv")))
+
+from yuki_iptv.record_progress import (  # noqa: E402
+    RECORD_ERROR_LINES,
+    RECORD_RETRY_MAX_DELAY,
+    RecordingProgress,
+    get_part_file,
+    get_retry_delay,
+)
+
+
+def test_record_progress():
+    progress = RecordingProgress()
+    progress.feed_output(b"frame=10\ntotal_size=N/A\nbitrate=N/A\nprogress=cont")
+    assert progress.size == 0
+    progress.feed_output(
+        b"inue\nframe=20\ndrop_frames=3\ntotal_size=4096\n"
+        b"out_time_us=1500000\nbitrate= 512.0kbits/s\nspeed=1.01x\nprogress=con"
+    )
+    assert progress.size == 4096
+    assert progress.bitrate == "512.0kbits/s"
+    assert progress.speed == "1.01x"
+    assert progress.out_time == 1.5
+    assert progress.total_dropped_frames == 3
+
+    progress.restart()
+    progress.feed_output(b"total_size=100\ndrop_frames=1\n")
+    assert progress.size == 4196
+    assert progress.total_dropped_frames == 4
+
+    progress.feed_errors(b"first\n\nsecond\nthi")
+    assert progress.get_errors() == ["first", "second"]
+    progress.feed_errors(b"rd\n")
+    assert progress.get_errors(2) == ["second", "third"]
+    progress.feed_errors(b"line\n" * (RECORD_ERROR_LINES * 2))
+    assert len(progress.errors) == RECORD_ERROR_LINES
+
+
+def test_record_retry():
+    assert [get_retry_delay(attempt) for attempt in range(3)] == [2, 4, 8]
+    assert get_retry_delay(100) == RECORD_RETRY_MAX_DELAY
+    assert get_part_file("/tmp/recording.mkv", 0) == "/tmp/recording.mkv"
+    assert get_part_file("/tmp/recording.mkv", 1) == "/tmp/recording_part2.mkv"
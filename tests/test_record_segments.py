@@ -0,0 +1,89 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(os.getcwd(), "usr", "lib", "yuki-iptv")))
+
+from yuki_iptv.record_segments import (  # noqa: E402
+    SEGMENT_INDEX_FILE,
+    SEGMENT_LIST_FILE,
+    SegmentIndex,
+    get_segment_args,
+)
+
+
+def add_segment(segment_dir, number, size, mtime, partial_line=b""):
+    segment_name = f"segment_{number:06d}.ts"
+    segment_file = segment_dir / segment_name
+    segment_file.write_bytes(b"\0" * size)
+    os.utime(segment_file, (mtime, mtime))
+    with open(segment_dir / SEGMENT_LIST_FILE, "ab") as list_fd:
+        list_fd.write(f"{segment_name},{number * 10}.0,{number * 10 + 9.5}\n".encode())
+        list_fd.write(partial_line)
+
+
+def test_segment_index(tmp_path):
+    assert get_segment_args(str(tmp_path), 600, 3)[-1] == str(
+        tmp_path / "segment_%06d.ts"
+    )
+    segment_index = SegmentIndex(str(tmp_path), max_size=250)
+    assert not segment_index.update()
+    add_segment(tmp_path, 0, 100, 1000)
+    add_segment(tmp_path, 1, 100, 1010, partial_line=b"segment_000002.ts,20")
+    assert segment_index.update(1020)
+    assert [segment.name for segment in segment_index.segments] == [
+        "segment_000000.ts",
+        "segment_000001.ts",
+    ]
+    assert segment_index.segments[0].duration == 9.5
+
+    # Size limit removes oldest segment
+    with open(tmp_path / SEGMENT_LIST_FILE, "ab") as list_fd:
+        list_fd.write(b".0,29.5\n")
+    (tmp_path / "segment_000002.ts").write_bytes(b"\0" * 100)
+    os.utime(tmp_path / "segment_000002.ts", (1020, 1020))
+    assert segment_index.update(1030)
+    assert segment_index.next_number == 3
+    assert segment_index.total_size == 200
+    assert segment_index.get_recorded_size() == 300
+    # Segment being written by ffmpeg
+    (tmp_path / "segment_000003.ts").write_bytes(b"\0" * 50)
+    assert segment_index.get_recorded_size() == 350
+    assert not (tmp_path / "segment_000000.ts").exists()
+    index = (tmp_path / SEGMENT_INDEX_FILE).read_text()
+    assert "#EXT-X-MEDIA-SEQUENCE:1\n" in index
+    assert "#EXT-X-TARGETDURATION:10\n" in index
+    assert "#EXTINF:9.500,\nsegment_000001.ts\n" in index
+    assert "#EXT-X-ENDLIST" not in index
+
+    # ffmpeg started again writes segment list from beginning
+    segment_index.restart()
+    (tmp_path / SEGMENT_LIST_FILE).unlink()
+    segment_index.max_size = 0
+    segment_index.max_age = 60
+    add_segment(tmp_path, 3, 100, 2000)
+    segment_index.finish()
+    assert [segment.name for segment in segment_index.segments] == ["segment_000003.ts"]
+    assert (tmp_path / SEGMENT_INDEX_FILE).read_text().endswith("#EXT-X-ENDLIST\n")
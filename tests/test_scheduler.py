@@ -0,0 +1,78 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(os.getcwd(), "usr", "lib", "yuki-iptv")))
+
+from yuki_iptv.scheduler import RecordingScheduler  # noqa: E402
+
+
+def test_scheduler(tmp_path):
+    scheduler_file = str(tmp_path / "scheduler.json")
+    events = []
+
+    def start_func(channel):
+        events.append(("start", channel))
+        return channel
+
+    def stop_func(recording):
+        events.append(("stop", recording))
+
+    scheduler = RecordingScheduler(scheduler_file, start_func, stop_func)
+    assert scheduler.get_wait(0) is None
+    scheduler.add("Second", 2000, 3000)
+    first_id = scheduler.add("First", 1000, 2000)
+    removed_id = scheduler.add("Removed", 1500, 1600)
+    scheduler.add("Missed", 100, 200)
+    scheduler.remove(removed_id)
+    assert [job["channel"] for job in scheduler.get_jobs()] == [
+        "Missed",
+        "First",
+        "Second",
+    ]
+    assert scheduler.get_wait(50) == 50
+    assert scheduler.get_wait(500) == 0
+    assert scheduler.get_wait(-1000) == 60
+
+    # Started late, missed job is dropped
+    assert scheduler.run(1500)
+    assert events == [("start", "First")]
+    assert list(scheduler.active) == [first_id]
+
+    # Planned and running recordings are kept after restart
+    scheduler.stop_all()
+    events.clear()
+    scheduler = RecordingScheduler(scheduler_file, start_func, stop_func)
+    assert [job["channel"] for job in scheduler.get_jobs()] == ["First", "Second"]
+    assert not scheduler.run(900)
+    scheduler.run(1900)
+    assert events == [("start", "First")]
+    scheduler.run(2000)
+    assert events[1:] == [("stop", "First"), ("start", "Second")]
+    scheduler.run(4000)
+    assert events[3:] == [("stop", "Second")]
+    assert not scheduler.get_jobs()
+    assert scheduler.get_wait() is None
+    assert not RecordingScheduler(scheduler_file, start_func, stop_func).jobs
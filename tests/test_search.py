@@ -0,0 +1,87 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(os.getcwd(), "usr", "lib", "yuki-iptv")))
+
+pytest.importorskip("unidecode")
+
+from yuki_iptv.search import (  # noqa: E402
+    SearchIndex,
+    SearchIndexCache,
+    normalize_search_text,
+)
+
+
+def test_search_index():
+    texts = [
+        "BBC One HD",
+        "BBC World News",
+        "Первый канал",
+        "Sky Sports Main Event",
+        "CNN",
+        "",
+    ]
+    search_index = SearchIndex(texts)
+    assert search_index.find("") == list(range(len(texts)))
+    assert search_index.find("  ") == list(range(len(texts)))
+    # Substring, as before
+    assert search_index.find("bbc") == [0, 1]
+    assert search_index.find("c") == [0, 1, 4]
+    assert search_index.find("ld ne") == [1]
+    assert search_index.find("orts mai") == [3]
+    assert search_index.find("pervyi") == [2]
+    assert search_index.find("Первый") == [2]
+    assert search_index.find("nothing") == []
+    # Every word starts some title word
+    assert search_index.find("news bbc") == [1]
+    assert search_index.find("sp ev") == [3]
+    assert search_index.find("ews bbc") == []
+    assert search_index.find("sky sp ev") == [3]
+    assert search_index.find("orts main ev") == [3]
+    assert search_index.find("orts ma ev") == []
+    assert search_index.find_texts("ONE") == {"BBC One HD"}
+    # Everything found before is still found
+    for query in ("b", "bb", "bbc one", "sky", "n", "a", "kanal", "s m"):
+        assert {
+            i
+            for i, text in enumerate(texts)
+            if normalize_search_text(query) in normalize_search_text(text)
+        } <= set(search_index.find(query))
+
+
+def test_search_index_cache():
+    search_index_cache = SearchIndexCache()
+    search_index = search_index_cache.get(["a", "b"], 1)
+    # Titles are not compared, only version
+    assert search_index_cache.get(["a", "b"], 1) is search_index
+    assert search_index_cache.get(["a", "c"], 2) is not search_index
+    assert search_index_cache.get(["a", "c"], 2).find("c") == [1]
+    search_index = search_index_cache.get(["a", "b"])
+    assert search_index_cache.get(["a", "c"]) is search_index
+    search_index_cache.clear()
+    assert search_index_cache.get(["a", "c"]).find("c") == [1]
@@ -0,0 +1,134 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(os.getcwd(), "usr", "lib", "yuki-iptv")))
+
+from yuki_iptv.record_segments import SEGMENT_LIST_FILE, SegmentIndex  # noqa: E402
+from yuki_iptv.timeshift import Timeshift, TIMESHIFT_SEGMENT_TIME  # noqa: E402
+
+
+class FakeRecording:
+    """Writes local stream file as segments, like ffmpeg segment muxer"""
+
+    def __init__(self, stream_file):
+        self.stream = open(stream_file, "rb")
+        self.segment_index = None
+        self.number = 0
+        self.record_id = 0
+        self.stopped = []
+        self.running = set()
+
+    def record(self, url, segment_dir, channel_name, segment_options):
+        self.segment_dir = segment_dir
+        self.segment_index = SegmentIndex(
+            segment_dir, max_count=segment_options["max_count"]
+        )
+        self.number = 0
+        self.record_id += 1
+        self.running.add(self.record_id)
+        return self.record_id
+
+    def stop(self, record_id):
+        self.stopped.append(record_id)
+
+    def is_running(self, record_id):
+        return record_id in self.running
+
+    def get_segments(self, record_id):
+        return len(self.segment_index.segments)
+
+    def write_segment(self, current_time):
+        segment_name = f"segment_{self.number:06d}.ts"
+        with open(os.path.join(self.segment_dir, segment_name), "wb") as segment:
+            segment.write(self.stream.read(1000))
+        start = self.number * TIMESHIFT_SEGMENT_TIME
+        with open(os.path.join(self.segment_dir, SEGMENT_LIST_FILE), "a") as list_fd:
+            list_fd.write(f"{segment_name},{start},{start + TIMESHIFT_SEGMENT_TIME}\n")
+        self.number += 1
+        self.segment_index.update(current_time)
+
+
+def test_timeshift(tmp_path):
+    stream_file = tmp_path / "stream.ts"
+    stream_file.write_bytes(os.urandom(100 * 1000))
+    recording = FakeRecording(stream_file)
+    timeshift = Timeshift(
+        str(tmp_path / "timeshift"),
+        60,
+        recording.record,
+        recording.stop,
+        recording.get_segments,
+        recording.is_running,
+    )
+    timeshift.start("Channel", "http://127.0.0.1/live.m3u8")
+    assert timeshift.is_active("Channel")
+    assert not timeshift.is_active("Other channel")
+    # Nothing recorded yet, live stream can't be moved
+    assert timeshift.seek(-10, 1000) is None
+
+    for i in range(30):
+        recording.write_segment(1000 + i * TIMESHIFT_SEGMENT_TIME)
+    # Disk usage is bounded by window
+    assert timeshift.get_available() == 60
+    ring_dir = tmp_path / "timeshift" / "1"
+    assert timeshift.index_file == str(ring_dir / "index.m3u8")
+    assert len(os.listdir(ring_dir)) == 15 + 2
+    assert (ring_dir / "segment_000015.ts").read_bytes() == (
+        stream_file.read_bytes()[15000:16000]
+    )
+
+    # Pause live, 10 seconds later continue from timeshift
+    timeshift.set_paused(True, 1200)
+    assert timeshift.get_behind(1205) == 5
+    timeshift.set_paused(False, 1210)
+    assert timeshift.behind == 10
+    assert timeshift.get_start_index() == -3
+
+    # Can't go back more than window
+    assert timeshift.seek(-600, 1220) == 60
+    assert timeshift.get_start_index() == -15
+    assert timeshift.seek(30, 1230) == 30
+    # Back to live
+    assert timeshift.seek(100, 1240) == 0
+    assert timeshift.seek(10, 1250) is None
+
+    # Other channel is recorded to new folder, old one is deleted
+    # only after its ffmpeg exited
+    timeshift.start("Other channel", "http://127.0.0.1/other.m3u8")
+    assert recording.stopped == [1]
+    assert timeshift.is_active("Other channel")
+    assert timeshift.index_file == str(tmp_path / "timeshift" / "2" / "index.m3u8")
+    recording.write_segment(2000)
+    assert ring_dir.is_dir()
+    recording.running.discard(1)
+    timeshift.stop()
+    assert recording.stopped == [1, 2]
+    assert not ring_dir.exists()
+    assert (tmp_path / "timeshift" / "2").is_dir()
+    assert not timeshift.is_active("Other channel")
+    recording.running.discard(2)
+    timeshift.remove_stopped_rings()
+    assert os.listdir(tmp_path / "timeshift") == []
@@ -27,16 +27,14 @@ from pathlib import Path
 
 sys.path.append(str(Path(os.getcwd(), "usr", "lib", "yuki-iptv")))
 
-from yuki_iptv.epg_xmltv import parse_as_xmltv  # noqa: E402
+from yuki_iptv.epg_xmltv import parse_xmltv_chunks, XMLTVParser  # noqa: E402
 
 
 def test_xmltv():
-    with open(Path("tests", "xmltv.xml"), "r", encoding="utf8") as xmltv_file_fd:
+    with open(Path("tests", "xmltv.xml"), "rb") as xmltv_file_fd:
         xmltv_file = xmltv_file_fd.read()
     for epgoffset in [0, -124, 3490]:
-        xmltv = parse_as_xmltv(
-            xmltv_file, {"epgoffset": epgoffset, "epgdays": 1}, 1, {}, 0, ""
-        )
+        xmltv = parse_xmltv_chunks([xmltv_file], {"epgoffset": epgoffset, "epgdays": 1})
         assert xmltv == [
             {
                 "Test channel 1": [
@@ -59,3 +57,20 @@ def test_xmltv():
             {"testchan": ["Test channel 1"]},
             {"test channel 1": "http://127.0.0.1/testchannel1.png"},
         ]
+
+
+def test_xmltv_incremental():
+    with open(Path("tests", "xmltv.xml"), "rb") as xmltv_file_fd:
+        xmltv_file = xmltv_file_fd.read()
+    parser = XMLTVParser({"epgoffset": 0})
+    finished = []
+    for i in range(0, len(xmltv_file), 16):
+        finished.extend(parser.feed(xmltv_file[i : i + 16]))
+    assert finished == []
+    finished.extend(parser.close())
+    assert [channel[0] for channel in finished] == [["Test channel 1"]]
+    assert [programme["title"] for programme in finished[0][1]] == [
+        "Test program 1",
+        "Test program 2",
+    ]
+    assert parser.root is not None and len(parser.root) == 0
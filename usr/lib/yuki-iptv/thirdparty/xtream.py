@@ -23,6 +23,7 @@ import logging
 import json
 import re  # used for URL validation
 import time
+from concurrent.futures import ThreadPoolExecutor
 from os import path as osp
 from os import makedirs
 from timeit import default_timer as timer  # Timing xtream json downloads
@@ -288,6 +289,9 @@ class XTream:
     # JSON dictionary from the provider
     threshold_time_sec = 60 * 60 * 8
 
+    # Groups and streams of Live, VOD and Series are downloaded at the same time
+    loader_threads = 6
+
     def __init__(
         self,
         provider_name: str,
@@ -333,6 +337,14 @@ class XTream:
             if not osp.isdir(self.cache_path):
                 makedirs(self.cache_path, exist_ok=True)
 
+        # All requests to provider share keep-alive connections
+        self.session = requests.Session()
+        self.session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=self.loader_threads))
+        self.session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=self.loader_threads))
+        # Stream type -> (groups future, streams future)
+        self.catalogue_futures = {}
+        self.loaded_types = set()
+
         self.authenticate()
 
     def search_stream(self, keyword: str, ignore_case: bool = True, return_type: str = "LIST") -> List:
@@ -432,7 +444,7 @@ class XTream:
             self.auth_data = {}
             try:
                 # Request authentication, wait 4 seconds maximum
-                r = requests.get(self.get_authenticate_URL(), timeout=(4))
+                r = self.session.get(self.get_authenticate_URL(), timeout=(4))
                 # If the answer is ok, process data and change state
                 if r.ok:
                     self.auth_data = r.json()
@@ -520,7 +532,55 @@ class XTream:
         else:
             return False
 
-    def load_iptv(self):
+    def _load_catalogue(self, filename: str, load_from_provider, stream_type: str):
+        """Load JSON from local file or from provider, runs in loader thread
+
+        Args:
+            filename (str): Name of the local file
+            load_from_provider: Function downloading data for stream type
+            stream_type (str): Stream type can be Live, VOD, Series
+
+        Returns:
+            Tuple: Loaded data or None, download time in seconds
+        """
+        # Try loading local file
+        dt = 0
+        data = self._load_from_file(filename)
+        # If file empty or does not exists, download it from remote
+        if data is None:
+            # Load and save file locally
+            start = timer()
+            data = load_from_provider(stream_type)
+            self._save_to_file(data, filename)
+            dt = timer() - start
+        return data, dt
+
+    def prefetch_iptv(self):
+        """Start loading groups and streams of all stream types
+
+        All six requests are running at the same time, JSON is decoded
+        in loader threads. load_iptv() waits only for types it loads.
+        """
+        if self.state["authenticated"] is True and not self.catalogue_futures:
+            executor = ThreadPoolExecutor(max_workers=self.loader_threads, thread_name_prefix="xtream_loader")
+            for loading_stream_type in (self.live_type, self.vod_type, self.series_type):
+                self.catalogue_futures[loading_stream_type] = (
+                    executor.submit(
+                        self._load_catalogue,
+                        "all_groups_{}.json".format(loading_stream_type),
+                        self._load_categories_from_provider,
+                        loading_stream_type,
+                    ),
+                    executor.submit(
+                        self._load_catalogue,
+                        "all_stream_{}.json".format(loading_stream_type),
+                        self._load_streams_from_provider,
+                        loading_stream_type,
+                    ),
+                )
+            executor.shutdown(wait=False)
+
+    def load_iptv(self, stream_types: Tuple = None):
         """Load XTream IPTV
 
         - Add all Live TV to XTream.channels
@@ -531,169 +591,149 @@ class XTream:
         - Add all groups to XTream.groups
           Groups are for all three channel types, Live TV, VOD, and Series
 
+        Args:
+            stream_types (Tuple, optional): Stream types to load, in this order.
+                                            Defaults to Live, VOD and Series.
+
         """
-        # If pyxtream has already authenticated the connection and not loaded the data, start loading
+        if stream_types is None:
+            stream_types = (self.live_type, self.vod_type, self.series_type)
+        # If pyxtream has already authenticated the connection, start loading
         if self.state["authenticated"] is True:
-            if self.state["loaded"] is False:
+            self.prefetch_iptv()
+
+            for loading_stream_type in stream_types:
+                if loading_stream_type in self.loaded_types:
+                    logger.warning("Warning, {} data has already been loaded.".format(loading_stream_type))
+                    continue
+                ## Get GROUPS
+                all_cat, dt = self.catalogue_futures[loading_stream_type][0].result()
+
+                # If we got the GROUPS data, show the statistics and load GROUPS
+                if all_cat is not None:
+                    logger.info("Loaded {} {} Groups in {:.3f} seconds".format(
+                        len(all_cat), loading_stream_type, dt
+                    ))
+                    ## Add GROUPS to dictionaries
 
-                for loading_stream_type in (self.live_type, self.vod_type, self.series_type):
-                    ## Get GROUPS
+                    # Add the catch-all-errors group
+                    self.groups.append(self.catch_all_group)
 
-                    # Try loading local file
-                    dt = 0
-                    all_cat = self._load_from_file("all_groups_{}.json".format(
-                        loading_stream_type
-                    ))
-                    # If file empty or does not exists, download it from remote
-                    if all_cat is None:
-                        # Load all Groups and save file locally
-                        start = timer()
-                        all_cat = self._load_categories_from_provider(loading_stream_type)
-                        self._save_to_file(all_cat,"all_groups_{}.json".format(
-                            loading_stream_type
-                        ))
-                        dt = timer() - start
-
-                    # If we got the GROUPS data, show the statistics and load GROUPS
-                    if all_cat is not None:
-                        logger.info("Loaded {} {} Groups in {:.3f} seconds".format(
-                            len(all_cat), loading_stream_type, dt
-                        ))
-                        ## Add GROUPS to dictionaries
-
-                        # Add the catch-all-errors group
-                        self.groups.append(self.catch_all_group)
-
-                        for cat_obj in all_cat:
-                            # Create Group (Category)
-                            new_group = Group(cat_obj, loading_stream_type)
-                            #  Add to xtream class
-                            self.groups.append(new_group)
-
-                        # Add the catch-all-errors group
-                        self.groups.append(Group({"category_id": "9999", "category_name": "xEverythingElse", "parent_id": 0}, loading_stream_type))
-
-                        # Sort Categories
-                        self.groups.sort(key=lambda x: x.name)
-                    else:
-                        logger.warning(" - Could not load {} Groups".format(loading_stream_type))
-                        break
-
-                    ## Get Streams
-
-                    # Try loading local file
-                    dt = 0
-                    all_streams = self._load_from_file("all_stream_{}.json".format(
-                        loading_stream_type
+                    for cat_obj in all_cat:
+                        # Create Group (Category)
+                        new_group = Group(cat_obj, loading_stream_type)
+                        #  Add to xtream class
+                        self.groups.append(new_group)
+
+                    # Add the catch-all-errors group
+                    self.groups.append(Group({"category_id": "9999", "category_name": "xEverythingElse", "parent_id": 0}, loading_stream_type))
+
+                    # Sort Categories
+                    self.groups.sort(key=lambda x: x.name)
+                else:
+                    logger.warning(" - Could not load {} Groups".format(loading_stream_type))
+                    break
+
+                ## Get Streams
+                all_streams, dt = self.catalogue_futures[loading_stream_type][1].result()
+
+                # If we got the STREAMS data, show the statistics and load Streams
+                if all_streams is not None:
+                    logger.info("Loaded {} {} Streams in {:.3f} seconds".format(
+                        len(all_streams), loading_stream_type, dt
                     ))
-                    # If file empty or does not exists, download it from remote
-                    if all_streams is None:
-                        # Load all Streams and save file locally
-                        start = timer()
-                        all_streams = self._load_streams_from_provider(loading_stream_type)
-                        self._save_to_file(all_streams,"all_stream_{}.json".format(
-                            loading_stream_type
-                        ))
-                        dt = timer() - start
-
-                    # If we got the STREAMS data, show the statistics and load Streams
-                    if all_streams is not None:
-                        logger.info("Loaded {} {} Streams in {:.3f} seconds".format(
-                            len(all_streams), loading_stream_type, dt
-                        ))
-                        ## Add Streams to dictionaries
-
-                        skipped_adult_content = 0
-                        skipped_no_name_content = 0
-
-                        for stream_channel in all_streams:
-                            skip_stream = False
-
-                            # Skip if the name of the stream is empty
-                            if stream_channel["name"] == "":
-                                skip_stream = True
-                                skipped_no_name_content = skipped_no_name_content + 1
-                                self._save_to_file_skipped_streams(stream_channel)
-
-                            # Skip if the user chose to hide adult streams
-                            if self.hide_adult_content and loading_stream_type == self.live_type:
-                                try:
-                                    if stream_channel["is_adult"] == "1":
-                                        skip_stream = True
-                                        skipped_adult_content = skipped_adult_content + 1
-                                        self._save_to_file_skipped_streams(stream_channel)
-                                except Exception:
-                                    logger.warning(" - Stream does not have `is_adult` key:\n\t`{}`".format(json.dumps(stream_channel)))
-                                    pass
-
-                            if not skip_stream:
-                                # Some channels have no group,
-                                # so let's add them to the catch all group
-                                if stream_channel["category_id"] is None:
-                                    stream_channel["category_id"] = "9999"
-                                elif stream_channel["category_id"] != "1":
-                                    pass
-
-                                # Find the first occurence of the group that the
-                                # Channel or Stream is pointing to
-                                the_group = next(
-                                    (x for x in self.groups if x.group_id == int(stream_channel["category_id"])),
-                                    None
+                    ## Add Streams to dictionaries
+
+                    skipped_adult_content = 0
+                    skipped_no_name_content = 0
+
+                    for stream_channel in all_streams:
+                        skip_stream = False
+
+                        # Skip if the name of the stream is empty
+                        if stream_channel["name"] == "":
+                            skip_stream = True
+                            skipped_no_name_content = skipped_no_name_content + 1
+                            self._save_to_file_skipped_streams(stream_channel)
+
+                        # Skip if the user chose to hide adult streams
+                        if self.hide_adult_content and loading_stream_type == self.live_type:
+                            try:
+                                if stream_channel["is_adult"] == "1":
+                                    skip_stream = True
+                                    skipped_adult_content = skipped_adult_content + 1
+                                    self._save_to_file_skipped_streams(stream_channel)
+                            except Exception:
+                                logger.warning(" - Stream does not have `is_adult` key:\n\t`{}`".format(json.dumps(stream_channel)))
+                                pass
+
+                        if not skip_stream:
+                            # Some channels have no group,
+                            # so let's add them to the catch all group
+                            if stream_channel["category_id"] is None:
+                                stream_channel["category_id"] = "9999"
+                            elif stream_channel["category_id"] != "1":
+                                pass
+
+                            # Find the first occurence of the group that the
+                            # Channel or Stream is pointing to
+                            the_group = next(
+                                (x for x in self.groups if x.group_id == int(stream_channel["category_id"])),
+                                None
+                            )
+
+                            # Set group title
+                            if the_group is not None:
+                                group_title = the_group.name
+                            else:
+                                group_title = self.catch_all_group.name
+                                the_group = self.catch_all_group
+
+                            if loading_stream_type == self.series_type:
+                                # Load all Series
+                                new_series = Serie(self, stream_channel)
+                                # To get all the Episodes for every Season of each
+                                # Series is very time consuming, we will only
+                                # populate the Series once the user click on the
+                                # Series, the Seasons and Episodes will be loaded
+                                # using x.getSeriesInfoByID() function
+
+                            else:
+                                new_channel = Channel(
+                                    self, group_title, stream_channel
                                 )
 
-                                # Set group title
-                                if the_group is not None:
-                                    group_title = the_group.name
+                            if new_channel.group_id == "9999":
+                                logger.info(" - xEverythingElse Channel -> {} - {}".format(new_channel.name,new_channel.stream_type))
+
+                            # Save the new channel to the local list of channels
+                            if loading_stream_type == self.live_type:
+                                self.channels.append(new_channel)
+                            elif loading_stream_type == self.vod_type:
+                                self.movies.append(new_channel)
+                            else:
+                                self.series.append(new_series)
+
+                            # Add stream to the specific Group
+                            if the_group is not None:
+                                if loading_stream_type != self.series_type:
+                                    the_group.channels.append(new_channel)
                                 else:
-                                    group_title = self.catch_all_group.name
-                                    the_group = self.catch_all_group
-
-                                if loading_stream_type == self.series_type:
-                                    # Load all Series
-                                    new_series = Serie(self, stream_channel)
-                                    # To get all the Episodes for every Season of each
-                                    # Series is very time consuming, we will only
-                                    # populate the Series once the user click on the
-                                    # Series, the Seasons and Episodes will be loaded
-                                    # using x.getSeriesInfoByID() function
-
-                                else:
-                                    new_channel = Channel(
-                                        self, group_title, stream_channel
-                                    )
-
-                                if new_channel.group_id == "9999":
-                                    logger.info(" - xEverythingElse Channel -> {} - {}".format(new_channel.name,new_channel.stream_type))
-
-                                # Save the new channel to the local list of channels
-                                if loading_stream_type == self.live_type:
-                                    self.channels.append(new_channel)
-                                elif loading_stream_type == self.vod_type:
-                                    self.movies.append(new_channel)
-                                else:
-                                    self.series.append(new_series)
-
-                                # Add stream to the specific Group
-                                if the_group is not None:
-                                    if loading_stream_type != self.series_type:
-                                        the_group.channels.append(new_channel)
-                                    else:
-                                        the_group.series.append(new_series)
-                                else:
-                                    logger.warning(" - Group not found `{}`".format(stream_channel["name"]))
-
-                        # Print information of which streams have been skipped
-                        if self.hide_adult_content:
-                            logger.info(" - Skipped {} adult {} streams".format(skipped_adult_content, loading_stream_type))
-                        if skipped_no_name_content > 0:
-                            logger.info(" - Skipped {} unprintable {} streams".format(skipped_no_name_content, loading_stream_type))
-                    else:
-                        logger.warning(" - Could not load {} Streams".format(loading_stream_type))
+                                    the_group.series.append(new_series)
+                            else:
+                                logger.warning(" - Group not found `{}`".format(stream_channel["name"]))
+
+                    # Print information of which streams have been skipped
+                    if self.hide_adult_content:
+                        logger.info(" - Skipped {} adult {} streams".format(skipped_adult_content, loading_stream_type))
+                    if skipped_no_name_content > 0:
+                        logger.info(" - Skipped {} unprintable {} streams".format(skipped_no_name_content, loading_stream_type))
+                else:
+                    logger.warning(" - Could not load {} Streams".format(loading_stream_type))
 
-                    self.state["loaded"] = True
+                self.loaded_types.add(loading_stream_type)
+                self.state["loaded"] = True
 
-            else:
-                logger.warning("Warning, data has already been loaded.")
         else:
             logger.warning("Warning, cannot load steams since authorization failed")
 
@@ -747,7 +787,7 @@ class XTream:
             [type]: JSON dictionary of the loaded data, or None
         """
         try:
-            r = requests.get(URL, timeout=timeout)
+            r = self.session.get(URL, timeout=timeout)
             if r.status_code == 200:
                 return r.json()
 
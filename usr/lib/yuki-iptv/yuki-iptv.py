@@ -38,13 +38,13 @@ import re
 import textwrap
 import hashlib
 import threading
+import queue
 import traceback
 from multiprocessing import Manager, active_children, get_context
+from concurrent.futures import ProcessPoolExecutor
 from functools import partial
-import chardet
 import requests
 import setproctitle
-from unidecode import unidecode
 
 try:
     from gi.repository import GLib
@@ -53,11 +53,23 @@ except Exception:
 
 from yuki_iptv.qt import get_qt_library
 from yuki_iptv.epg import worker, is_program_actual, load_epg_cache, save_epg_cache
+from yuki_iptv.epg_index import ProgrammeIndex
+from yuki_iptv.scheduler import RecordingScheduler
+from yuki_iptv.timeshift import Timeshift, TIMESHIFT_SEGMENT_TIME
+from yuki_iptv.epg_grid import (
+    EPGGridModel,
+    EPG_GRID_WINDOW,
+    get_window_start,
+)
+from yuki_iptv.epg_resolve import resolve_epg_name, resolve_epg_names
 from yuki_iptv.record import (
     record,
     record_return,
     stop_record,
+    release_record,
     is_ffmpeg_recording,
+    is_record_running,
+    get_record_status,
     init_record,
 )
 from yuki_iptv.menubar import (
@@ -71,21 +83,39 @@ from yuki_iptv.menubar import (
     reload_menubar_shortcuts,
 )
 from yuki_iptv.xtreamtom3u import convert_xtream_to_m3u
-from yuki_iptv.m3u import M3UParser
+from yuki_iptv.m3u import (
+    M3UParser,
+    M3U_CHUNK_SIZE,
+    M3U_PREFIX_SIZE,
+    detect_m3u_encoding,
+)
+from yuki_iptv.chunks import peek_chunks, read_chunks
+from yuki_iptv.playlist_cache import (
+    load_playlist_cache,
+    save_playlist_cache,
+    get_playlist_validators,
+    get_revalidation_headers,
+)
 from yuki_iptv.xspf import parse_xspf
 from yuki_iptv.catchup import (
     get_catchup_url,
+    get_archive_programmes,
+    format_archive_programme,
     parse_specifiers_now_url,
     format_url_clean,
     format_catchup_array,
 )
+from yuki_iptv.channel import Channel
 from yuki_iptv.channel_logos import channel_logos_worker
+from yuki_iptv.logo_atlas import LOGO_TILE_SIZE, LogoAtlas
+from yuki_iptv.channel_list import ChannelListView, ChannelRow
 from yuki_iptv.settings import parse_settings
 from yuki_iptv.qt6compat import _exec
 from yuki_iptv.m3u_editor import M3UEditor
 from yuki_iptv.options import read_option, write_option
 from yuki_iptv.keybinds import main_keybinds_internal, main_keybinds_default
 from yuki_iptv.series import parse_series
+from yuki_iptv.search import SearchIndexCache
 from thirdparty.xtream import XTream, Serie
 
 parser = argparse.ArgumentParser(prog="yuki-iptv", description="yuki-iptv")
@@ -187,6 +217,12 @@ BCOLOR = "#A2A3A3"
 
 UPDATE_BR_INTERVAL = 5
 
+# Channels loaded before window is shown, rest of playlist
+# is added in batches while it is still loading
+M3U_FIRST_PAGE = 1000
+M3U_BATCH_SIZE = 5000
+M3U_BATCH_INTERVAL = 1
+
 AUDIO_SAMPLE_FORMATS = {
     "u16": "unsigned 16 bits",
     "s16": "signed 16 bits",
@@ -222,6 +258,10 @@ class YukiData:
     volume = 100
     settings_changed = False
     demuxer_max_back_bytes = 0
+    # Changed when channels are added or removed
+    playlist_version = 0
+    channel_list_key = None
+    channel_list = []
 
 
 stream_info.video_properties = {}
@@ -572,18 +612,11 @@ if __name__ == "__main__":
 
                 update_epg_func_static_enable()
 
-                # Loading epg.cache
-                tvguide_json = (
-                    get_context("spawn")
-                    .Pool(1)
-                    .apply(
-                        load_epg_cache,
-                        (
-                            settings["m3u"],
-                            settings["epg"],
-                            epg_ready,
-                        ),
-                    )
+                # Loading epg.cache, only index is read here
+                tvguide_json = load_epg_cache(
+                    settings["m3u"],
+                    settings["epg"],
+                    epg_ready,
                 )
                 is_program_actual1 = False
                 if tvguide_json:
@@ -632,6 +665,42 @@ if __name__ == "__main__":
         )
         channels = {}
         programmes = {}
+        programme_index = ProgrammeIndex(programmes)
+
+        def get_programme_index():
+            """Time index for current programmes, rebuilt if guide changed"""
+            global programme_index
+            if programme_index.programmes is not programmes:
+                programme_index = ProgrammeIndex(programmes)
+            return programme_index
+
+        epg_names = {}
+        epg_names_sources = (None, None, None)
+
+        def get_epg_names():
+            """Lowercase channel name -> EPG name for whole playlist,
+            resolved again if playlist or guide changed"""
+            global epg_names, epg_names_sources
+            if (
+                epg_names_sources[0] is not array
+                or epg_names_sources[1] is not programmes
+                or epg_names_sources[2] is not prog_ids
+            ):
+                epg_names_sources = (array, programmes, prog_ids)
+                epg_names, epg_names_report = resolve_epg_names(
+                    array, channel_sets.get(settings["m3u"], {}), programmes, prog_ids
+                )
+                logger.info(
+                    "EPG names resolved: "
+                    + ", ".join(
+                        f"{epg_source} {epg_names_report[epg_source]}"
+                        for epg_source in epg_names_report
+                    )
+                )
+            return epg_names
+
+        def get_epg_name(channel_name):
+            return get_epg_names().get(channel_name.lower(), channel_name.lower())
 
         logger.info("Init m3u editor")
         m3u_editor = M3UEditor(
@@ -725,7 +794,53 @@ if __name__ == "__main__":
         class PlaylistsFail:
             status_code = 0
 
+            def close(self):
+                pass
+
         m3uFailed = False
+        m3u_loaded = False
+        m3u_tail = None
+        xtream_loading = False
+
+        def add_playlist_channel(m3u_datai, channels, channel_groups):
+            """Add parsed playlist entry, returns True if it is a channel"""
+            if "tvg-group" in m3u_datai:
+                if m3u_datai["tvg-group"].lower() == "vod" or m3u_datai[
+                    "tvg-group"
+                ].lower().startswith("vod "):
+                    YukiData.movies[m3u_datai["title"]] = m3u_datai
+                else:
+                    YukiData.series, is_matched = parse_series(
+                        m3u_datai, YukiData.series
+                    )
+                    if not is_matched:
+                        channels[m3u_datai["title"]] = m3u_datai
+                        if not m3u_datai["tvg-group"] in channel_groups:
+                            channel_groups.append(m3u_datai["tvg-group"])
+                        return True
+            return False
+
+        def apply_channel_sets(ch3):
+            """Group and visibility of channel changed by user"""
+            if settings["m3u"] in channel_sets:
+                if ch3 in channel_sets[settings["m3u"]]:
+                    if "group" in channel_sets[settings["m3u"]][ch3]:
+                        if channel_sets[settings["m3u"]][ch3]["group"]:
+                            # Copy, playlist entry is kept for cache
+                            array[ch3] = Channel(array[ch3])
+                            array[ch3]["tvg-group"] = channel_sets[settings["m3u"]][
+                                ch3
+                            ]["group"]
+                            if (
+                                channel_sets[settings["m3u"]][ch3]["group"]
+                                not in groups
+                            ):
+                                groups.append(
+                                    channel_sets[settings["m3u"]][ch3]["group"]
+                                )
+                    if "hidden" in channel_sets[settings["m3u"]][ch3]:
+                        if channel_sets[settings["m3u"]][ch3]["hidden"]:
+                            array.pop(ch3)
 
         use_cache = settings["m3u"].startswith("http://") or settings["m3u"].startswith(
             "https://"
@@ -734,33 +849,57 @@ if __name__ == "__main__":
             use_cache = False
         if not use_cache:
             logger.info("Playlist caching off")
-        if use_cache and os.path.isfile(str(Path(LOCAL_DIR, "playlistcache.json"))):
-            pj = open(str(Path(LOCAL_DIR, "playlistcache.json")), "r", encoding="utf8")
-            pj1 = json.loads(pj.read())["url"]
-            pj.close()
-            if pj1 != settings["m3u"]:
-                os.remove(str(Path(LOCAL_DIR, "playlistcache.json")))
-        if (not use_cache) and os.path.isfile(
-            str(Path(LOCAL_DIR, "playlistcache.json"))
-        ):
-            os.remove(str(Path(LOCAL_DIR, "playlistcache.json")))
+        # JSON playlist cache is not used anymore
         if os.path.isfile(str(Path(LOCAL_DIR, "playlistcache.json"))):
+            os.remove(str(Path(LOCAL_DIR, "playlistcache.json")))
+        if (not use_cache) and os.path.isfile(str(Path(LOCAL_DIR, "playlist.cache"))):
+            os.remove(str(Path(LOCAL_DIR, "playlist.cache")))
+        playlist_cache = None
+        if os.path.isfile(str(Path(LOCAL_DIR, "playlist.cache"))):
             try:
-                playlist_load_tmp = open(
-                    str(Path(LOCAL_DIR, "playlistcache.json")), "r", encoding="utf8"
+                playlist_cache = load_playlist_cache(
+                    str(Path(LOCAL_DIR, "playlist.cache"))
                 )
-                playlist_load_tmp_data = playlist_load_tmp.read()
-                playlist_load_tmp.close()
-                playlist_load_tmp_data = json.loads(playlist_load_tmp_data)
-                if (
-                    not playlist_load_tmp_data["m3u"]
-                    and not playlist_load_tmp_data["array"]
-                ):
+                if playlist_cache["url"] != settings["m3u"]:
+                    playlist_cache = None
+                elif not playlist_cache["array"] and not playlist_cache["movies"]:
                     logger.warning("Cached playlist broken, ignoring and deleting")
-                    os.remove(str(Path(LOCAL_DIR, "playlistcache.json")))
+                    playlist_cache = None
             except Exception:
-                pass
-        if not os.path.isfile(str(Path(LOCAL_DIR, "playlistcache.json"))):
+                logger.warning("Cached playlist broken, ignoring and deleting")
+                playlist_cache = None
+            if not playlist_cache:
+                os.remove(str(Path(LOCAL_DIR, "playlist.cache")))
+        m3u_file = None
+        m3u_req = None
+        if playlist_cache:
+            revalidation_headers = get_revalidation_headers(
+                playlist_cache["validators"]
+            )
+            if revalidation_headers:
+                # Unchanged playlist is not downloaded again
+                try:
+                    m3u_req = requests.get(
+                        settings["m3u"],
+                        headers=dict(
+                            revalidation_headers, **{"User-Agent": settings["ua"]}
+                        ),
+                        timeout=(5, 15),  # connect, read timeout
+                        stream=True,
+                    )
+                    logger.info(
+                        f"Playlist revalidation status code: {m3u_req.status_code}"
+                    )
+                    if m3u_req.status_code == 200:
+                        logger.info("Playlist changed, ignoring cache")
+                        playlist_cache = None
+                    else:
+                        m3u_req.close()
+                        m3u_req = None
+                except Exception:
+                    logger.warning("Playlist revalidation failed, using cache")
+                    m3u_req = None
+        if not playlist_cache:
             logger.info("Loading playlist...")
             if settings["m3u"]:
                 # Parsing m3u
@@ -789,16 +928,14 @@ if __name__ == "__main__":
                         xt = EmptyClass()
                         xt.auth_data = {}
                     if xt.auth_data != {}:
-                        xt.load_iptv()
+                        # All catalogues are requested at once, only live
+                        # channels are waited for, VOD and series are
+                        # added when window is shown
+                        xt.prefetch_iptv()
+                        xt.load_iptv((xt.live_type,))
+                        xtream_loading = True
                         try:
                             m3u = convert_xtream_to_m3u(_, xt.channels)
-                            try:
-                                m3u += convert_xtream_to_m3u(_, xt.movies, True, "VOD")
-                            except Exception:
-                                logger.warning("XTream movies parse FAILED")
-                            for movie1 in xt.series:
-                                if isinstance(movie1, Serie):
-                                    YukiData.series[movie1.name] = movie1
                         except Exception as e3:
                             message2 = "{}\n\n{}".format(
                                 _("yuki-iptv error"),
@@ -830,104 +967,42 @@ if __name__ == "__main__":
                 else:
                     if os.path.isfile(settings["m3u"]):
                         try:
-                            file = open(settings["m3u"], "r", encoding="utf8")
-                            m3u = file.read()
-                            file.close()
+                            m3u_file = open(settings["m3u"], "rb")
+                            m3u = read_chunks(m3u_file, M3U_CHUNK_SIZE)
                         except Exception:
-                            logger.warning("Playlist is not UTF-8 encoding")
-                            logger.info("Trying to detect encoding...")
-                            file_222_encoding = ""
-                            try:
-                                file_222 = open(settings["m3u"], "rb")
-                                file_222_encoding = chardet.detect(file_222.read())[
-                                    "encoding"
-                                ]
-                                file_222.close()
-                            except Exception:
-                                pass
-                            if file_222_encoding:
-                                logger.info(f"Guessed encoding: {file_222_encoding}")
+                            m3u = ""
+                            exp3 = traceback.format_exc()
+                            logger.warning("Playlist file loading error!" + "\n" + exp3)
+                            show_exception(_("Playlist loading error!"))
+                    else:
+                        try:
+                            # Already requested while checking cache
+                            if m3u_req is None:
                                 try:
-                                    file_111 = open(
-                                        settings["m3u"], "r", encoding=file_222_encoding
+                                    m3u_req = requests.get(
+                                        settings["m3u"],
+                                        headers={"User-Agent": settings["ua"]},
+                                        timeout=(5, 15),  # connect, read timeout
+                                        stream=True,
                                     )
-                                    m3u = file_111.read()
-                                    file_111.close()
                                 except Exception:
-                                    logger.warning("Wrong encoding guess!")
-                                    show_exception(
-                                        _(
-                                            "Failed to load playlist - unknown "
-                                            "encoding! Please use playlists "
-                                            "in UTF-8 encoding."
-                                        )
+                                    m3u_req = PlaylistsFail()
+                                    m3u_req.status_code = 400
+
+                                if m3u_req.status_code != 200:
+                                    logger.warning(
+                                        "Playlist load failed, trying empty user agent"
                                     )
-                            else:
-                                logger.warning("Unknown encoding!")
-                                show_exception(
-                                    _(
-                                        "Failed to load playlist - unknown "
-                                        "encoding! Please use playlists "
-                                        "in UTF-8 encoding."
+                                    m3u_req = requests.get(
+                                        settings["m3u"],
+                                        headers={"User-Agent": ""},
+                                        timeout=(5, 15),  # connect, read timeout
+                                        stream=True,
                                     )
-                                )
-                    else:
-                        try:
-                            try:
-                                m3u_req = requests.get(
-                                    settings["m3u"],
-                                    headers={"User-Agent": settings["ua"]},
-                                    timeout=(5, 15),  # connect, read timeout
-                                )
-                            except Exception:
-                                m3u_req = PlaylistsFail()
-                                m3u_req.status_code = 400
-
-                            if m3u_req.status_code != 200:
-                                logger.warning(
-                                    "Playlist load failed, trying empty user agent"
-                                )
-                                m3u_req = requests.get(
-                                    settings["m3u"],
-                                    headers={"User-Agent": ""},
-                                    timeout=(5, 15),  # connect, read timeout
-                                )
 
                             logger.info(f"Status code: {m3u_req.status_code}")
-                            logger.info(f"{len(m3u_req.content)} bytes")
-                            m3u = m3u_req.content
-                            try:
-                                m3u = m3u.decode("utf-8")
-                            except Exception:
-                                logger.warning("Playlist is not UTF-8 encoding")
-                                logger.info("Trying to detect encoding...")
-                                guess_encoding = ""
-                                try:
-                                    guess_encoding = chardet.detect(m3u)["encoding"]
-                                except Exception:
-                                    pass
-                                if guess_encoding:
-                                    logger.info(f"Guessed encoding: {guess_encoding}")
-                                    try:
-                                        m3u = m3u.decode(guess_encoding)
-                                    except Exception:
-                                        logger.warning("Wrong encoding guess!")
-                                        show_exception(
-                                            _(
-                                                "Failed to load playlist - unknown "
-                                                "encoding! Please use playlists "
-                                                "in UTF-8 encoding."
-                                            )
-                                        )
-                                else:
-                                    logger.warning("Unknown encoding!")
-                                    show_exception(
-                                        _(
-                                            "Failed to load playlist - unknown "
-                                            "encoding! Please use playlists "
-                                            "in UTF-8 encoding."
-                                        )
-                                    )
+                            # Playlist is parsed while it is downloading
+                            m3u = m3u_req.iter_content(M3U_CHUNK_SIZE)
                         except Exception:
                             m3u = ""
                             exp3 = traceback.format_exc()
@@ -939,45 +1014,81 @@ if __name__ == "__main__":
             m3uFailed = False
             if m3u:
                 try:
-                    is_xspf = '<?xml version="' in m3u and (
-                        "http://xspf.org/" in m3u or "https://xspf.org/" in m3u
-                    )
+                    if isinstance(m3u, str):
+                        m3u_prefix = m3u
+                        is_xspf = '<?xml version="' in m3u and (
+                            "http://xspf.org/" in m3u or "https://xspf.org/" in m3u
+                        )
+                    else:
+                        # Only first bytes are checked, rest is still loading
+                        m3u_prefix, m3u = peek_chunks(m3u, M3U_PREFIX_SIZE)
+                        is_xspf = b'<?xml version="' in m3u_prefix and (
+                            b"http://xspf.org/" in m3u_prefix
+                            or b"https://xspf.org/" in m3u_prefix
+                        )
                     if not is_xspf:
-                        m3u_data0 = m3u_parser.parse_m3u(m3u)
+                        m3u_data_got = m3u_parser.iter_m3u(m3u)
                     else:
+                        if not isinstance(m3u, str):
+                            m3u = b"".join(m3u).decode(detect_m3u_encoding(m3u_prefix))
                         m3u_data0 = parse_xspf(m3u)
-                    m3u_data_got = m3u_data0[0]
-                    m3u_data = []
-
-                    for m3u_datai in m3u_data_got:
-                        if "tvg-group" in m3u_datai:
-                            if m3u_datai["tvg-group"].lower() == "vod" or m3u_datai[
-                                "tvg-group"
-                            ].lower().startswith("vod "):
-                                YukiData.movies[m3u_datai["title"]] = m3u_datai
-                            else:
-                                YukiData.series, is_matched = parse_series(
-                                    m3u_datai, YukiData.series
-                                )
-                                if not is_matched:
-                                    m3u_data.append(m3u_datai)
+                        m3u_data_got = m3u_data0[0]
+                        m3u_parser.epg_url_final = m3u_data0[1]
+
+                    # Channels are added as soon as they are parsed, only
+                    # first page is waited for, rest is added when window
+                    # is shown
+                    m3u_tail = iter(m3u_data_got)
+                    first_page_count = 0
+                    for m3u_datai in m3u_tail:
+                        add_playlist_channel(m3u_datai, array, groups)
+                        first_page_count += 1
+                        if first_page_count >= M3U_FIRST_PAGE:
+                            break
+                    else:
+                        m3u_tail = None
 
-                    epg_url = m3u_data0[1]
+                    if m3u_tail is None:
+                        epg_url = m3u_parser.epg_url_final
+                    else:
+                        # EPG URLs of channels are known at the end of playlist
+                        epg_url = m3u_parser.m3u_epg
                     if epg_url and not settings["epg"]:
                         settings["epg"] = epg_url
-                    for m3u_line in m3u_data:
-                        array[m3u_line["title"]] = m3u_line
-                        if not m3u_line["tvg-group"] in groups:
-                            groups.append(m3u_line["tvg-group"])
-                except Exception:
-                    logger.warning(
-                        "Playlist parsing error!" + "\n" + traceback.format_exc()
-                    )
-                    show_exception(_("Playlist loading error!"))
+                    if not isinstance(m3u, str):
+                        # Streamed playlist is not kept in memory
+                        m3u = ""
+                    m3u_loaded = True
+                except Exception as e4:
+                    if isinstance(e4, UnicodeError):
+                        logger.warning("Unknown encoding!")
+                        show_exception(
+                            _(
+                                "Failed to load playlist - unknown "
+                                "encoding! Please use playlists "
+                                "in UTF-8 encoding."
+                            )
+                        )
+                    else:
+                        logger.warning(
+                            "Playlist parsing error!" + "\n" + traceback.format_exc()
+                        )
+                        show_exception(_("Playlist loading error!"))
                     m3u = ""
+                    # Channels parsed before the error are dropped
                     array = {}
                     groups = []
+                    YukiData.movies = {}
+                    YukiData.series = {}
                     m3uFailed = True
+                    m3u_tail = None
+                finally:
+                    # Still needed for loading rest of playlist
+                    if m3u_tail is None:
+                        if m3u_file:
+                            m3u_file.close()
+                        if m3u_req:
+                            m3u_req.close()
 
             logger.info(
                 "{} channels, {} groups, {} movies, {} series".format(
@@ -988,89 +1099,66 @@ if __name__ == "__main__":
                 )
             )
 
-            logger.info("Playling loading done!")
-            if use_cache:
-                logger.info("Caching playlist...")
-                cm3u = json.dumps(
-                    {
-                        "url": settings["m3u"],
-                        "array": array,
-                        "groups": groups,
-                        "m3u": m3u,
-                        "epgurl": epg_url,
-                        "movies": YukiData.movies,
-                    }
-                )
-                cm3uf = open(
-                    str(Path(LOCAL_DIR, "playlistcache.json")), "w", encoding="utf8"
-                )
-                cm3uf.write(cm3u)
-                cm3uf.close()
-                logger.info("Playlist cache saved!")
+            if m3u_tail is not None:
+                logger.info("Playlist first page loaded, loading the rest...")
+                # Cache is saved when whole playlist is loaded
+                m3u_cache_array = dict(array)
+                m3u_cache_groups = list(groups)
+            else:
+                logger.info("Playling loading done!")
+                if use_cache and not m3uFailed:
+                    logger.info("Caching playlist...")
+                    save_playlist_cache(
+                        str(Path(LOCAL_DIR, "playlist.cache")),
+                        settings["m3u"],
+                        get_playlist_validators(getattr(m3u_req, "headers", {})),
+                        array,
+                        groups,
+                        YukiData.movies,
+                        epg_url,
+                    )
+                    logger.info("Playlist cache saved!")
         else:
             logger.info("Using cached playlist")
-            cm3uf = open(
-                str(Path(LOCAL_DIR, "playlistcache.json")), "r", encoding="utf8"
-            )
-            cm3u = json.loads(cm3uf.read())
-            cm3uf.close()
-            array = cm3u["array"]
-            groups = cm3u["groups"]
-            m3u = cm3u["m3u"]
-            try:
-                epg_url = cm3u["epgurl"]
-                if epg_url and not settings["epg"]:
-                    settings["epg"] = epg_url
-            except Exception:
-                pass
-            try:
-                if "movies" in cm3u:
-                    YukiData.movies = cm3u["movies"]
-            except Exception:
-                pass
+            array = playlist_cache["array"]
+            groups = playlist_cache["groups"]
+            YukiData.movies = playlist_cache["movies"]
+            epg_url = playlist_cache["epgurl"]
+            if epg_url and not settings["epg"]:
+                settings["epg"] = epg_url
+            playlist_cache = None
+            m3u_loaded = True
 
         for ch3 in array.copy():
-            if settings["m3u"] in channel_sets:
-                if ch3 in channel_sets[settings["m3u"]]:
-                    if "group" in channel_sets[settings["m3u"]][ch3]:
-                        if channel_sets[settings["m3u"]][ch3]["group"]:
-                            array[ch3]["tvg-group"] = channel_sets[settings["m3u"]][
-                                ch3
-                            ]["group"]
-                            if (
-                                channel_sets[settings["m3u"]][ch3]["group"]
-                                not in groups
-                            ):
-                                groups.append(
-                                    channel_sets[settings["m3u"]][ch3]["group"]
-                                )
-                    if "hidden" in channel_sets[settings["m3u"]][ch3]:
-                        if channel_sets[settings["m3u"]][ch3]["hidden"]:
-                            array.pop(ch3)
+            apply_channel_sets(ch3)
 
         if _("All channels") in groups:
             groups.remove(_("All channels"))
         groups = [_("All channels"), _("Favourites")] + groups
 
-        if m3uFailed and os.path.isfile(str(Path(LOCAL_DIR, "playlistcache.json"))):
-            os.remove(str(Path(LOCAL_DIR, "playlistcache.json")))
+        if m3uFailed and os.path.isfile(str(Path(LOCAL_DIR, "playlist.cache"))):
+            os.remove(str(Path(LOCAL_DIR, "playlist.cache")))
 
-        try:
-            if os.path.isfile(str(Path(LOCAL_DIR, "settings.json"))):
-                settings_file2 = open(
-                    str(Path(LOCAL_DIR, "settings.json")), "r", encoding="utf8"
-                )
-                settings_file2_json = json.loads(settings_file2.read())
-                settings_file2.close()
-                if settings["epg"] and not settings_file2_json["epg"]:
-                    settings_file2_json["epg"] = settings["epg"]
-                    settings_file4 = open(
-                        str(Path(LOCAL_DIR, "settings.json")), "w", encoding="utf8"
+        def save_playlist_epg_url():
+            """Keep EPG URL from playlist in settings"""
+            try:
+                if os.path.isfile(str(Path(LOCAL_DIR, "settings.json"))):
+                    settings_file2 = open(
+                        str(Path(LOCAL_DIR, "settings.json")), "r", encoding="utf8"
                     )
-                    settings_file4.write(json.dumps(settings_file2_json))
-                    settings_file4.close()
-        except Exception:
-            pass
+                    settings_file2_json = json.loads(settings_file2.read())
+                    settings_file2.close()
+                    if settings["epg"] and not settings_file2_json["epg"]:
+                        settings_file2_json["epg"] = settings["epg"]
+                        settings_file4 = open(
+                            str(Path(LOCAL_DIR, "settings.json")), "w", encoding="utf8"
+                        )
+                        settings_file4.write(json.dumps(settings_file2_json))
+                        settings_file4.close()
+            except Exception:
+                pass
+
+        save_playlist_epg_url()
 
         def sigint_handler(*args):
             """Handler for the SIGINT signal."""
@@ -1353,16 +1441,21 @@ if __name__ == "__main__":
         def showonlychplaylist_chk_clk():
             update_tvguide_2()
 
+        tvguide_search_index = SearchIndexCache()
+
         def tvguide_channelfilter_do():
             try:
                 filter_txt3 = tvguidechannelfilter.text()
             except Exception:
                 filter_txt3 = ""
+            found6 = set(
+                tvguide_search_index.get(
+                    epg_win_checkbox.itemText(item6)
+                    for item6 in range(epg_win_checkbox.count())
+                ).find(filter_txt3)
+            )
             for item6 in range(epg_win_checkbox.count()):
-                if (
-                    unidecode(filter_txt3).lower().strip()
-                    in unidecode(epg_win_checkbox.itemText(item6)).lower().strip()
-                ):
+                if item6 in found6:
                     epg_win_checkbox.view().setRowHidden(item6, False)
                 else:
                     epg_win_checkbox.view().setRowHidden(item6, True)
@@ -1726,54 +1819,60 @@ if __name__ == "__main__":
         settings_win_l.setY(origY)
         settings_win.move(qr.topLeft())
 
-        ffmpeg_processes = []
+        # Ids of recordings started by scheduler
+        scheduled_records = []
 
-        init_record(show_exception, ffmpeg_processes)
+        init_record(show_exception)
 
-        def convert_time(times_1):
-            yr = time.strftime("%Y", time.localtime())
-            yr = yr[0] + yr[1]
-            times_1_sp = times_1.split(" ")
-            times_1_sp_0 = times_1_sp[0].split(".")
-            times_1_sp_0[2] = yr + times_1_sp_0[2]
-            times_1_sp[0] = ".".join(times_1_sp_0)
-            return " ".join(times_1_sp)
+        def play_timeshift():
+            logger.info(f"Timeshift: {int(timeshift.behind)} seconds behind live")
+            mpv_override_play(
+                timeshift.index_file,
+                playing_chan,
+                f"live_start_index={timeshift.get_start_index()}",
+            )
 
         def programme_clicked(item):
-            times = item.text().split("\n")[0]
-            start_time = convert_time(times.split(" - ")[0])
-            end_time = convert_time(times.split(" - ")[1])
+            programme_1 = item.data(QtCore.Qt.ItemDataRole.UserRole)
             starttime_w.setDateTime(
-                QtCore.QDateTime.fromString(start_time, "d.M.yyyy hh:mm")
+                QtCore.QDateTime.fromSecsSinceEpoch(int(programme_1.start))
             )
             endtime_w.setDateTime(
-                QtCore.QDateTime.fromString(end_time, "d.M.yyyy hh:mm")
+                QtCore.QDateTime.fromSecsSinceEpoch(int(programme_1.stop))
             )
 
+        def add_planned_record(channel_name, start_time_r, end_time_r):
+            try:
+                recording_scheduler.add(channel_name, start_time_r, end_time_r)
+            except Exception as e_add:
+                logger.warning(str(e_add))
+                return
+            update_planned_records()
+
         def addrecord_clicked():
-            selected_chan = choosechannel_ch.currentText()
-            if qt_library == "PyQt6":
-                start_time_r = (
-                    starttime_w.dateTime().toPython().strftime("%d.%m.%y %H:%M")
-                )
-                end_time_r = endtime_w.dateTime().toPython().strftime("%d.%m.%y %H:%M")
-            else:
-                start_time_r = (
-                    starttime_w.dateTime().toPyDateTime().strftime("%d.%m.%y %H:%M")
-                )
-                end_time_r = (
-                    endtime_w.dateTime().toPyDateTime().strftime("%d.%m.%y %H:%M")
-                )
-            schedulers.addItem(
-                _("Channel") + ": " + selected_chan + "\n"
-                "{}: ".format(_("Start record time")) + start_time_r + "\n"
-                "{}: ".format(_("End record time")) + end_time_r + "\n"
+            add_planned_record(
+                choosechannel_ch.currentText(),
+                starttime_w.dateTime().toSecsSinceEpoch(),
+                endtime_w.dateTime().toSecsSinceEpoch(),
             )
 
-        sch_recordings = {}
+        def programme_double_clicked(item):
+            programme_1 = item.data(QtCore.Qt.ItemDataRole.UserRole)
+            add_planned_record(
+                choosechannel_ch.currentText(), programme_1.start, programme_1.stop
+            )
+
+        def get_record_segment_options():
+            """Segmented recording settings, None to record to one file"""
+            if not settings["recsegment"]:
+                return None
+            return {
+                "time": settings["recsegment"] * 60,
+                "max_size": settings["recmaxsize"] * 1024**3,
+                "max_age": settings["recmaxage"] * 3600,
+            }
 
-        def do_start_record(name1):
-            ch_name = name1.split("_")[0]
+        def do_start_record(ch_name):
             ch = ch_name.replace(" ", "_")
             for char in FORBIDDEN_CHARS:
                 ch = ch.replace(char, "")
@@ -1790,25 +1889,50 @@ if __name__ == "__main__":
                 out_file = str(
                     Path(save_folder, "recording_-_" + cur_time + "_-_" + ch + ".mkv")
                 )
+            segment_options = get_record_segment_options()
+            if segment_options:
+                # Folder with segments
+                out_file = os.path.splitext(out_file)[0]
             record_url = getArrayItem(ch_name)["url"]
-            return [
-                record_return(
-                    record_url,
-                    out_file,
-                    ch_name,
-                    f"Referer: {settings['referer']}",
-                    get_ua_ref_for_channel,
-                ),
-                time.time(),
+            record_id = record_return(
+                record_url,
                 out_file,
                 ch_name,
-            ]
+                f"Referer: {settings['referer']}",
+                get_ua_ref_for_channel,
+                segment_options,
+            )
+            scheduled_records.append(record_id)
+            return record_id
+
+        def do_stop_record(record_id):
+            stop_record(record_id)
+            release_record(record_id)
 
-        def do_stop_record(name2):
-            if name2 in sch_recordings:
-                ffmpeg_process = sch_recordings[name2][0]
-                if ffmpeg_process:
-                    ffmpeg_process.terminate()
+        recording_scheduler = RecordingScheduler(
+            str(Path(LOCAL_DIR, "scheduler.json")), do_start_record, do_stop_record
+        )
+        sch_recordings = recording_scheduler.active
+
+        timeshift = Timeshift(
+            str(Path(LOCAL_DIR, "timeshift")),
+            settings["timeshift"] * 60,
+            lambda url, segment_dir, channel_name, segment_options: record_return(
+                url,
+                segment_dir,
+                channel_name,
+                f"Referer: {settings['referer']}",
+                get_ua_ref_for_channel,
+                segment_options,
+                # Buffer is not started by user, failures are only logged
+                report_errors=False,
+            ),
+            do_stop_record,
+            lambda record_id: (get_record_status(record_id) or {"segments": 0})[
+                "segments"
+            ],
+            is_record_running,
+        )
 
         recViaScheduler = False
 
@@ -1844,16 +1968,21 @@ if __name__ == "__main__":
                 activerec_list_value = activerec_list.verticalScrollBar().value()
                 activerec_list.clear()
                 for sch0 in sch_recordings:
-                    counted_time0 = format_seconds(
-                        time.time() - sch_recordings[sch0][1]
-                    )
-                    channel_name0 = sch_recordings[sch0][3]
-                    file_name0 = sch_recordings[sch0][2]
+                    record_status0 = get_record_status(sch_recordings[sch0])
+                    if record_status0 is None:
+                        continue
+                    counted_time0 = format_seconds(record_status0["time"])
                     file_size0 = "WAITING"
-                    if os.path.isfile(file_name0):
-                        file_size0 = convert_size(os.path.getsize(file_name0))
+                    if record_status0["size"]:
+                        file_size0 = convert_size(record_status0["size"])
+                    if record_status0["state"] == "retrying":
+                        file_size0 += " - " + _("Reconnecting")
                     activerec_list.addItem(
-                        channel_name0 + "\n" + counted_time0 + " " + file_size0
+                        record_status0["channel"]
+                        + "\n"
+                        + counted_time0
+                        + " "
+                        + file_size0
                     )
                 activerec_list.verticalScrollBar().setValue(activerec_list_value)
                 pl_text = "REC / " + _("Scheduler")
@@ -1886,80 +2015,62 @@ if __name__ == "__main__":
 
         def record_thread():
             try:
-                global is_recording, is_recording_old, ffmpeg_processes
+                global is_recording, is_recording_old
                 if is_recording != is_recording_old:
                     is_recording_old = is_recording
                     if is_recording:
                         set_record_stop_icon()
                     else:
                         set_record_icon()
-                status = _("No planned recordings")
-                sch_items = [
-                    str(schedulers.item(i1).text()) for i1 in range(schedulers.count())
-                ]
-                i3 = -1
-                for sch_item in sch_items:
-                    i3 += 1
-                    status = _("Waiting for record")
-                    sch_item = [i2.split(": ")[1] for i2 in sch_item.split("\n") if i2]
-                    channel_name_rec = sch_item[0]
-                    current_time = time.strftime("%d.%m.%y %H:%M", time.localtime())
-                    start_time_1 = sch_item[1]
-                    end_time_1 = sch_item[2]
-                    array_name = (
-                        str(channel_name_rec)
-                        + "_"
-                        + str(start_time_1)
-                        + "_"
-                        + str(end_time_1)
-                    )
-                    if start_time_1 == current_time:
-                        if array_name not in sch_recordings:
-                            st_planned = (
-                                "Starting planned record"
-                                + " (start_time='{}' end_time='{}' channel='{}')"
-                            )
-                            logger.info(
-                                st_planned.format(
-                                    start_time_1, end_time_1, channel_name_rec
-                                )
-                            )
-                            sch_recordings[array_name] = do_start_record(array_name)
-                            ffmpeg_processes.append(sch_recordings[array_name])
-                    if end_time_1 == current_time:
-                        if array_name in sch_recordings:
-                            schedulers.takeItem(i3)
-                            stop_planned = (
-                                "Stopping planned record"
-                                + " (start_time='{}' end_time='{}' channel='{}')"
-                            )
-                            logger.info(
-                                stop_planned.format(
-                                    start_time_1, end_time_1, channel_name_rec
-                                )
-                            )
-                            do_stop_record(array_name)
-                            sch_recordings.pop(array_name)
-                    if sch_recordings:
-                        status = _("Recording")
-                statusrec_lbl.setText("{}: {}".format(_("Status"), status))
             except Exception:
                 pass
 
+        def update_planned_records():
+            """Show planned recordings and arm timer for next one"""
+            schedulers.clear()
+            for job in recording_scheduler.get_jobs():
+                job_item = QtWidgets.QListWidgetItem(
+                    _("Channel")
+                    + ": "
+                    + job["channel"]
+                    + "\n"
+                    + "{}: ".format(_("Start record time"))
+                    + time.strftime("%d.%m.%y %H:%M", time.localtime(job["start"]))
+                    + "\n"
+                    + "{}: ".format(_("End record time"))
+                    + time.strftime("%d.%m.%y %H:%M", time.localtime(job["stop"]))
+                    + "\n"
+                )
+                job_item.setData(QtCore.Qt.ItemDataRole.UserRole, job["id"])
+                schedulers.addItem(job_item)
+            if sch_recordings:
+                status = _("Recording")
+            elif schedulers.count():
+                status = _("Waiting for record")
+            else:
+                status = _("No planned recordings")
+            statusrec_lbl.setText("{}: {}".format(_("Status"), status))
+            scheduler_wait = recording_scheduler.get_wait()
+            if scheduler_wait is None:
+                scheduler_timer.stop()
+            else:
+                scheduler_timer.start(int(scheduler_wait * 1000))
+
+        def scheduler_timer_timeout():
+            recording_scheduler.run()
+            update_planned_records()
+
+        scheduler_timer = QtCore.QTimer()
+        scheduler_timer.setSingleShot(True)
+        scheduler_timer.timeout.connect(scheduler_timer_timeout)
+
         def delrecord_clicked():
             schCurrentRow = schedulers.currentRow()
             if schCurrentRow != -1:
-                sch_index = "_".join(
-                    [
-                        xs.split(": ")[1]
-                        for xs in schedulers.item(schCurrentRow).text().split("\n")
-                        if xs
-                    ]
+                recording_scheduler.remove(
+                    schedulers.item(schCurrentRow).data(QtCore.Qt.ItemDataRole.UserRole)
                 )
-                schedulers.takeItem(schCurrentRow)
-                if sch_index in sch_recordings:
-                    do_stop_record(sch_index)
-                    sch_recordings.pop(sch_index)
+                update_planned_records()
 
         scheduler_widget = QtWidgets.QWidget()
         scheduler_layout = QtWidgets.QGridLayout()
@@ -1979,21 +2090,27 @@ if __name__ == "__main__":
         choosechannel_ch = QtWidgets.QComboBox()
         tvguide_sch = QtWidgets.QListWidget()
         tvguide_sch.itemClicked.connect(programme_clicked)
+        tvguide_sch.itemDoubleClicked.connect(programme_double_clicked)
         addrecord_btn = QtWidgets.QPushButton(_("Add"))
         addrecord_btn.clicked.connect(addrecord_clicked)
         delrecord_btn = QtWidgets.QPushButton(_("Remove"))
         delrecord_btn.clicked.connect(delrecord_clicked)
 
+        scheduler_search_index = SearchIndexCache()
+
         def scheduler_channelfilter_do():
             try:
                 filter_txt2 = schedulerchannelfilter.text()
             except Exception:
                 filter_txt2 = ""
+            found5 = set(
+                scheduler_search_index.get(
+                    choosechannel_ch.itemText(item5)
+                    for item5 in range(choosechannel_ch.count())
+                ).find(filter_txt2)
+            )
             for item5 in range(choosechannel_ch.count()):
-                if (
-                    unidecode(filter_txt2).lower().strip()
-                    in unidecode(choosechannel_ch.itemText(item5)).lower().strip()
-                ):
+                if item5 in found5:
                     choosechannel_ch.view().setRowHidden(item5, False)
                 else:
                     choosechannel_ch.view().setRowHidden(item5, True)
@@ -2492,7 +2609,7 @@ if __name__ == "__main__":
                         referer_ref = channel_config["ref"]
             return useragent_ref, referer_ref
 
-        def mpv_override_play(arg_override_play, channel_name1=""):
+        def mpv_override_play(arg_override_play, channel_name1="", demuxer_lavf_o=""):
             global event_handler
             on_before_play()
             useragent_ref, referer_ref = get_ua_ref_for_channel(channel_name1)
@@ -2545,7 +2662,9 @@ if __name__ == "__main__":
                 player.demuxer_max_back_bytes = 0
             else:
                 try:
-                    player.demuxer_lavf_o = "cenc_decryption_key="
+                    player.demuxer_lavf_o = (
+                        demuxer_lavf_o if demuxer_lavf_o else "cenc_decryption_key="
+                    )
                 except Exception:
                     pass
                 if YukiData.settings_changed:
@@ -2710,6 +2829,15 @@ if __name__ == "__main__":
                 else "",
             }
             save_channel_sets()
+            # EPG name from settings may have changed
+            if chan_3 in array:
+                get_epg_names()[chan_3.lower()] = resolve_epg_name(
+                    chan_3,
+                    array[chan_3],
+                    channel_sets[settings["m3u"]],
+                    programmes,
+                    prog_ids,
+                )[0]
             if playing_chan == chan_3:
                 player.deinterlace = deinterlace_chk.isChecked()
                 player.contrast = contrast_choose.value()
@@ -2871,14 +2999,14 @@ if __name__ == "__main__":
             if udp_proxy_text and not udp_proxy_starts:
                 udp_proxy_text = "http://" + udp_proxy_text
             if udp_proxy_text:
-                if os.path.isfile(str(Path(LOCAL_DIR, "playlistcache.json"))):
-                    os.remove(str(Path(LOCAL_DIR, "playlistcache.json")))
+                if os.path.isfile(str(Path(LOCAL_DIR, "playlist.cache"))):
+                    os.remove(str(Path(LOCAL_DIR, "playlist.cache")))
             if settings["epgoffset"] != soffset.value():
                 if os.path.isfile(str(Path(LOCAL_DIR, "epg.cache"))):
                     os.remove(str(Path(LOCAL_DIR, "epg.cache")))
             if sort_widget.currentIndex() != settings["sort"]:
-                if os.path.isfile(str(Path(LOCAL_DIR, "playlistcache.json"))):
-                    os.remove(str(Path(LOCAL_DIR, "playlistcache.json")))
+                if os.path.isfile(str(Path(LOCAL_DIR, "playlist.cache"))):
+                    os.remove(str(Path(LOCAL_DIR, "playlist.cache")))
             sfld_text = sfld.text()
             HOME_SYMBOL = "~"
             try:
@@ -2926,10 +3054,15 @@ if __name__ == "__main__":
                 "showplaylistmouse": showplaylistmouse_flag.isChecked(),
                 "channellogos": channellogos_select.currentIndex(),
                 "nocacheepg": nocacheepg_flag.isChecked(),
+                "epgmerge": epgmerge_select.currentIndex(),
                 "scrrecnosubfolders": scrrecnosubfolders_flag.isChecked(),
+                "recsegment": recsegment_choose.value(),
+                "recmaxsize": recmaxsize_choose.value(),
+                "recmaxage": recmaxage_choose.value(),
                 "hidetvprogram": hidetvprogram_flag.isChecked(),
                 "showcontrolsmouse": showcontrolsmouse_flag.isChecked(),
                 "catchupenable": catchupenable_flag.isChecked(),
+                "timeshift": timeshift_choose.value(),
                 "flpopacity": flpopacity_input.value(),
                 "panelposition": panelposition_choose.currentIndex(),
                 "videoaspect": videoaspect_def_choose.currentIndex(),
@@ -2940,6 +3073,9 @@ if __name__ == "__main__":
             if catchupenable_flag.isChecked() != settings_old["catchupenable"]:
                 if os.path.exists(str(Path(LOCAL_DIR, "epg.cache"))):
                     os.remove(str(Path(LOCAL_DIR, "epg.cache")))
+            if epgmerge_select.currentIndex() != settings_old["epgmerge"]:
+                if os.path.exists(str(Path(LOCAL_DIR, "epg.cache"))):
+                    os.remove(str(Path(LOCAL_DIR, "epg.cache")))
             settings_file1 = open(
                 str(Path(LOCAL_DIR, "settings.json")), "w", encoding="utf8"
             )
@@ -2974,7 +3110,14 @@ if __name__ == "__main__":
             save_settings()
 
         def do_clear_logo_cache():
+            global channel_logos_process, channel_logos_request_old
             logger.info("Clearing channel logos cache...")
+            # Logo service keeps cache manifest in memory, start it again
+            if channel_logos_process and channel_logos_process.is_alive():
+                channel_logos_process.kill()
+            channel_logos_process = None
+            channel_logos_request_old = {}
+            channel_logo_files.clear()
             if os.path.isdir(Path(LOCAL_DIR, "logo_cache")):
                 channel_logos = os.listdir(Path(LOCAL_DIR, "logo_cache"))
                 for channel_logo in channel_logos:
@@ -3033,8 +3176,8 @@ if __name__ == "__main__":
         sclose.clicked.connect(close_settings)
 
         def update_m3u():
-            if os.path.isfile(str(Path(LOCAL_DIR, "playlistcache.json"))):
-                os.remove(str(Path(LOCAL_DIR, "playlistcache.json")))
+            if os.path.isfile(str(Path(LOCAL_DIR, "playlist.cache"))):
+                os.remove(str(Path(LOCAL_DIR, "playlist.cache")))
             save_settings()
 
         sm3ufile = QtWidgets.QPushButton()
@@ -3234,12 +3377,47 @@ if __name__ == "__main__":
         nocacheepg_flag = QtWidgets.QCheckBox()
         nocacheepg_flag.setChecked(settings["nocacheepg"])
 
+        epgmerge_label = QtWidgets.QLabel(
+            "{}:".format(_("Channels present in several EPG sources"))
+        )
+        epgmerge_select = QtWidgets.QComboBox()
+        epgmerge_select.addItem(_("Use last source"))
+        epgmerge_select.addItem(_("Use first source"))
+        epgmerge_select.addItem(_("Combine all sources"))
+        epgmerge_select.setCurrentIndex(settings["epgmerge"])
+
         scrrecnosubfolders_label = QtWidgets.QLabel(
             "{}:".format(_("Do not create screenshots\nand recordings subfolders"))
         )
         scrrecnosubfolders_flag = QtWidgets.QCheckBox()
         scrrecnosubfolders_flag.setChecked(settings["scrrecnosubfolders"])
 
+        recsegment_label = QtWidgets.QLabel(
+            "{}:".format(_("Split recordings into segments"))
+        )
+        recsegment_choose = QtWidgets.QSpinBox()
+        recsegment_choose.setMinimum(0)
+        recsegment_choose.setMaximum(1440)
+        recsegment_choose.setSuffix(" " + _("min"))
+        recsegment_choose.setSpecialValueText(_("No"))
+        recsegment_choose.setValue(settings["recsegment"])
+
+        recmaxsize_label = QtWidgets.QLabel("{}:".format(_("Keep segments up to")))
+        recmaxsize_choose = QtWidgets.QSpinBox()
+        recmaxsize_choose.setMinimum(0)
+        recmaxsize_choose.setMaximum(10000)
+        recmaxsize_choose.setSuffix(" GB")
+        recmaxsize_choose.setSpecialValueText(_("No limit"))
+        recmaxsize_choose.setValue(settings["recmaxsize"])
+
+        recmaxage_label = QtWidgets.QLabel("{}:".format(_("Keep segments for")))
+        recmaxage_choose = QtWidgets.QSpinBox()
+        recmaxage_choose.setMinimum(0)
+        recmaxage_choose.setMaximum(8760)
+        recmaxage_choose.setSuffix(" " + _("h"))
+        recmaxage_choose.setSpecialValueText(_("No limit"))
+        recmaxage_choose.setValue(settings["recmaxage"])
+
         hidetvprogram_label = QtWidgets.QLabel(
             "{}:".format(_("Hide the current television program"))
         )
@@ -3272,6 +3450,16 @@ if __name__ == "__main__":
         catchupenable_flag = QtWidgets.QCheckBox()
         catchupenable_flag.setChecked(settings["catchupenable"])
 
+        timeshift_label = QtWidgets.QLabel(
+            "{}:".format(_("Local timeshift for live channels"))
+        )
+        timeshift_choose = QtWidgets.QSpinBox()
+        timeshift_choose.setMinimum(0)
+        timeshift_choose.setMaximum(240)
+        timeshift_choose.setSuffix(" " + _("min"))
+        timeshift_choose.setSpecialValueText(_("No"))
+        timeshift_choose.setValue(settings["timeshift"])
+
         tabs = QtWidgets.QTabWidget()
 
         tab_main = QtWidgets.QWidget()
@@ -3309,6 +3497,12 @@ if __name__ == "__main__":
         # tab_main.layout.addWidget(supdate, 3, 1)
         tab_main.layout.addWidget(openprevchan_label, 3, 0)
         tab_main.layout.addWidget(openprevchan_flag, 3, 1)
+        tab_main.layout.addWidget(recsegment_label, 4, 0)
+        tab_main.layout.addWidget(recsegment_choose, 4, 1)
+        tab_main.layout.addWidget(recmaxsize_label, 5, 0)
+        tab_main.layout.addWidget(recmaxsize_choose, 5, 1)
+        tab_main.layout.addWidget(recmaxage_label, 6, 0)
+        tab_main.layout.addWidget(recmaxage_choose, 6, 1)
         tab_main.setLayout(tab_main.layout)
 
         tab_video.layout = QtWidgets.QGridLayout()
@@ -3379,6 +3573,8 @@ if __name__ == "__main__":
         )
         tab_catchup.layout.addWidget(catchupenable_label, 0, 0)
         tab_catchup.layout.addWidget(catchupenable_flag, 0, 1)
+        tab_catchup.layout.addWidget(timeshift_label, 1, 0)
+        tab_catchup.layout.addWidget(timeshift_choose, 1, 1)
         tab_catchup.setLayout(tab_catchup.layout)
 
         tab_epg.layout = QtWidgets.QGridLayout()
@@ -3392,6 +3588,8 @@ if __name__ == "__main__":
         tab_epg.layout.addWidget(donot_flag, 0, 1)
         tab_epg.layout.addWidget(nocacheepg_label, 1, 0)
         tab_epg.layout.addWidget(nocacheepg_flag, 1, 1)
+        tab_epg.layout.addWidget(epgmerge_label, 2, 0)
+        tab_epg.layout.addWidget(epgmerge_select, 2, 1)
         tab_epg.setLayout(tab_epg.layout)
 
         tab_other.layout = QtWidgets.QGridLayout()
@@ -3737,8 +3935,8 @@ if __name__ == "__main__":
 
         def reload_playlist():
             logger.info("Reloading playlist...")
-            if os.path.isfile(str(Path(LOCAL_DIR, "playlistcache.json"))):
-                os.remove(str(Path(LOCAL_DIR, "playlistcache.json")))
+            if os.path.isfile(str(Path(LOCAL_DIR, "playlist.cache"))):
+                os.remove(str(Path(LOCAL_DIR, "playlist.cache")))
             save_settings()
 
         def playlists_selected():
@@ -4576,16 +4774,9 @@ if __name__ == "__main__":
                     channel_name = channel_name[: MAX_CHAN_SIZE - 3] + "..."
                 setChanText("  " + channel_name)
                 current_prog = None
-                jlower = j.lower()
-                try:
-                    jlower = prog_match_arr[jlower]
-                except Exception:
-                    pass
+                jlower = get_epg_name(j)
                 if settings["epg"] and jlower in programmes:
-                    for pr in programmes[jlower]:
-                        if time.time() > pr["start"] and time.time() < pr["stop"]:
-                            current_prog = pr
-                            break
+                    current_prog = get_programme_index().get_current(jlower)
                 show_progress(current_prog)
                 if start_label.isVisible():
                     dockWidget2.setFixedHeight(DOCK_WIDGET2_HEIGHT_HIGH)
@@ -4604,6 +4795,10 @@ if __name__ == "__main__":
                     doPlay(play_url, ua_choose, j)
                 else:
                     doPlay(custom_url, ua_choose, j)
+                if settings["timeshift"] and not archived:
+                    timeshift.start(j, play_url)
+                else:
+                    timeshift.stop()
                 btn_update.click()
 
         item_selected = ""
@@ -4619,6 +4814,12 @@ if __name__ == "__main__":
 
         def mpv_play():
             player.pause = not player.pause
+            if timeshift.is_active(playing_chan):
+                was_live = not timeshift.behind
+                timeshift.set_paused(player.pause)
+                # Paused live stream continues from timeshift
+                if was_live and timeshift.behind >= TIMESHIFT_SEGMENT_TIME:
+                    play_timeshift()
 
         def mpv_stop():
             global playing, playing_chan, playing_group, playing_url
@@ -4628,6 +4829,7 @@ if __name__ == "__main__":
             hideLoading()
             setChanText("")
             playing = False
+            timeshift.stop()
             stopPlayer()
             player.loop = True
             player.deinterlace = False
@@ -4909,7 +5111,8 @@ if __name__ == "__main__":
 
         dockWidget = QtWidgets.QDockWidget(win)
 
-        win.listWidget = QtWidgets.QListWidget()
+        win.listWidget = ChannelListView(lambda k0, i: get_channel_row(k0, i))
+        win.listWidget.placeholder_text = _("Nothing found")
         win.moviesWidget = QtWidgets.QListWidget()
         win.seriesWidget = QtWidgets.QListWidget()
 
@@ -4984,27 +5187,39 @@ if __name__ == "__main__":
         if not os.path.isdir(str(Path(LOCAL_DIR, "logo_cache"))):
             os.mkdir(str(Path(LOCAL_DIR, "logo_cache")))
 
-        def get_of_txt(of_num):
-            # try:
-            #     of_txt = gettext.ngettext("of %d", "", of_num) % of_num
-            # except Exception:
-            #     of_txt = f"of {of_num}"
-            # return of_txt
-            return _("of") + " " + str(of_num)
-
-        prog_match_arr = {}
-
         channel_logos_request_old = {}
         channel_logos_process = None
-        multiprocessing_manager_dict["logos_inprogress"] = False
-        multiprocessing_manager_dict["logos_completed"] = False
+        channel_logos_queue = None
+        # Channel name -> [M3U logo, EPG logo], filled from logo service
+        channel_logo_files = {}
         logos_cache = {}
+        logo_atlas = LogoAtlas(str(Path(LOCAL_DIR, "logo_cache")))
 
         def get_pixmap_from_filename(pixmap_filename):
             if pixmap_filename in logos_cache:
                 return logos_cache[pixmap_filename]
             else:
                 try:
+                    # Downloaded logos are taken from atlas, without opening file
+                    logo_tile = None
+                    if os.path.dirname(pixmap_filename) == str(
+                        Path(LOCAL_DIR, "logo_cache")
+                    ):
+                        logo_tile = logo_atlas.get_tile(
+                            os.path.basename(pixmap_filename)
+                        )
+                    if logo_tile:
+                        logos_cache[pixmap_filename] = QtGui.QIcon(
+                            QtGui.QPixmap.fromImage(
+                                QtGui.QImage(
+                                    logo_tile,
+                                    LOGO_TILE_SIZE,
+                                    LOGO_TILE_SIZE,
+                                    QtGui.QImage.Format.Format_RGBA8888,
+                                )
+                            )
+                        )
+                        return logos_cache[pixmap_filename]
                     if os.path.isfile(pixmap_filename):
                         icon_pixmap = QtGui.QIcon(pixmap_filename)
                         logos_cache[pixmap_filename] = icon_pixmap
@@ -5015,124 +5230,228 @@ if __name__ == "__main__":
                 except Exception:
                     return None
 
-        thread_logos_update_lock = False
-
-        def thread_logos_update():
-            global thread_logos_update_lock, multiprocessing_manager_dict
-            try:
-                if not thread_logos_update_lock:
-                    thread_logos_update_lock = True
-                    if multiprocessing_manager_dict["logos_completed"]:
-                        multiprocessing_manager_dict["logos_completed"] = False
-                        btn_update.click()
-                    thread_logos_update_lock = False
-            except Exception:
-                pass
-
-        class PlaylistWidget(QtWidgets.QWidget):
-            def __init__(self, parent=None):
-                super().__init__(parent)
-
-                self.name_label = QtWidgets.QLabel()
-                myFont = QtGui.QFont()
-                myFont.setBold(True)
-                self.name_label.setFont(myFont)
-                self.description_label = QtWidgets.QLabel()
-
-                self.icon_label = QtWidgets.QLabel()
-                self.progress_label = QtWidgets.QLabel()
-                self.progress_bar = QtWidgets.QProgressBar()
-                self.progress_bar.setFixedHeight(15)
-                self.end_label = QtWidgets.QLabel()
-                self.opacity = QtWidgets.QGraphicsOpacityEffect()
-                self.opacity.setOpacity(100)
-
-                self.layout = QtWidgets.QVBoxLayout()
-                self.layout.addWidget(self.name_label)
-                self.layout.addWidget(self.description_label)
-                self.layout.setSpacing(5)
-
-                self.layout1 = QtWidgets.QGridLayout()
-                self.layout1.addWidget(self.progress_label, 0, 0)
-                self.layout1.addWidget(self.progress_bar, 0, 1)
-                self.layout1.addWidget(self.end_label, 0, 2)
-
-                self.layout2 = QtWidgets.QGridLayout()
-                self.layout2.setAlignment(QtCore.Qt.AlignmentFlag.AlignLeft)
-                self.layout2.addWidget(self.icon_label, 0, 0)
-                self.layout2.addLayout(self.layout, 0, 1)
-                self.layout2.setSpacing(10)
-
-                self.layout3 = QtWidgets.QVBoxLayout()
-                self.layout3.addLayout(self.layout2)
-                self.layout3.addLayout(self.layout1)
-
-                self.setLayout(self.layout3)
-
-                self.progress_bar.setStyleSheet(
-                    """
-                  background-color: #C0C6CA;
-                  border: 0px;
-                  padding: 0px;
-                  height: 5px;
-                """
-                )
-                self.setStyleSheet(
-                    """
-                  QProgressBar::chunk {
-                    background: #7D94B0;
-                    width:5px
-                  }
-                """
-                )
-
-            def setDescription(self, text, tooltip):
-                self.setToolTip(tooltip)
-                self.description_label.setText(text)
+        class ChannelLogosReceiver(QtCore.QObject):
+            logo_received = Signal(tuple)
 
-            def setIcon(self, image):
-                self.icon_label.setPixmap(image.pixmap(QtCore.QSize(32, 32)))
-
-            def setProgress(self, progress_val):
-                self.opacity.setOpacity(100)
-                self.progress_bar.setGraphicsEffect(self.opacity)
-                self.progress_bar.setFormat("")
-                self.progress_bar.setValue(progress_val)
-
-            def hideProgress(self):
-                self.opacity.setOpacity(0)
-                self.progress_bar.setGraphicsEffect(self.opacity)
-
-            def showDescription(self):
-                self.description_label.show()
-                self.progress_label.show()
-                self.progress_bar.show()
-                self.end_label.show()
+        def channel_logos_receiver_thread(logos_process, logos_queue):
+            """Passes logos from logo service to main thread"""
+            while logos_process.is_alive() or not logos_queue.empty():
+                try:
+                    channel_logos_receiver.logo_received.emit(
+                        logos_queue.get(timeout=1)
+                    )
+                except queue.Empty:
+                    pass
+                except Exception:
+                    logger.warning("Failed to receive channel logo")
+                    logger.warning(traceback.format_exc())
+                    break
 
-            def hideDescription(self):
-                self.description_label.hide()
-                self.progress_label.hide()
-                self.progress_bar.hide()
-                self.end_label.hide()
+        def channel_logo_received(logo_result):
+            if channel_logos_process and channel_logos_process.is_alive():
+                channel_logo_files[logo_result[0]] = logo_result[1]
+                # Many logos are coming at once, redraw once for them
+                if not channel_logos_redraw_timer.isActive():
+                    channel_logos_redraw_timer.start()
+
+        channel_logos_receiver = ChannelLogosReceiver()
+        channel_logos_receiver.logo_received.connect(channel_logo_received)
+        channel_logos_redraw_timer = QtCore.QTimer()
+        channel_logos_redraw_timer.setSingleShot(True)
+        channel_logos_redraw_timer.setInterval(250)
+        # New logos change only icons of rows on screen
+        channel_logos_redraw_timer.timeout.connect(
+            lambda: win.listWidget.model().refresh(win.listWidget.visible_rows())
+        )
 
         all_channels_lang = _("All channels")
         favourites_lang = _("Favourites")
 
-        def gen_chans():
-            global playing_chan, current_group, array, page_box, channelfilter
-            global prog_match_arr, channel_logos_request_old
-            global channel_logos_process, multiprocessing_manager_dict
+        def get_channel_logo(orig_chan_name):
+            channel_logo = TV_ICON
+            if settings["channellogos"] != 3:  # Do not load any logos
+                try:
+                    if orig_chan_name in channel_logo_files:
+                        logo_files = channel_logo_files[orig_chan_name]
+                        if settings["channellogos"] == 0:  # Prefer M3U
+                            logo_order = (logo_files[0], logo_files[1])
+                        elif settings["channellogos"] == 1:  # Prefer EPG
+                            logo_order = (logo_files[1], logo_files[0])
+                        else:  # Do not load from EPG (only M3U)
+                            logo_order = (logo_files[0],)
+                        for logo_file in logo_order:
+                            if logo_file:
+                                chan_logo = get_pixmap_from_filename(logo_file)
+                                if chan_logo:
+                                    channel_logo = chan_logo
+                                    break
+                except Exception:
+                    logger.warning("Set failed logos failed with exception")
+                    logger.warning(traceback.format_exc())
+            return channel_logo
+
+        def get_channel_row(k0, i):
+            """Contents of channel list row, called only for visible rows"""
+            prog = ""
+            prog_desc = ""
+            start_time = ""
+            stop_time = ""
+            percentage = None
+            prog_search = get_epg_name(i)
+            if prog_search in programmes:
+                current_prog = get_programme_index().get_current(prog_search)
+                if not current_prog:
+                    current_prog = {"start": 0, "stop": 0, "title": "", "desc": ""}
+                if current_prog["start"] != 0:
+                    start_time = datetime.datetime.fromtimestamp(
+                        current_prog["start"]
+                    ).strftime("%H:%M")
+                    stop_time = datetime.datetime.fromtimestamp(
+                        current_prog["stop"]
+                    ).strftime("%H:%M")
+                    t_t = time.time()
+                    percentage = round(
+                        (t_t - current_prog["start"])
+                        / (current_prog["stop"] - current_prog["start"])
+                        * 100
+                    )
+                    if settings["hideepgpercentage"]:
+                        prog = current_prog["title"]
+                    else:
+                        prog = str(percentage) + "% " + current_prog["title"]
+                    try:
+                        if current_prog["desc"]:
+                            prog_desc = "\n\n" + textwrap.fill(
+                                current_prog["desc"], 100
+                            )
+                        else:
+                            prog_desc = ""
+                    except Exception:
+                        prog_desc = ""
+            MAX_SIZE_CHAN = 21
+            chan_name = i
+            if len(chan_name) > MAX_SIZE_CHAN:
+                chan_name = chan_name[0:MAX_SIZE_CHAN] + "..."
+            unicode_play_symbol = chr(9654) + " "
+            append_symbol = ""
+            if playing_chan == chan_name:
+                append_symbol = unicode_play_symbol
+            MAX_SIZE = 28
+            orig_prog = prog
+            if len(prog) > MAX_SIZE:
+                prog = prog[0:MAX_SIZE] + "..."
+            if orig_prog and not settings["hideepgfromplaylist"]:
+                tooltip = (
+                    f"<b>{i}</b>" + "<br><br>" "<i>" + orig_prog + "</i>" + prog_desc
+                ).replace("\n", "<br>")
+            else:
+                prog = ""
+                tooltip = f"<b>{i}</b>"
+            return ChannelRow(
+                append_symbol + str(k0 + 1) + ". " + chan_name,
+                prog,
+                tooltip,
+                start_time,
+                stop_time,
+                percentage,
+                get_channel_logo(i),
+            )
 
+        def request_channel_logos():
+            """Fetch logos of channels which are shown now"""
+            global channel_logos_request_old, channel_logos_process
+            global channel_logos_queue
+            if settings["channellogos"] == 3:
+                return
             channel_logos_request = {}
-
+            for row in win.listWidget.visible_rows():
+                i = win.listWidget.model().channels[row]
+                try:
+                    channel_logo1 = ""
+                    if "tvg-logo" in array[i]:
+                        channel_logo1 = array[i]["tvg-logo"]
+
+                    epg_logo1 = ""
+                    prog_search = get_epg_name(i)
+                    # Do not load from EPG
+                    if settings["channellogos"] != 2 and prog_search in epg_icons:
+                        epg_logo1 = epg_icons[prog_search]
+
+                    req_data_ua, req_data_ref = get_ua_ref_for_channel(i)
+                    channel_logos_request[array[i]["title"]] = [
+                        channel_logo1,
+                        epg_logo1,
+                        req_data_ua,
+                        req_data_ref,
+                    ]
+                except Exception:
+                    logger.warning(f"Exception in channel logos (channel '{i}')")
+                    logger.warning(traceback.format_exc())
             try:
-                idx = (page_box.value() - 1) * 100
+                if channel_logos_request != channel_logos_request_old:
+                    channel_logos_request_old = channel_logos_request
+                    logger.debug("Channel logos request")
+                    # Logo service is started once, new requests
+                    # reorder its queue
+                    if (
+                        not channel_logos_process
+                        or not channel_logos_process.is_alive()
+                    ):
+                        channel_logos_queue = get_context("spawn").Queue()
+                        logos_queue = get_context("spawn").Queue()
+                        channel_logos_process = get_context("spawn").Process(
+                            name="[yuki-iptv] channel_logos_worker",
+                            target=channel_logos_worker,
+                            daemon=True,
+                            args=(
+                                channel_logos_queue,
+                                logos_queue,
+                            ),
+                        )
+                        channel_logos_process.start()
+                        threading.Thread(
+                            target=channel_logos_receiver_thread,
+                            name="[yuki-iptv] channel_logos_receiver",
+                            daemon=True,
+                            args=(channel_logos_process, logos_queue),
+                        ).start()
+                    channel_logos_queue.put(channel_logos_request)
             except Exception:
-                idx = 0
+                logger.warning("Fetch channel logos failed with exception:")
+                logger.warning(traceback.format_exc())
+
+        # Logos are requested when scrolling stops
+        channel_logos_timer = QtCore.QTimer()
+        channel_logos_timer.setSingleShot(True)
+        channel_logos_timer.setInterval(500)
+        channel_logos_timer.timeout.connect(request_channel_logos)
+        win.listWidget.verticalScrollBar().valueChanged.connect(
+            channel_logos_timer.start
+        )
+
+        channel_search_index = SearchIndexCache()
+
+        def gen_chans():
+            """Names of channels in current group matching search
+
+            Same list is returned until playlist, group, search text,
+            favourites or sorting is changed.
+            """
             try:
                 filter_txt = channelfilter.text()
             except Exception:
                 filter_txt = ""
+            channel_list_key = (
+                id(array),
+                YukiData.playlist_version,
+                current_group,
+                filter_txt,
+                settings["sort"],
+                id(channel_sort),
+                tuple(favourite_sets) if current_group == favourites_lang else None,
+            )
+            if channel_list_key == YukiData.channel_list_key:
+                return YukiData.channel_list
 
             # Group and favourites filter
             array_filtered = {}
@@ -5147,314 +5466,57 @@ if __name__ == "__main__":
                             continue
                 array_filtered[j1] = array[j1]
 
-            ch_array = {
-                x13: array_filtered[x13]
-                for x13 in array_filtered
-                if unidecode(filter_txt).lower().strip()
-                in unidecode(x13).lower().strip()
-            }
-            ch_array = list(ch_array.values())[idx : idx + 100]
-            ch_array = dict([(x14["title"], x14) for x14 in ch_array])
-            try:
-                if filter_txt:
-                    page_box.setMaximum(round(len(ch_array) / 100) + 1)
-                    of_lbl.setText(get_of_txt(round(len(ch_array) / 100) + 1))
-                else:
-                    page_box.setMaximum(round(len(array_filtered) / 100) + 1)
-                    of_lbl.setText(get_of_txt(round(len(array_filtered) / 100) + 1))
-            except Exception:
-                pass
-            res = {}
-            k0 = -1
-            k = 0
-            for i in doSort(ch_array):
-                k0 += 1
-                k += 1
-                prog = ""
-                prog_desc = ""
-                is_epgname_found = False
-
-                # First, match EPG name from settings
-                if (
-                    settings["m3u"] in channel_sets
-                    and i in channel_sets[settings["m3u"]]
-                ):
-                    if "epgname" in channel_sets[settings["m3u"]][i]:
-                        if channel_sets[settings["m3u"]][i]["epgname"]:
-                            epg_name = channel_sets[settings["m3u"]][i]["epgname"]
-                            if str(epg_name).lower() in programmes:
-                                prog_search = str(epg_name).lower()
-                                is_epgname_found = True
-
-                # Second, match from tvg-id
-                if not is_epgname_found:
-                    if array_filtered[i]["tvg-ID"]:
-                        if str(array_filtered[i]["tvg-ID"]) in prog_ids:
-                            prog_search_lst = prog_ids[str(array_filtered[i]["tvg-ID"])]
-                            if prog_search_lst:
-                                prog_search = prog_search_lst[0].lower()
-                                is_epgname_found = True
-
-                # Third, match from tvg-name
-                if not is_epgname_found:
-                    if array_filtered[i]["tvg-name"]:
-                        if str(array_filtered[i]["tvg-name"]).lower() in programmes:
-                            prog_search = str(array_filtered[i]["tvg-name"]).lower()
-                            is_epgname_found = True
-                        else:
-                            spaces_replaced_name = array_filtered[i][
-                                "tvg-name"
-                            ].replace(" ", "_")
-                            if str(spaces_replaced_name).lower() in programmes:
-                                prog_search = str(spaces_replaced_name).lower()
-                                is_epgname_found = True
-
-                # Last, match from channel name
-                if not is_epgname_found:
-                    prog_search = i.lower()
-                    is_epgname_found = True
-
-                prog_match_arr[i.lower()] = prog_search
-                if prog_search in programmes:
-                    current_prog = {"start": 0, "stop": 0, "title": "", "desc": ""}
-                    for pr in programmes[prog_search]:
-                        if time.time() > pr["start"] and time.time() < pr["stop"]:
-                            current_prog = pr
-                            break
-                    if current_prog["start"] != 0:
-                        start_time = datetime.datetime.fromtimestamp(
-                            current_prog["start"]
-                        ).strftime("%H:%M")
-                        stop_time = datetime.datetime.fromtimestamp(
-                            current_prog["stop"]
-                        ).strftime("%H:%M")
-                        t_t = time.time()
-                        percentage = round(
-                            (t_t - current_prog["start"])
-                            / (current_prog["stop"] - current_prog["start"])
-                            * 100
-                        )
-                        if settings["hideepgpercentage"]:
-                            prog = current_prog["title"]
-                        else:
-                            prog = str(percentage) + "% " + current_prog["title"]
-                        try:
-                            if current_prog["desc"]:
-                                prog_desc = "\n\n" + textwrap.fill(
-                                    current_prog["desc"], 100
-                                )
-                            else:
-                                prog_desc = ""
-                        except Exception:
-                            prog_desc = ""
-                    else:
-                        start_time = ""
-                        stop_time = ""
-                        t_t = time.time()
-                        percentage = 0
-                        prog = ""
-                        prog_desc = ""
-                MyPlaylistWidget = PlaylistWidget()
-                MAX_SIZE_CHAN = 21
-                chan_name = i
-
-                orig_chan_name = chan_name
-
-                if settings["channellogos"] != 3:
-                    try:
-                        channel_logo1 = ""
-                        if "tvg-logo" in array_filtered[i]:
-                            channel_logo1 = array_filtered[i]["tvg-logo"]
-
-                        epg_logo1 = ""
-                        if prog_search in epg_icons:
-                            epg_logo1 = epg_icons[prog_search]
-
-                        req_data_ua, req_data_ref = get_ua_ref_for_channel(
-                            orig_chan_name
-                        )
-                        channel_logos_request[array_filtered[i]["title"]] = [
-                            channel_logo1,
-                            epg_logo1,
-                            req_data_ua,
-                            req_data_ref,
-                        ]
-                    except Exception:
-                        logger.warning(f"Exception in channel logos (channel '{i}')")
-                        logger.warning(traceback.format_exc())
-
-                if len(chan_name) > MAX_SIZE_CHAN:
-                    chan_name = chan_name[0:MAX_SIZE_CHAN] + "..."
-                unicode_play_symbol = chr(9654) + " "
-                append_symbol = ""
-                if playing_chan == chan_name:
-                    append_symbol = unicode_play_symbol
-                MyPlaylistWidget.name_label.setText(
-                    append_symbol + str(k) + ". " + chan_name
-                )
-                MAX_SIZE = 28
-                orig_prog = prog
-                if len(prog) > MAX_SIZE:
-                    prog = prog[0:MAX_SIZE] + "..."
-                if (
-                    prog_search in programmes
-                    and orig_prog
-                    and not settings["hideepgfromplaylist"]
-                ):
-                    MyPlaylistWidget.setDescription(
-                        prog,
-                        (
-                            f"<b>{i}</b>" + "<br><br>"
-                            "<i>" + orig_prog + "</i>" + prog_desc
-                        ).replace("\n", "<br>"),
-                    )
-                    MyPlaylistWidget.showDescription()
-                    try:
-                        if start_time:
-                            MyPlaylistWidget.progress_label.setText(start_time)
-                            MyPlaylistWidget.end_label.setText(stop_time)
-                            MyPlaylistWidget.setProgress(int(percentage))
-                        else:
-                            MyPlaylistWidget.hideProgress()
-                    except Exception:
-                        logger.warning("Async EPG load problem, ignoring")
-                else:
-                    MyPlaylistWidget.setDescription("", f"<b>{i}</b>")
-                    MyPlaylistWidget.hideProgress()
-                    MyPlaylistWidget.hideDescription()
+            # Titles are indexed once, index is made again
+            # only if playlist changed
+            channels_index = channel_search_index.get(
+                array, (id(array), YukiData.playlist_version)
+            )
+            ch_array = array_filtered
+            if filter_txt.strip():
+                channels_found = channels_index.find_texts(filter_txt)
+                ch_array = {
+                    x13: array_filtered[x13]
+                    for x13 in array_filtered
+                    if x13 in channels_found
+                }
+            YukiData.channel_list_key = channel_list_key
+            YukiData.channel_list = list(doSort(ch_array))
+            return YukiData.channel_list
 
-                MyPlaylistWidget.setIcon(TV_ICON)
+        row0 = -1
 
-                if settings["channellogos"] != 3:  # Do not load any logos
-                    try:
-                        if f"LOGO:::{orig_chan_name}" in multiprocessing_manager_dict:
-                            if settings["channellogos"] == 0:  # Prefer M3U
-                                first_loaded = False
-                                if multiprocessing_manager_dict[
-                                    f"LOGO:::{orig_chan_name}"
-                                ][0]:
-                                    chan_logo = get_pixmap_from_filename(
-                                        multiprocessing_manager_dict[
-                                            f"LOGO:::{orig_chan_name}"
-                                        ][0]
-                                    )
-                                    if chan_logo:
-                                        first_loaded = True
-                                        MyPlaylistWidget.setIcon(chan_logo)
-                                if not first_loaded:
-                                    chan_logo = get_pixmap_from_filename(
-                                        multiprocessing_manager_dict[
-                                            f"LOGO:::{orig_chan_name}"
-                                        ][1]
-                                    )
-                                    if chan_logo:
-                                        MyPlaylistWidget.setIcon(chan_logo)
-                            elif settings["channellogos"] == 1:  # Prefer EPG
-                                first_loaded = False
-                                if multiprocessing_manager_dict[
-                                    f"LOGO:::{orig_chan_name}"
-                                ][1]:
-                                    chan_logo = get_pixmap_from_filename(
-                                        multiprocessing_manager_dict[
-                                            f"LOGO:::{orig_chan_name}"
-                                        ][1]
-                                    )
-                                    if chan_logo:
-                                        first_loaded = True
-                                        MyPlaylistWidget.setIcon(chan_logo)
-                                if not first_loaded:
-                                    chan_logo = get_pixmap_from_filename(
-                                        multiprocessing_manager_dict[
-                                            f"LOGO:::{orig_chan_name}"
-                                        ][0]
-                                    )
-                                    if chan_logo:
-                                        MyPlaylistWidget.setIcon(chan_logo)
-                            elif (
-                                settings["channellogos"] == 2
-                            ):  # Do not load from EPG (only M3U)
-                                if multiprocessing_manager_dict[
-                                    f"LOGO:::{orig_chan_name}"
-                                ][0]:
-                                    chan_logo = get_pixmap_from_filename(
-                                        multiprocessing_manager_dict[
-                                            f"LOGO:::{orig_chan_name}"
-                                        ][0]
-                                    )
-                                    if chan_logo:
-                                        MyPlaylistWidget.setIcon(chan_logo)
-                    except Exception:
-                        logger.warning("Set failed logos failed with exception")
-                        logger.warning(traceback.format_exc())
+        def redraw_chans():
+            global row0
+            channels_1 = gen_chans()
+            update_tvguide()
+            win.listWidget.set_show_description(
+                bool(programmes) and not settings["hideepgfromplaylist"]
+            )
+            row0 = win.listWidget.currentRow()
+            val0 = win.listWidget.verticalScrollBar().value()
+            if win.listWidget.model().set_channels(channels_1):
+                win.listWidget.setCurrentRow(row0)
+                win.listWidget.verticalScrollBar().setValue(val0)
+            else:
+                # Only rows on screen are checked, repainted if changed
+                win.listWidget.model().refresh(win.listWidget.visible_rows())
+            update_playing_progress()
+            channel_logos_timer.start()
 
-                # Create QListWidgetItem
-                myQListWidgetItem = QtWidgets.QListWidgetItem()
-                myQListWidgetItem.setData(QtCore.Qt.ItemDataRole.UserRole, i)
-                # Set size hint
-                myQListWidgetItem.setSizeHint(MyPlaylistWidget.sizeHint())
-                res[k0] = [myQListWidgetItem, MyPlaylistWidget, k0, i]
-            j1 = playing_chan.lower()
-            try:
-                j1 = prog_match_arr[j1]
-            except Exception:
-                pass
+        def update_playing_progress():
+            j1 = get_epg_name(playing_chan)
             if j1:
                 current_chan = None
                 try:
-                    cur = programmes[j1]
-                    for pr in cur:
-                        if time.time() > pr["start"] and time.time() < pr["stop"]:
-                            current_chan = pr
-                            break
+                    current_chan = get_programme_index().get_current(j1)
                 except Exception:
                     pass
                 show_progress(current_chan)
 
-            # Fetch channel logos
-            try:
-                if settings["channellogos"] != 3:
-                    if channel_logos_request != channel_logos_request_old:
-                        channel_logos_request_old = channel_logos_request
-                        logger.debug("Channel logos request")
-                        if channel_logos_process and channel_logos_process.is_alive():
-                            # logger.debug(
-                            #     "Old channel logos request found, stopping it"
-                            # )
-                            channel_logos_process.kill()
-                        channel_logos_process = get_context("spawn").Process(
-                            name="[yuki-iptv] channel_logos_worker",
-                            target=channel_logos_worker,
-                            daemon=True,
-                            args=(
-                                channel_logos_request,
-                                multiprocessing_manager_dict,
-                            ),
-                        )
-                        channel_logos_process.start()
-            except Exception:
-                logger.warning("Fetch channel logos failed with exception:")
-                logger.warning(traceback.format_exc())
-
-            return res
-
-        row0 = -1
-
-        def redraw_chans():
-            channels_1 = gen_chans()
-            global row0
-            update_tvguide()
-            row0 = win.listWidget.currentRow()
-            val0 = win.listWidget.verticalScrollBar().value()
-            win.listWidget.clear()
-            if channels_1:
-                for channel_1 in channels_1.values():
-                    chan_3 = channel_1
-                    win.listWidget.addItem(chan_3[0])
-                    win.listWidget.setItemWidget(chan_3[0], chan_3[1])
-            else:
-                win.listWidget.addItem(_("Nothing found"))
-            win.listWidget.setCurrentRow(row0)
-            win.listWidget.verticalScrollBar().setValue(val0)
+        def refresh_chans():
+            """Update programmes of channels on screen, list is not made again"""
+            win.listWidget.model().refresh(win.listWidget.visible_rows())
+            update_playing_progress()
 
         first_change = False
 
@@ -5477,7 +5539,7 @@ if __name__ == "__main__":
             if not first_playmode_change:
                 first_playmode_change = True
             else:
-                tv_widgets = [combobox, win.listWidget, widget4]
+                tv_widgets = [combobox, win.listWidget]
                 movies_widgets = [movies_combobox, win.moviesWidget]
                 series_widgets = [win.seriesWidget]
                 # Clear search text when play mode is changed
@@ -5521,13 +5583,11 @@ if __name__ == "__main__":
                     except Exception:
                         pass
 
-        channels = gen_chans()
-        modelA = []
-        for channel in channels:
-            # Add QListWidgetItem into QListWidget
-            modelA.append(channels[channel][3])
-            win.listWidget.addItem(channels[channel][0])
-            win.listWidget.setItemWidget(channels[channel][0], channels[channel][1])
+        modelA = gen_chans()
+        win.listWidget.set_show_description(
+            bool(programmes) and not settings["hideepgfromplaylist"]
+        )
+        win.listWidget.model().set_channels(modelA)
 
         def sort_upbtn_clicked():
             curIndex = sort_list.currentRow()
@@ -5781,17 +5841,11 @@ if __name__ == "__main__":
                     file02.close()
 
         def show_context_menu(pos):
-            is_continue = True
-            try:
-                is_continue = win.listWidget.selectedItems()[0].text() != _(
-                    "Nothing found"
-                )
-            except Exception:
-                pass
             try:
-                if is_continue:
+                if win.listWidget.indexAt(pos).isValid():
                     self = win.listWidget
-                    itemSelected_event(self.selectedItems()[0])
+                    self.setCurrentIndex(self.indexAt(pos))
+                    itemSelected_event(self.currentIndex())
                     menu = QtWidgets.QMenu()
                     menu.addAction(_("TV guide"), tvguide_context_menu)
                     menu.addAction(_("Hide TV guide"), tvguide_hide)
@@ -5809,12 +5863,15 @@ if __name__ == "__main__":
             QtCore.Qt.ContextMenuPolicy.CustomContextMenu
         )
         win.listWidget.customContextMenuRequested.connect(show_context_menu)
-        win.listWidget.currentItemChanged.connect(itemSelected_event)
-        win.listWidget.itemClicked.connect(itemSelected_event)
-        win.listWidget.itemDoubleClicked.connect(itemClicked_event)
+        win.listWidget.selectionModel().currentChanged.connect(
+            lambda current, previous: itemSelected_event(current)
+        )
+        win.listWidget.clicked.connect(itemSelected_event)
+        win.listWidget.doubleClicked.connect(itemClicked_event)
 
         def enterPressed():
-            itemClicked_event(win.listWidget.currentItem())
+            if win.listWidget.currentIndex().isValid():
+                itemClicked_event(win.listWidget.currentIndex())
 
         shortcuts = {}
         shortcuts_return = QShortcut(
@@ -5823,6 +5880,9 @@ if __name__ == "__main__":
             activated=enterPressed,
         )
 
+        movies_search_index = SearchIndexCache()
+        series_search_index = SearchIndexCache()
+
         def channelfilter_do():
             try:
                 filter_txt1 = channelfilter.text()
@@ -5831,13 +5891,14 @@ if __name__ == "__main__":
             if YukiData.playmodeIndex == 0:  # TV channels
                 btn_update.click()
             elif YukiData.playmodeIndex == 1:  # Movies
+                found3 = set(
+                    movies_search_index.get(
+                        win.moviesWidget.item(item3).text()
+                        for item3 in range(win.moviesWidget.count())
+                    ).find(filter_txt1)
+                )
                 for item3 in range(win.moviesWidget.count()):
-                    if (
-                        unidecode(filter_txt1).lower().strip()
-                        in unidecode(win.moviesWidget.item(item3).text())
-                        .lower()
-                        .strip()
-                    ):
+                    if item3 in found3:
                         win.moviesWidget.item(item3).setHidden(False)
                     else:
                         win.moviesWidget.item(item3).setHidden(True)
@@ -5846,13 +5907,17 @@ if __name__ == "__main__":
                     redraw_series()
                 except Exception:
                     logger.warning("redraw_series FAILED")
+                found4 = set(
+                    series_search_index.get(
+                        (
+                            win.seriesWidget.item(item4).text()
+                            for item4 in range(win.seriesWidget.count())
+                        ),
+                        (id(YukiData.series), len(YukiData.series)),
+                    ).find(filter_txt1)
+                )
                 for item4 in range(win.seriesWidget.count()):
-                    if (
-                        unidecode(filter_txt1).lower().strip()
-                        in unidecode(win.seriesWidget.item(item4).text())
-                        .lower()
-                        .strip()
-                    ):
+                    if item4 in found4:
                         win.seriesWidget.item(item4).setHidden(False)
                     else:
                         win.seriesWidget.item(item4).setHidden(True)
@@ -5879,6 +5944,7 @@ if __name__ == "__main__":
                 current_movies_group = movies_combobox.currentText()
                 if current_movies_group:
                     win.moviesWidget.clear()
+                    movies_search_index.clear()
                     currentMoviesGroup = {}
                     for movies1 in YukiData.movies:
                         if "tvg-group" in YukiData.movies[movies1]:
@@ -5894,6 +5960,7 @@ if __name__ == "__main__":
                                 ] = YukiData.movies[movies1]
             else:
                 win.moviesWidget.clear()
+                movies_search_index.clear()
                 win.moviesWidget.addItem(_("Nothing found"))
 
         def movies_play(mov_item):
@@ -5916,6 +5983,141 @@ if __name__ == "__main__":
         movies_combobox.currentIndexChanged.connect(movies_group_change)
         movies_group_change()
 
+        def xtream_loaded(movies, series):
+            """Show XTream VOD and series loaded in background"""
+            YukiData.movies.update(movies)
+            YukiData.series.update(series)
+            logger.info(
+                "XTream: {} movies, {} series".format(
+                    len(YukiData.movies), len(YukiData.series)
+                )
+            )
+            for movie in movies.values():
+                if "tvg-group" in movie and movie["tvg-group"] not in movies_groups:
+                    movies_groups.append(movie["tvg-group"])
+                    movies_combobox.addItem(movie["tvg-group"])
+            movies_group_change()
+            if not YukiData.serie_selected:
+                redraw_series()
+
+        def m3u_tail_batch_loaded(channels):
+            """Add channels of playlist which is still loading"""
+            movies_count = len(YukiData.movies)
+            series_count = len(YukiData.series)
+            groups_count = len(groups)
+            for m3u_datai in channels:
+                if add_playlist_channel(m3u_datai, array, groups):
+                    m3u_cache_array[m3u_datai["title"]] = m3u_datai
+                    if m3u_datai["tvg-group"] not in m3u_cache_groups:
+                        m3u_cache_groups.append(m3u_datai["tvg-group"])
+                    apply_channel_sets(m3u_datai["title"])
+            YukiData.playlist_version += 1
+            for group in groups[groups_count:]:
+                combobox.addItem(group)
+            if (
+                len(YukiData.movies) != movies_count
+                or len(YukiData.series) != series_count
+            ):
+                for movie in YukiData.movies.values():
+                    if "tvg-group" in movie and movie["tvg-group"] not in movies_groups:
+                        movies_groups.append(movie["tvg-group"])
+                        movies_combobox.addItem(movie["tvg-group"])
+                movies_group_change()
+                if not YukiData.serie_selected:
+                    redraw_series()
+            btn_update.click()
+
+        def m3u_tail_loaded(channels, is_failed):
+            """Whole playlist is loaded"""
+            global m3uFailed
+            m3u_tail_batch_loaded(channels)
+            logger.info(
+                "{} channels, {} groups, {} movies, {} series".format(
+                    len(array),
+                    len(groups) - 2,
+                    len(YukiData.movies),
+                    len(YukiData.series),
+                )
+            )
+            if is_failed:
+                # Channels already shown are kept, but not cached
+                m3uFailed = True
+                show_exception(_("Playlist loading error!"))
+                if os.path.isfile(str(Path(LOCAL_DIR, "playlist.cache"))):
+                    os.remove(str(Path(LOCAL_DIR, "playlist.cache")))
+                return
+            logger.info("Playling loading done!")
+            m3u_epg_url = m3u_parser.epg_url_final
+            if use_cache:
+                logger.info("Caching playlist...")
+                threading.Thread(
+                    target=save_playlist_cache,
+                    args=(
+                        str(Path(LOCAL_DIR, "playlist.cache")),
+                        settings["m3u"],
+                        get_playlist_validators(getattr(m3u_req, "headers", {})),
+                        dict(m3u_cache_array),
+                        list(m3u_cache_groups),
+                        dict(YukiData.movies),
+                        m3u_epg_url,
+                    ),
+                    name="[yuki-iptv] save_playlist_cache",
+                    daemon=True,
+                ).start()
+            if m3u_epg_url and not settings["epg"]:
+                settings["epg"] = m3u_epg_url
+                save_playlist_epg_url()
+                force_update_epg_act()
+            if not playing_chan:
+                # Last channel may be in the end of playlist
+                playLastChannel()
+
+        def m3u_tail_load_thread():
+            channels = []
+            is_failed = False
+            batch_time = time.time()
+            try:
+                for m3u_datai in m3u_tail:
+                    channels.append(m3u_datai)
+                    if (
+                        len(channels) >= M3U_BATCH_SIZE
+                        or time.time() - batch_time >= M3U_BATCH_INTERVAL
+                    ):
+                        exInMainThread_partial(partial(m3u_tail_batch_loaded, channels))
+                        channels = []
+                        batch_time = time.time()
+            except Exception:
+                logger.warning(
+                    "Playlist parsing error!" + "\n" + traceback.format_exc()
+                )
+                is_failed = True
+            finally:
+                if m3u_file:
+                    m3u_file.close()
+                if m3u_req:
+                    m3u_req.close()
+            exInMainThread_partial(partial(m3u_tail_loaded, channels, is_failed))
+
+        def xtream_load_thread():
+            movies = {}
+            series = {}
+            try:
+                xt.load_iptv((xt.vod_type, xt.series_type))
+            except Exception:
+                logger.warning("XTream VOD and series loading failed")
+                logger.warning(traceback.format_exc())
+            try:
+                for movie in M3UParser(settings["udp_proxy"], _).iter_m3u(
+                    convert_xtream_to_m3u(_, xt.movies, append_group="VOD")
+                ):
+                    movies[movie["title"]] = movie
+            except Exception:
+                logger.warning("XTream movies parse FAILED")
+            for movie1 in xt.series:
+                if isinstance(movie1, Serie):
+                    series[movie1.name] = movie1
+            exInMainThread_partial(partial(xtream_loaded, movies, series))
+
         def redraw_series():
             YukiData.serie_selected = False
             win.seriesWidget.clear()
@@ -5983,6 +6185,20 @@ if __name__ == "__main__":
 
         redraw_series()
 
+        if xtream_loading:
+            threading.Thread(
+                target=xtream_load_thread,
+                name="[yuki-iptv] xtream_load",
+                daemon=True,
+            ).start()
+
+        if m3u_tail is not None:
+            threading.Thread(
+                target=m3u_tail_load_thread,
+                name="[yuki-iptv] m3u_tail_load",
+                daemon=True,
+            ).start()
+
         playmode_selector = QtWidgets.QComboBox()
         playmode_selector.currentIndexChanged.connect(playmode_change)
         for playmode in [_("TV channels"), _("Movies"), _("Series")]:
@@ -6078,73 +6294,86 @@ if __name__ == "__main__":
         tvguide_many_widget.setLayout(tvguide_many_layout)
         tvguide_many_win.setCentralWidget(tvguide_many_widget)
 
-        tvguide_many_table = QtWidgets.QTableWidget()
-        tvguide_many_layout.addWidget(tvguide_many_table, 0, 0)
+        tvguide_many_model = EPGGridModel(
+            lambda epg_name, window_start, window_stop: get_programme_index().get_range(
+                epg_name, window_start, window_stop
+            )
+        )
+        tvguide_many_table = QtWidgets.QTableView()
+        tvguide_many_table.setModel(tvguide_many_model)
+        tvguide_many_table.setWordWrap(True)
+        tvguide_many_table.setEditTriggers(
+            QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers
+        )
+        tvguide_many_table.setHorizontalScrollMode(
+            QtWidgets.QAbstractItemView.ScrollMode.ScrollPerPixel
+        )
+        tvguide_many_table.horizontalHeader().setDefaultSectionSize(200)
+        tvguide_many_table.verticalHeader().setDefaultSectionSize(60)
+        tvguide_many_table.verticalHeader().setSectionResizeMode(
+            QtWidgets.QHeaderView.ResizeMode.Fixed
+        )
+
+        tvguide_many_date = QtWidgets.QLabel()
+
+        def tvguide_many_set_window(window_start):
+            tvguide_many_model.set_window_start(window_start)
+            tvguide_many_date.setText(
+                time.strftime("%d.%m.%Y %H:%M", time.localtime(window_start))
+                + " - "
+                + time.strftime(
+                    "%d.%m.%Y %H:%M", time.localtime(window_start + EPG_GRID_WINDOW)
+                )
+            )
+
+        tvguide_many_earlier = QtWidgets.QPushButton()
+        tvguide_many_earlier.setText("<")
+        tvguide_many_earlier.clicked.connect(
+            lambda: tvguide_many_set_window(
+                tvguide_many_model.window_start - EPG_GRID_WINDOW
+            )
+        )
+        tvguide_many_now = QtWidgets.QPushButton()
+        tvguide_many_now.setText(_("Now"))
+        tvguide_many_now.clicked.connect(
+            lambda: tvguide_many_set_window(get_window_start())
+        )
+        tvguide_many_later = QtWidgets.QPushButton()
+        tvguide_many_later.setText(">")
+        tvguide_many_later.clicked.connect(
+            lambda: tvguide_many_set_window(
+                tvguide_many_model.window_start + EPG_GRID_WINDOW
+            )
+        )
+
+        tvguide_many_nav_widget = QtWidgets.QWidget()
+        tvguide_many_nav_layout = QtWidgets.QHBoxLayout()
+        tvguide_many_nav_layout.setContentsMargins(0, 0, 0, 0)
+        tvguide_many_nav_layout.addWidget(tvguide_many_earlier)
+        tvguide_many_nav_layout.addWidget(tvguide_many_now)
+        tvguide_many_nav_layout.addWidget(tvguide_many_later)
+        tvguide_many_nav_layout.addWidget(tvguide_many_date)
+        tvguide_many_nav_layout.addStretch()
+        tvguide_many_nav_widget.setLayout(tvguide_many_nav_layout)
+
+        tvguide_many_layout.addWidget(tvguide_many_nav_widget, 0, 0)
+        tvguide_many_layout.addWidget(tvguide_many_table, 1, 0)
 
         def tvguide_many_clicked():
+            if tvguide_many_win.isVisible():
+                tvguide_many_win.hide()
+                return
+            # Programmes are requested by model only for rows on screen
             tvguide_many_chans = []
-            tvguide_many_chans_names = []
-            tvguide_many_i = -1
-            for tvguide_m_chan in [x6[0] for x6 in sorted(array.items())]:
-                epg_search = tvguide_m_chan.lower()
-                if epg_search in prog_match_arr:
-                    epg_search = prog_match_arr[epg_search.lower()]
+            for tvguide_m_chan in sorted(array):
+                epg_search = get_epg_name(tvguide_m_chan)
                 if epg_search in programmes:
-                    tvguide_many_i += 1
-                    tvguide_many_chans.append(epg_search)
-                    tvguide_many_chans_names.append(tvguide_m_chan)
-            tvguide_many_table.setRowCount(len(tvguide_many_chans))
-            tvguide_many_table.setVerticalHeaderLabels(tvguide_many_chans_names)
-            logger.info(tvguide_many_table.horizontalHeader())
-            a_1_len_array = []
-            a_1_array = {}
-            for chan_6 in tvguide_many_chans:
-                a_1 = [
-                    a_2 for a_2 in programmes[chan_6] if a_2["stop"] > time.time() - 1
-                ]
-                a_1_array[chan_6] = a_1
-                a_1_len_array.append(len(a_1))
-            tvguide_many_table.setColumnCount(max(a_1_len_array))
-            tvguide_many_i2 = -1
-            for chan_7 in tvguide_many_chans:
-                tvguide_many_i2 += 1
-                a_3_i = -1
-                for a_3 in a_1_array[chan_7]:
-                    a_3_i += 1
-                    start_3_many = (
-                        datetime.datetime.fromtimestamp(a_3["start"]).strftime("%H:%M")
-                        + " - "
-                    )
-                    stop_3_many = (
-                        datetime.datetime.fromtimestamp(a_3["stop"]).strftime("%H:%M")
-                        + "\n"
-                    )
-                    try:
-                        title_3_many = a_3["title"] if "title" in a_3 else ""
-                    except Exception:
-                        title_3_many = ""
-                    try:
-                        desc_3_many = (
-                            ("\n" + a_3["desc"] + "\n") if "desc" in a_3 else ""
-                        )
-                    except Exception:
-                        desc_3_many = ""
-                    a_3_text = start_3_many + stop_3_many + title_3_many + desc_3_many
-                    tvguide_many_table.setItem(
-                        tvguide_many_i2, a_3_i, QtWidgets.QTableWidgetItem(a_3_text)
-                    )
-            tvguide_many_table.setHorizontalHeaderLabels(
-                [
-                    time.strftime("%H:%M", time.localtime()),
-                    time.strftime("%H:%M", time.localtime()),
-                ]
-            )
-            if not tvguide_many_win.isVisible():
-                moveWindowToCenter(tvguide_many_win)
-                tvguide_many_win.show()
-                moveWindowToCenter(tvguide_many_win)
-            else:
-                tvguide_many_win.hide()
+                    tvguide_many_chans.append((tvguide_m_chan, epg_search))
+            tvguide_many_model.set_channels(tvguide_many_chans)
+            tvguide_many_set_window(get_window_start())
+            moveWindowToCenter(tvguide_many_win)
+            tvguide_many_win.show()
+            moveWindowToCenter(tvguide_many_win)
 
         tvguide_many = QtWidgets.QPushButton()
         tvguide_many.setText(_("TV guide"))
@@ -6167,54 +6396,6 @@ if __name__ == "__main__":
         layout3.addWidget(channelfilter)
         layout3.addWidget(channelfiltersearch)
         widget3.setLayout(layout3)
-        widget4 = QtWidgets.QWidget()
-        layout4 = QtWidgets.QHBoxLayout()
-        layout4.setAlignment(
-            QtCore.Qt.AlignmentFlag.AlignLeft | QtCore.Qt.AlignmentFlag.AlignTop
-        )
-        page_lbl = QtWidgets.QLabel("{}:".format(_("Page")))
-        of_lbl = QtWidgets.QLabel()
-        page_box = QtWidgets.QSpinBox()
-        page_box.setSuffix("        ")
-        page_box.setMinimum(1)
-        page_box.setMaximum(round(len(array) / 100) + 1)
-        page_box.setStyleSheet(
-            """
-            QSpinBox::down-button  {
-              subcontrol-origin: margin;
-              subcontrol-position: center left;
-              left: 1px;
-              image: url("""
-            + str(Path("yuki_iptv", ICONS_FOLDER, "leftarrow.png"))
-            + """);
-              height: 24px;
-              width: 24px;
-            }
-
-            QSpinBox::up-button  {
-              subcontrol-origin: margin;
-              subcontrol-position: center right;
-              right: 1px;
-              image: url("""
-            + str(Path("yuki_iptv", ICONS_FOLDER, "rightarrow.png"))
-            + """);
-              height: 24px;
-              width: 24px;
-            }
-        """
-        )
-        page_box.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
-        of_lbl.setText(get_of_txt(round(len(array) / 100) + 1))
-
-        def page_change():
-            win.listWidget.verticalScrollBar().setValue(0)
-            redraw_chans()
-
-        page_box.valueChanged.connect(page_change)
-        layout4.addWidget(page_lbl)
-        layout4.addWidget(page_box)
-        layout4.addWidget(of_lbl)
-        widget4.setLayout(layout4)
         layout = QtWidgets.QGridLayout()
         layout.setVerticalSpacing(0)
         layout.setContentsMargins(0, 0, 0, 0)
@@ -6239,7 +6420,6 @@ if __name__ == "__main__":
         win.seriesWidget.hide()
         widget.layout().addWidget(win.seriesWidget)
         # Series end
-        widget.layout().addWidget(widget4)
         widget.layout().addWidget(chan)
         widget.layout().addWidget(loading)
         dockWidget.setFixedWidth(DOCK_WIDGET_WIDTH)
@@ -6283,88 +6463,69 @@ if __name__ == "__main__":
                 l1.setText2("{}!".format(_("No channel selected")))
                 time_stop = time.time() + 1
 
-        def update_tvguide(
-            chan_1="", do_return=False, show_all_guides=False, mark_integers=False
-        ):
+        def update_tvguide(chan_1="", do_return=False):
             global item_selected
             if array:
                 if not chan_1:
                     if item_selected:
                         chan_2 = item_selected
                     else:
-                        chan_2 = sorted(array.items())[0][0]
+                        chan_2 = min(array)
                 else:
                     chan_2 = chan_1
                 txt = _("No TV guide for channel")
-                chan_2 = chan_2.lower()
+                chan_3 = get_epg_name(chan_2)
                 newline_symbol = "\n"
                 if do_return:
                     newline_symbol = "!@#$%^^&*("
-                try:
-                    chan_3 = prog_match_arr[chan_2]
-                except Exception:
-                    chan_3 = chan_2
                 if chan_3 in programmes:
                     txt = newline_symbol
                     prog = programmes[chan_3]
-                    for pr in prog:
-                        override_this = False
-                        if show_all_guides:
-                            override_this = pr["start"] < time.time() + 1
-                        else:
-                            override_this = pr["stop"] > time.time() - 1
-                        if override_this:
-                            def_placeholder = "%d.%m.%y %H:%M"
-                            if mark_integers:
-                                def_placeholder = "%d.%m.%Y %H:%M:%S"
-                            start_2 = (
-                                datetime.datetime.fromtimestamp(pr["start"]).strftime(
-                                    def_placeholder
-                                )
-                                + " - "
-                            )
-                            stop_2 = (
-                                datetime.datetime.fromtimestamp(pr["stop"]).strftime(
-                                    def_placeholder
-                                )
-                                + "\n"
+                    # Not finished yet
+                    prog_positions = get_programme_index().get_range_positions(
+                        chan_3, time.time() - 1, float("inf")
+                    )
+                    for pr_position in prog_positions:
+                        pr = prog[pr_position]
+                        def_placeholder = "%d.%m.%y %H:%M"
+                        start_2 = (
+                            datetime.datetime.fromtimestamp(pr["start"]).strftime(
+                                def_placeholder
                             )
-                            try:
-                                title_2 = pr["title"] if "title" in pr else ""
-                            except Exception:
-                                title_2 = ""
-                            try:
-                                desc_2 = (
-                                    ("\n" + pr["desc"] + "\n") if "desc" in pr else ""
-                                )
-                            except Exception:
-                                desc_2 = ""
-                            attach_1 = ""
-                            if mark_integers:
-                                try:
-                                    marked_integer = prog.index(pr)
-                                except Exception:
-                                    marked_integer = -1
-                                attach_1 = f" ({marked_integer})"
-                            start_symbl = ""
-                            stop_symbl = ""
-                            if YukiData.use_dark_icon_theme:
-                                start_symbl = '<span style="color: white;">'
-                                stop_symbl = "</span>"
-                            txt += (
-                                '<span style="color: green;">'
-                                + start_2
-                                + stop_2
-                                + "</span>"
-                                + start_symbl
-                                + "<b>"
-                                + title_2
-                                + "</b>"
-                                + desc_2
-                                + attach_1
-                                + stop_symbl
-                                + newline_symbol
+                            + " - "
+                        )
+                        stop_2 = (
+                            datetime.datetime.fromtimestamp(pr["stop"]).strftime(
+                                def_placeholder
                             )
+                            + "\n"
+                        )
+                        try:
+                            title_2 = pr["title"] if "title" in pr else ""
+                        except Exception:
+                            title_2 = ""
+                        try:
+                            desc_2 = ("\n" + pr["desc"] + "\n") if "desc" in pr else ""
+                        except Exception:
+                            desc_2 = ""
+                        start_symbl = ""
+                        stop_symbl = ""
+                        if YukiData.use_dark_icon_theme:
+                            start_symbl = '<span style="color: white;">'
+                            stop_symbl = "</span>"
+                        txt += (
+                            '<span style="color: green;">'
+                            + start_2
+                            + stop_2
+                            + "</span>"
+                            + start_symbl
+                            + "<b>"
+                            + title_2
+                            + "</b>"
+                            + desc_2
+                            + stop_symbl
+                            + newline_symbol
+                        )
                 if do_return:
                     return txt
                 txt = txt.replace("\n", "<br>").replace("<br>", "", 1)
@@ -6392,6 +6553,7 @@ if __name__ == "__main__":
 
         def update_tvguide_2():
             epg_win_checkbox.clear()
+            tvguide_search_index.clear()
             if showonlychplaylist_chk.isChecked():
                 for chan_0 in array:
                     epg_win_count.setText("({}: {})".format(_("channels"), len(array)))
@@ -6412,10 +6574,9 @@ if __name__ == "__main__":
 
         is_recording = False
         recording_time = 0
-        record_file = None
 
         def start_record(ch1, url3):
-            global is_recording, record_file, time_stop, recording_time
+            global is_recording, time_stop, recording_time
             orig_channel_name = ch1
             if not is_recording:
                 is_recording = True
@@ -6439,13 +6600,17 @@ if __name__ == "__main__":
                             save_folder, "recording_-_" + cur_time + "_-_" + ch + ".mkv"
                         )
                     )
-                record_file = out_file
+                segment_options = get_record_segment_options()
+                if segment_options:
+                    # Folder with segments
+                    out_file = os.path.splitext(out_file)[0]
                 record(
                     url3,
                     out_file,
                     orig_channel_name,
                     f"Referer: {settings['referer']}",
                     get_ua_ref_for_channel,
+                    segment_options=segment_options,
                 )
             else:
                 is_recording = False
@@ -6472,7 +6637,7 @@ if __name__ == "__main__":
                     mpv_logger.info(str(mpv_log_str))
 
         def playLastChannel():
-            global playing_url, playing_chan, combobox, m3u
+            global playing_url, playing_chan, combobox
             isPlayingLast = False
             if (
                 os.path.isfile(str(Path(LOCAL_DIR, "lastchannels.json")))
@@ -6484,7 +6649,10 @@ if __name__ == "__main__":
                     )
                     lastfile_1_dat = json.loads(lastfile_1.read())
                     lastfile_1.close()
-                    if lastfile_1_dat[0] in m3u:
+                    if (
+                        lastfile_1_dat[0] in array
+                        or lastfile_1_dat[0] in YukiData.movies
+                    ):
                         isPlayingLast = True
                         player.user_agent = lastfile_1_dat[2]
                         setChanText("  " + lastfile_1_dat[0])
@@ -6746,20 +6914,11 @@ if __name__ == "__main__":
         streaminfo_win.setWindowTitle(_("Stream Information"))
 
         def is_recording_func():
-            global ffmpeg_processes
-            ret_code_rec = False
-            if ffmpeg_processes:
-                ret_code_array = []
-                for ffmpeg_process_1 in ffmpeg_processes:
-                    if ffmpeg_process_1[0].processId() == 0:
-                        ret_code_array.append(True)
-                        ffmpeg_processes.remove(ffmpeg_process_1)
-                    else:
-                        ret_code_array.append(False)
-                ret_code_rec = False not in ret_code_array
-            else:
-                ret_code_rec = True
-            return ret_code_rec
+            """True if scheduler recordings are finished"""
+            for record_id_1 in scheduled_records[:]:
+                if not is_record_running(record_id_1):
+                    scheduled_records.remove(record_id_1)
+            return not scheduled_records
 
         win.oldpos = None
 
@@ -6875,7 +7034,8 @@ if __name__ == "__main__":
             next_row = max(next_row, 0)
             next_row = min(next_row, win.listWidget.count() - 1)
             win.listWidget.setCurrentRow(next_row)
-            itemClicked_event(win.listWidget.currentItem())
+            if win.listWidget.currentIndex().isValid():
+                itemClicked_event(win.listWidget.currentIndex())
 
         @idle_function
         def prev_channel(unused=None):
@@ -6898,32 +7058,17 @@ if __name__ == "__main__":
             arr1 = format_catchup_array(arr1)
 
             chan_url = getArrayItem(archive_channel.text())["url"]
-            start_time = archive_all.currentItem().text().split(" - ")[0].strip()
-            end_time = (
-                archive_all.currentItem().text().split(" - ")[1].split("\n")[0].strip()
-            )
-            prog_index = (
-                archive_all.currentItem().text().split("(")[-1].replace(")", "")
+            archive_programme = archive_all.currentItem().data(
+                QtCore.Qt.ItemDataRole.UserRole
             )
 
-            catchup_id = ""
-            try:
-                match1 = archive_channel.text().lower()
-                try:
-                    match1 = prog_match_arr[match1]
-                except Exception:
-                    pass
-                if match1 in programmes:
-                    if programmes[match1]:
-                        if "catchup-id" in programmes[match1][int(prog_index)]:
-                            catchup_id = programmes[match1][int(prog_index)][
-                                "catchup-id"
-                            ]
-            except Exception:
-                logger.warning("archive_all_clicked / catchup_id parsing failed")
-                logger.warning(traceback.format_exc())
-
-            play_url = get_catchup_url(chan_url, arr1, start_time, end_time, catchup_id)
+            play_url = get_catchup_url(
+                chan_url,
+                arr1,
+                archive_programme.start,
+                archive_programme.stop,
+                archive_programme.catchup_id,
+            )
 
             itemClicked_event(archive_channel.text(), play_url, True)
             setChanText("({}) {}".format(_("Archive"), archive_channel.text()), True)
@@ -6950,12 +7095,22 @@ if __name__ == "__main__":
                 "{}: {}".format(_("Using mode"), got_array["catchup"])
             )
             archive_all.clear()
-            tvguide_got_1 = re.sub(
-                "<[^<]+?>", "", update_tvguide(cur_name, True, True, True)
-            ).split("!@#$%^^&*(")[2:]
-            for tvguide_el_1 in tvguide_got_1:
-                if tvguide_el_1:
-                    archive_all.addItem(tvguide_el_1)
+            epg_name_1 = get_epg_name(cur_name)
+            if epg_name_1 in programmes:
+                # Started before now
+                for archive_programme in get_archive_programmes(
+                    programmes[epg_name_1],
+                    get_programme_index().get_range_positions(
+                        epg_name_1, float("-inf"), time.time() + 1
+                    ),
+                ):
+                    archive_item = QtWidgets.QListWidgetItem(
+                        format_archive_programme(archive_programme)
+                    )
+                    archive_item.setData(
+                        QtCore.Qt.ItemDataRole.UserRole, archive_programme
+                    )
+                    archive_all.addItem(archive_item)
 
         def show_timeshift():
             update_timeshift_programme()
@@ -7140,19 +7295,27 @@ if __name__ == "__main__":
             channel_list_2 = [chan_name for chan_name in doSort(array)]
             ch_choosed = choosechannel_ch.currentText()
             tvguide_sch.clear()
-            if ch_choosed in channel_list_2:
-                tvguide_got = re.sub(
-                    "<[^<]+?>", "", update_tvguide(ch_choosed, True)
-                ).split("!@#$%^^&*(")[2:]
-                for tvguide_el in tvguide_got:
-                    if tvguide_el:
-                        tvguide_sch.addItem(tvguide_el)
+            epg_name_2 = get_epg_name(ch_choosed)
+            if ch_choosed in channel_list_2 and epg_name_2 in programmes:
+                # Not finished yet
+                for programme_2 in get_archive_programmes(
+                    programmes[epg_name_2],
+                    get_programme_index().get_range_positions(
+                        epg_name_2, time.time() - 1, float("inf")
+                    ),
+                ):
+                    programme_item = QtWidgets.QListWidgetItem(
+                        format_archive_programme(programme_2)
+                    )
+                    programme_item.setData(QtCore.Qt.ItemDataRole.UserRole, programme_2)
+                    tvguide_sch.addItem(programme_item)
 
         def show_scheduler():
             if scheduler_win.isVisible():
                 scheduler_win.hide()
             else:
                 choosechannel_ch.clear()
+                scheduler_search_index.clear()
                 channel_list = [chan_name for chan_name in doSort(array)]
                 for chan1 in channel_list:
                     choosechannel_ch.addItem(chan1)
@@ -7494,8 +7657,8 @@ if __name__ == "__main__":
             save_player_tracks()
             saveLastChannel()
             stop_record()
-            for rec_1 in sch_recordings:
-                do_stop_record(rec_1)
+            recording_scheduler.stop_all()
+            timeshift.stop()
             if mpris_loop:
                 mpris_loop.quit()
             stopped = True
@@ -7550,14 +7713,12 @@ if __name__ == "__main__":
         epg_data = None
 
         def thread_channels_redraw():
-            global ic, multiprocessing_manager_dict
+            global ic
             ic += 0.1
             # redraw every 15 seconds
-            if ic > (
-                14.9 if not multiprocessing_manager_dict["logos_inprogress"] else 2.9
-            ):
+            if ic > 14.9:
                 ic = 0
-                btn_update.click()
+                refresh_chans()
 
         @idle_function
         def thread_tvguide_update_1():
@@ -7597,18 +7758,18 @@ if __name__ == "__main__":
                                     try:
                                         epg_data = None
                                         waiting_for_epg = True
-                                        epg_data = (
-                                            get_context("spawn")
-                                            .Pool(1)
-                                            .apply(
+                                        # Not a Pool, worker must be able
+                                        # to start its own process pool
+                                        with ProcessPoolExecutor(
+                                            max_workers=1,
+                                            mp_context=get_context("spawn"),
+                                        ) as epg_executor:
+                                            epg_data = epg_executor.submit(
                                                 worker,
-                                                (
-                                                    settings,
-                                                    get_catchup_days(),
-                                                    multiprocessing_manager_dict,
-                                                ),
-                                            )
-                                        )
+                                                settings,
+                                                get_catchup_days(),
+                                                multiprocessing_manager_dict,
+                                            ).result()
                                     except Exception as e1:
                                         epg_failed = True
                                         logger.warning(
@@ -7622,10 +7783,9 @@ if __name__ == "__main__":
                                 logger.info("EPG update at boot disabled")
                             first_boot_1 = False
                         else:
-                            programmes = {
-                                prog0.lower(): tvguide_sets[prog0]
-                                for prog0 in tvguide_sets
-                            }
+                            # Channel names in tvguide_sets are lowercase,
+                            # programmes are decoded from cache on demand
+                            programmes = tvguide_sets
                             btn_update.click()  # start update in main thread
                 time.sleep(0.1)
 
@@ -7640,8 +7800,9 @@ if __name__ == "__main__":
                         if not recording_time:
                             recording_time = time.time()
                         record_time = format_seconds(time.time() - recording_time)
-                        if os.path.isfile(record_file):
-                            record_size = convert_size(os.path.getsize(record_file))
+                        record_status = get_record_status()
+                        if record_status and record_status["size"]:
+                            record_size = convert_size(record_status["size"])
                             lbl2.setText("REC " + record_time + " - " + record_size)
                         else:
                             recording_time = time.time()
@@ -7757,7 +7918,7 @@ if __name__ == "__main__":
                 if ic2 > 9.9:
                     ic2 = 0
                     if not epg_updating:
-                        if not is_program_actual(programmes, epg_ready):
+                        if not is_program_actual(get_programme_index(), epg_ready):
                             force_update_epg()
             except Exception:
                 pass
@@ -7798,7 +7959,7 @@ if __name__ == "__main__":
                         programmes = {
                             prog0.lower(): epg_data[1][prog0] for prog0 in epg_data[1]
                         }
-                        if not is_program_actual(programmes, epg_ready):
+                        if not is_program_actual(get_programme_index(), epg_ready):
                             raise Exception("Programme not actual")
                         prog_ids = epg_data[5]
                         epg_icons = epg_data[6]
@@ -8193,6 +8354,14 @@ if __name__ == "__main__":
             global playing_chan
             try:
                 if playing_chan:
+                    if timeshift.is_active(playing_chan):
+                        # Live stream, go back into timeshift or return to live
+                        timeshift_behind = timeshift.seek(secs)
+                        if timeshift_behind:
+                            play_timeshift()
+                        elif timeshift_behind == 0:
+                            mpv_override_play(playing_url, playing_chan)
+                        return
                     logger.info(f"Seeking to {secs} seconds")
                     player.command("seek", secs)
             except Exception:
@@ -8400,7 +8569,7 @@ if __name__ == "__main__":
             except Exception:
                 pass
 
-        if settings["m3u"] and m3u:
+        if settings["m3u"] and m3u_loaded:
             win.show()
             aot_action = init_mpv_player()
             win.raise_()
@@ -8434,7 +8603,6 @@ if __name__ == "__main__":
                 thread_check_tvguide_obsolete: 100,
                 thread_tvguide_progress: 100,
                 thread_update_time: 1000,
-                thread_logos_update: 1000,
                 record_thread: 1000,
                 record_thread_2: 1000,
                 thread_afterrecord: 50,
@@ -8446,6 +8614,9 @@ if __name__ == "__main__":
                 timers_array[timer].timeout.connect(timer)
                 timers_array[timer].start(timers[timer])
 
+            # Planned recordings, including missed while app was closed
+            scheduler_timer_timeout()
+
             # Updating EPG, async
             thread_tvguide_update()
             thread_tvguide_update_pt2()
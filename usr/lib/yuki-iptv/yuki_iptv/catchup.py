@@ -26,9 +26,39 @@ import datetime
 import re
 import traceback
 import logging
+from collections import namedtuple
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
+CATCHUP_TEMPLATE_CACHE_SIZE = 4096
+CATCHUP_TOKEN_VALUE = 0
+CATCHUP_TOKEN_DIVIDE = 1
+CATCHUP_TOKEN_DATE = 2
+# Placeholder name -> which time it shows
+CATCHUP_TIMES = {
+    "utc": "start",
+    "start": "start",
+    "lutc": "now",
+    "now": "now",
+    "timestamp": "now",
+    "utcend": "end",
+    "end": "end",
+}
+CATCHUP_DATE_FIELDS = {"Y": 0, "m": 1, "d": 2, "H": 3, "M": 4, "S": 5}
+CATCHUP_PLACEHOLDER_RE = re.compile(
+    r"\$?{(?:"
+    r"(utc|start|lutc|now|timestamp|utcend|end|Y|m|d|H|M|S|duration|catchup-id)"
+    r"|(duration|offset):(\d+)"
+    r"|(utc|start|lutc|now|timestamp|utcend|end):([YmdHMS](?:-?[YmdHMS]?){5})"
+    r")}"
+)
+
+# Programme shown in archive list, start and stop are epoch seconds
+ArchiveProgramme = namedtuple(
+    "ArchiveProgramme", ("start", "stop", "index", "title", "desc", "catchup_id")
+)
+
 
 # https://github.com/kodi-pvr/pvr.iptvsimple/blob/5c3a005875253c13b042893073373c41595623a2/src/iptvsimple/data/Channel.cpp#L440
 
@@ -59,171 +89,170 @@ def format_catchup_array(array0):
     return array0
 
 
-def format_placeholders(start_time, end_time, catchup_id, orig_url):
-    if start_time == "TEST":
-        return orig_url
-    logger.info("")
-    logger.info(f"orig placeholder url: {orig_url}")
-    start_timestamp = int(time.mktime(time.strptime(start_time, "%d.%m.%Y %H:%M:%S")))
-    end_timestamp = int(time.mktime(time.strptime(end_time, "%d.%m.%Y %H:%M:%S")))
-    duration = int(end_timestamp - start_timestamp)
-
-    current_utc = int(time.time())
-    utcend = start_timestamp + duration
-    offset2 = int(current_utc - start_timestamp)
-
-    start_timestamp_1 = list(
-        reversed(start_time.split(" ")[0].split("."))
-    ) + start_time.split(" ")[1].split(":")
-
-    orig_url = orig_url.replace("${utc}", str(start_timestamp))
-    orig_url = orig_url.replace("{utc}", str(start_timestamp))
-
-    orig_url = orig_url.replace("${start}", str(start_timestamp))
-    orig_url = orig_url.replace("{start}", str(start_timestamp))
-
-    orig_url = orig_url.replace("${lutc}", str(current_utc))
-    orig_url = orig_url.replace("{lutc}", str(current_utc))
-
-    orig_url = orig_url.replace("${now}", str(current_utc))
-    orig_url = orig_url.replace("{now}", str(current_utc))
-
-    orig_url = orig_url.replace("${timestamp}", str(current_utc))
-    orig_url = orig_url.replace("{timestamp}", str(current_utc))
-
-    orig_url = orig_url.replace("${utcend}", str(utcend))
-    orig_url = orig_url.replace("{utcend}", str(utcend))
-
-    orig_url = orig_url.replace("${end}", str(utcend))
-    orig_url = orig_url.replace("{end}", str(utcend))
-
-    orig_url = orig_url.replace("${Y}", str(start_timestamp_1[0]))
-    orig_url = orig_url.replace("{Y}", str(start_timestamp_1[0]))
-
-    orig_url = orig_url.replace("${m}", str(start_timestamp_1[1]))
-    orig_url = orig_url.replace("{m}", str(start_timestamp_1[1]))
-
-    orig_url = orig_url.replace("${d}", str(start_timestamp_1[2]))
-    orig_url = orig_url.replace("{d}", str(start_timestamp_1[2]))
-
-    orig_url = orig_url.replace("${H}", str(start_timestamp_1[3]))
-    orig_url = orig_url.replace("{H}", str(start_timestamp_1[3]))
-
-    orig_url = orig_url.replace("${M}", str(start_timestamp_1[4]))
-    orig_url = orig_url.replace("{M}", str(start_timestamp_1[4]))
-
-    orig_url = orig_url.replace("${S}", str(start_timestamp_1[5]))
-    orig_url = orig_url.replace("{S}", str(start_timestamp_1[5]))
+def get_archive_programmes(channel_programmes, positions):
+    """Archive records for programmes at given positions of channel"""
+    archive_programmes = []
+    for position in positions:
+        programme = channel_programmes[position]
+        archive_programmes.append(
+            ArchiveProgramme(
+                programme["start"],
+                programme["stop"],
+                position,
+                programme.get("title", ""),
+                programme.get("desc", ""),
+                programme.get("catchup-id", ""),
+            )
+        )
+    return archive_programmes
 
-    orig_url = orig_url.replace("${duration}", str(duration))
-    orig_url = orig_url.replace("{duration}", str(duration))
 
-    orig_url = orig_url.replace("${catchup-id}", str(catchup_id))
-    orig_url = orig_url.replace("{catchup-id}", str(catchup_id))
+def format_archive_programme(archive_programme):
+    """Archive list item text"""
+    txt = (
+        time.strftime("%d.%m.%y %H:%M", time.localtime(archive_programme.start))
+        + " - "
+        + time.strftime("%d.%m.%y %H:%M", time.localtime(archive_programme.stop))
+        + "\n"
+        + archive_programme.title
+    )
+    if archive_programme.desc:
+        txt += "\n" + archive_programme.desc
+    return txt
+
+
+@lru_cache(maxsize=CATCHUP_TEMPLATE_CACHE_SIZE)
+def compile_catchup_template(template):
+    """Split catchup template into text and placeholder tokens
+
+    Placeholders are tuples (kind, name, argument, original text),
+    kind is CATCHUP_TOKEN_VALUE ({utc}, {Y}, ...), CATCHUP_TOKEN_DIVIDE
+    ({duration:60}, {offset:1}) or CATCHUP_TOKEN_DATE ({utc:Y-m-d}).
+    """
+    tokens = []
+    position = 0
+    for match in CATCHUP_PLACEHOLDER_RE.finditer(template):
+        if match.start() > position:
+            tokens.append(template[position : match.start()])
+        name, divide_name, divisor, date_name, date_format = match.groups()
+        if name:
+            tokens.append((CATCHUP_TOKEN_VALUE, name, None, match.group(0)))
+        elif divide_name:
+            tokens.append(
+                (CATCHUP_TOKEN_DIVIDE, divide_name, int(divisor), match.group(0))
+            )
+        else:
+            tokens.append((CATCHUP_TOKEN_DATE, date_name, date_format, match.group(0)))
+        position = match.end()
+    if position < len(template):
+        tokens.append(template[position:])
+    return tuple(tokens)
 
-    try:
-        duration_re = sorted(re.findall(r"\$?{duration:\d+}", orig_url))
-        if duration_re:
-            for duration_re_i in duration_re:
-                duration_re_i_parse = int(duration_re_i.split(":")[1].split("}")[0])
-                orig_url = orig_url.replace(
-                    duration_re_i, str(int(duration / duration_re_i_parse))
-                )
-    except Exception:
-        logger.warning("format_placeholders / duration_re parsing failed")
-        logger.warning(traceback.format_exc())
-
-    try:
-        offset_re = sorted(re.findall(r"\$?{offset:\d+}", orig_url))
-        if offset_re:
-            for offset_re_i in offset_re:
-                offset_re_i_parse = int(offset_re_i.split(":")[1].split("}")[0])
-                orig_url = orig_url.replace(
-                    offset_re_i, str(int(offset2 / offset_re_i_parse))
-                )
-    except Exception:
-        logger.warning("format_placeholders / offset_re parsing failed")
-        logger.warning(traceback.format_exc())
 
-    utc_time = (
-        datetime.datetime.fromtimestamp(start_timestamp)
-        .strftime("%Y-%m-%d-%H-%M-%S")
-        .split("-")
-    )
-    lutc_time = (
-        datetime.datetime.fromtimestamp(current_utc)
+def get_date_fields(timestamp):
+    return (
+        datetime.datetime.fromtimestamp(timestamp)
         .strftime("%Y-%m-%d-%H-%M-%S")
         .split("-")
     )
-    utcend_time = (
-        datetime.datetime.fromtimestamp(utcend).strftime("%Y-%m-%d-%H-%M-%S").split("-")
-    )
 
-    try:
-        specifiers_re = re.findall(
-            re.compile(
-                "((\\$?){(utc|start|lutc|now|timestamp|utcend|end):"
-                "([YmdHMS])(-?)([YmdHMS]?)(-?)([YmdHMS]?)(-?)"
-                "([YmdHMS]?)(-?)([YmdHMS]?)(-?)([YmdHMS]?)})"
-            ),
-            orig_url,
-        )
-        if specifiers_re:
-            for specifiers_re_i in specifiers_re:
-                specifiers_re_i_o = specifiers_re_i[0]
-                spec_name = str(specifiers_re_i_o.split("{")[1].split(":")[0])
-                spec_val = str(specifiers_re_i_o.split(":")[1].split("}")[0])
-                if spec_name in ("utc", "start"):
-                    spec_val = spec_val.replace("Y", str(utc_time[0]))
-                    spec_val = spec_val.replace("m", str(utc_time[1]))
-                    spec_val = spec_val.replace("d", str(utc_time[2]))
-                    spec_val = spec_val.replace("H", str(utc_time[3]))
-                    spec_val = spec_val.replace("M", str(utc_time[4]))
-                    spec_val = spec_val.replace("S", str(utc_time[5]))
-                elif spec_name in ("lutc", "now", "timestamp"):
-                    spec_val = spec_val.replace("Y", str(lutc_time[0]))
-                    spec_val = spec_val.replace("m", str(lutc_time[1]))
-                    spec_val = spec_val.replace("d", str(lutc_time[2]))
-                    spec_val = spec_val.replace("H", str(lutc_time[3]))
-                    spec_val = spec_val.replace("M", str(lutc_time[4]))
-                    spec_val = spec_val.replace("S", str(lutc_time[5]))
-                elif spec_name in ("utcend", "end"):
-                    spec_val = spec_val.replace("Y", str(utcend_time[0]))
-                    spec_val = spec_val.replace("m", str(utcend_time[1]))
-                    spec_val = spec_val.replace("d", str(utcend_time[2]))
-                    spec_val = spec_val.replace("H", str(utcend_time[3]))
-                    spec_val = spec_val.replace("M", str(utcend_time[4]))
-                    spec_val = spec_val.replace("S", str(utcend_time[5]))
-                orig_url = orig_url.replace(specifiers_re_i_o, str(spec_val))
-    except Exception:
-        logger.warning("format_placeholders / specifiers_re parsing failed")
-        logger.warning(traceback.format_exc())
 
+def render_catchup_template(
+    tokens, current_time, start_time=None, end_time=None, catchup_id=None
+):
+    """Render compiled template in one pass
+
+    Without start_time only current time placeholders are replaced,
+    other ones are kept as they are.
+    """
+    times = {"now": current_time, "start": start_time, "end": end_time}
+    date_fields = {}
+    rendered = []
+    for token in tokens:
+        if type(token) is str:
+            rendered.append(token)
+            continue
+        kind, name, argument, original = token
+        if start_time is None and (
+            kind == CATCHUP_TOKEN_DIVIDE or CATCHUP_TIMES.get(name, "start") != "now"
+        ):
+            rendered.append(original)
+            continue
+        if kind == CATCHUP_TOKEN_VALUE:
+            if name in CATCHUP_TIMES:
+                rendered.append(str(times[CATCHUP_TIMES[name]]))
+            elif name == "duration":
+                rendered.append(str(end_time - start_time))
+            elif name == "catchup-id":
+                rendered.append(str(catchup_id))
+            else:
+                if "start" not in date_fields:
+                    date_fields["start"] = get_date_fields(start_time)
+                rendered.append(date_fields["start"][CATCHUP_DATE_FIELDS[name]])
+        elif kind == CATCHUP_TOKEN_DIVIDE:
+            if name == "duration":
+                value = end_time - start_time
+            else:
+                value = current_time - start_time
+            try:
+                rendered.append(str(int(value / argument)))
+            except Exception:
+                logger.warning(f"Failed to render catchup placeholder {original}")
+                logger.warning(traceback.format_exc())
+                rendered.append(original)
+        else:
+            time_name = CATCHUP_TIMES[name]
+            if time_name not in date_fields:
+                date_fields[time_name] = get_date_fields(times[time_name])
+            rendered.append(
+                "".join(
+                    (
+                        date_fields[time_name][CATCHUP_DATE_FIELDS[char]]
+                        if char in CATCHUP_DATE_FIELDS
+                        else char
+                    )
+                    for char in argument
+                )
+            )
+    return "".join(rendered)
+
+
+def format_placeholders(start_time, end_time, catchup_id, orig_url):
+    if start_time == "TEST":
+        return orig_url
+    logger.info("")
+    logger.info(f"orig placeholder url: {orig_url}")
+    if isinstance(start_time, str):
+        # Old "%d.%m.%Y %H:%M:%S" strings
+        start_time = time.mktime(time.strptime(start_time, "%d.%m.%Y %H:%M:%S"))
+        end_time = time.mktime(time.strptime(end_time, "%d.%m.%Y %H:%M:%S"))
+    orig_url = render_catchup_template(
+        compile_catchup_template(orig_url),
+        int(time.time()),
+        int(start_time),
+        int(end_time),
+        catchup_id,
+    )
     logger.info(f"formatted placeholder url: {orig_url}")
     logger.info("")
     return orig_url
 
 
-def get_catchup_url(chan_url, arr1, start_time, end_time, catchup_id):
-    play_url = chan_url
-    if arr1["catchup"] == "default":
-        play_url = format_placeholders(
-            start_time, end_time, catchup_id, arr1["catchup-source"]
-        )
-    elif arr1["catchup"] == "append":
-        play_url = chan_url + format_placeholders(
-            start_time, end_time, catchup_id, arr1["catchup-source"]
-        )
-    elif arr1["catchup"] == "shift":
+@lru_cache(maxsize=CATCHUP_TEMPLATE_CACHE_SIZE)
+def get_catchup_template(chan_url, catchup, catchup_source):
+    """Catchup URL prefix and template for channel
+
+    Template is None if channel URL is played as is.
+    """
+    if catchup == "default":
+        return "", catchup_source
+    elif catchup == "append":
+        return chan_url, catchup_source
+    elif catchup == "shift":
         if "?" in chan_url:
-            play_url = chan_url + format_placeholders(
-                start_time, end_time, catchup_id, "&utc={utc}&lutc={lutc}"
-            )
-        else:
-            play_url = chan_url + format_placeholders(
-                start_time, end_time, catchup_id, "?utc={utc}&lutc={lutc}"
-            )
-    elif arr1["catchup"] in ("flussonic", "flussonic-hls", "flussonic-ts", "fs"):
+            return chan_url, "&utc={utc}&lutc={lutc}"
+        return chan_url, "?utc={utc}&lutc={lutc}"
+    elif catchup in ("flussonic", "flussonic-hls", "flussonic-ts", "fs"):
         fs_url = chan_url
         logger.info("")
         logger.info(f"orig fs url: {fs_url}")
@@ -259,16 +288,16 @@ def get_catchup_url(chan_url, arr1, start_time, end_time, catchup_id):
                     fs_host = flussonic_re_2[0][0]
                     fs_chanid = flussonic_re_2[0][1]
                     fs_urlappend = flussonic_re_2[0][3]
-                    if arr1["catchup"] in ("flussonic-ts", "fs"):
+                    if catchup in ("flussonic-ts", "fs"):
                         fs_url = "{}/{}/timeshift_abs-{}.ts{}".format(
                             fs_host, fs_chanid, "${start}", fs_urlappend
                         )
-                    elif arr1["catchup"] in ("flussonic", "flussonic-hls"):
+                    elif catchup in ("flussonic", "flussonic-hls"):
                         fs_url = "{}/{}/timeshift_rel-{}.m3u8{}".format(
                             fs_host, fs_chanid, "{offset:1}", fs_urlappend
                         )
-        play_url = format_placeholders(start_time, end_time, catchup_id, fs_url)
-    elif arr1["catchup"] == "xc":
+        return "", fs_url
+    elif catchup == "xc":
         xc_url = chan_url
         logger.info("")
         logger.info(f"orig xc url: {xc_url}")
@@ -294,8 +323,17 @@ def get_catchup_url(chan_url, arr1, start_time, end_time, catchup_id):
                     xc_chanid,
                     xc_extension,
                 )
-        play_url = format_placeholders(start_time, end_time, catchup_id, xc_url)
-    return play_url
+        return "", xc_url
+    return chan_url, None
+
+
+def get_catchup_url(chan_url, arr1, start_time, end_time, catchup_id):
+    url_prefix, template = get_catchup_template(
+        chan_url, arr1["catchup"], arr1.get("catchup-source", "")
+    )
+    if template is None:
+        return chan_url
+    return url_prefix + format_placeholders(start_time, end_time, catchup_id, template)
 
 
 def format_url_clean(url5):
@@ -309,44 +347,7 @@ def parse_specifiers_now_url(url4):
         return url4
     logger.info("")
     logger.info(f"orig spec url: {format_url_clean(url4)}")
-    current_utc_str = int(time.time())
-    url4 = url4.replace("${lutc}", str(current_utc_str))
-    url4 = url4.replace("{lutc}", str(current_utc_str))
-
-    url4 = url4.replace("${now}", str(current_utc_str))
-    url4 = url4.replace("{now}", str(current_utc_str))
-
-    url4 = url4.replace("${timestamp}", str(current_utc_str))
-    url4 = url4.replace("{timestamp}", str(current_utc_str))
-
-    cur_utc_time = (
-        datetime.datetime.fromtimestamp(current_utc_str)
-        .strftime("%Y-%m-%d-%H-%M-%S")
-        .split("-")
-    )
-
-    try:
-        specifiers_re_url = re.findall(
-            re.compile(
-                "((\\$?){(lutc|now|timestamp):([YmdHMS])(-?)([YmdHMS]?)"
-                "(-?)([YmdHMS]?)(-?)([YmdHMS]?)(-?)([YmdHMS]?)(-?)([YmdHMS]?)})"
-            ),
-            url4,
-        )
-        if specifiers_re_url:
-            for specifiers_re_url_i in specifiers_re_url:
-                spec_val_1 = str(specifiers_re_url_i[0].split(":")[1].split("}")[0])
-                spec_val_1 = spec_val_1.replace("Y", str(cur_utc_time[0]))
-                spec_val_1 = spec_val_1.replace("m", str(cur_utc_time[1]))
-                spec_val_1 = spec_val_1.replace("d", str(cur_utc_time[2]))
-                spec_val_1 = spec_val_1.replace("H", str(cur_utc_time[3]))
-                spec_val_1 = spec_val_1.replace("M", str(cur_utc_time[4]))
-                spec_val_1 = spec_val_1.replace("S", str(cur_utc_time[5]))
-                url4 = url4.replace(specifiers_re_url_i[0], str(spec_val_1))
-    except Exception:
-        logger.warning("parse_specifiers_now_url / specifiers_re_url parsing failed")
-        logger.warning(traceback.format_exc())
-
+    url4 = render_catchup_template(compile_catchup_template(url4), int(time.time()))
     logger.info(f"after spec url: {format_url_clean(url4)}")
     logger.info("")
     return url4
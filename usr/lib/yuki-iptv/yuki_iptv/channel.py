@@ -0,0 +1,181 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import sys
+from collections.abc import MutableMapping
+
+# Keys of playlist entry, in the order they were always stored
+CHANNEL_KEYS = (
+    "title",
+    "tvg-name",
+    "tvg-ID",
+    "tvg-logo",
+    "tvg-group",
+    "tvg-url",
+    "catchup",
+    "catchup-source",
+    "catchup-days",
+    "useragent",
+    "referer",
+    "url",
+)
+CHANNEL_SLOTS = tuple(key.replace("-", "_").lower() for key in CHANNEL_KEYS)
+CHANNEL_KEY_SLOTS = dict(zip(CHANNEL_KEYS, CHANNEL_SLOTS))
+# Values shared by many channels, stored once
+CHANNEL_INTERNED_KEYS = frozenset(
+    (
+        "tvg-group",
+        "tvg-url",
+        "catchup",
+        "catchup-source",
+        "catchup-days",
+        "useragent",
+        "referer",
+    )
+)
+
+
+class Missing:
+    """Marks key which is not set"""
+
+    __slots__ = ()
+
+    def __reduce__(self):
+        # Keep it singleton after pickling
+        return "MISSING"
+
+
+MISSING = Missing()
+
+
+class Channel(MutableMapping):
+    """Playlist entry
+
+    Behaves like the dict which was used before (same keys and order,
+    equal to dict with same items, JSON via dict(channel)), but keeps
+    values in slots instead of per-channel hash table.
+    Unknown keys are stored in a small dict created on demand.
+    """
+
+    __slots__ = CHANNEL_SLOTS + ("extra",)
+
+    def __init__(self, channel=None):
+        self.extra = None
+        if not channel:
+            for slot in CHANNEL_SLOTS:
+                setattr(self, slot, MISSING)
+            return
+        keys_found = 0
+        for key, slot in CHANNEL_KEY_SLOTS.items():
+            value = channel.get(key, MISSING)
+            if value is not MISSING:
+                keys_found += 1
+                if key in CHANNEL_INTERNED_KEYS and type(value) is str:
+                    value = sys.intern(value)
+            setattr(self, slot, value)
+        if keys_found != len(channel):
+            for key, value in channel.items():
+                if key not in CHANNEL_KEY_SLOTS:
+                    self[key] = value
+
+    def __getitem__(self, key):
+        slot = CHANNEL_KEY_SLOTS.get(key)
+        if slot is not None:
+            value = getattr(self, slot)
+            if value is not MISSING:
+                return value
+        elif self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        slot = CHANNEL_KEY_SLOTS.get(key)
+        if slot is not None:
+            if key in CHANNEL_INTERNED_KEYS and type(value) is str:
+                value = sys.intern(value)
+            setattr(self, slot, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key):
+        slot = CHANNEL_KEY_SLOTS.get(key)
+        if slot is not None:
+            if getattr(self, slot) is MISSING:
+                raise KeyError(key)
+            setattr(self, slot, MISSING)
+        elif self.extra and key in self.extra:
+            del self.extra[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        slot = CHANNEL_KEY_SLOTS.get(key)
+        if slot is not None:
+            return getattr(self, slot) is not MISSING
+        return bool(self.extra) and key in self.extra
+
+    def __iter__(self):
+        for key, slot in CHANNEL_KEY_SLOTS.items():
+            if getattr(self, slot) is not MISSING:
+                yield key
+        if self.extra:
+            yield from list(self.extra)
+
+    def __len__(self):
+        length = 0
+        for slot in CHANNEL_SLOTS:
+            if getattr(self, slot) is not MISSING:
+                length += 1
+        if self.extra:
+            length += len(self.extra)
+        return length
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    def __reduce__(self):
+        return (
+            restore_channel,
+            (tuple(getattr(self, slot) for slot in CHANNEL_SLOTS), self.extra),
+        )
+
+    def copy(self):
+        return Channel(self)
+
+    def to_dict(self):
+        return dict(self)
+
+
+# Slot descriptors, faster than setattr() with slot name
+CHANNEL_SLOT_SETTERS = tuple(
+    Channel.__dict__[slot].__set__ for slot in CHANNEL_SLOTS + ("extra",)
+)
+
+
+def restore_channel(values, extra):
+    """Create channel from pickled values"""
+    channel = Channel.__new__(Channel)
+    for setter, value in zip(CHANNEL_SLOT_SETTERS, values + (extra,)):
+        setter(channel, value)
+    return channel
@@ -0,0 +1,292 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import logging
+import traceback
+from collections import namedtuple
+from yuki_iptv.qt import get_qt_library
+
+qt_library, QtWidgets, QtCore, QtGui, QShortcut = get_qt_library()
+logger = logging.getLogger(__name__)
+
+# Contents of one channel list row, made only for rows which are shown
+ChannelRow = namedtuple(
+    "ChannelRow",
+    (
+        "name",  # text in bold, with number and play symbol
+        "description",  # current programme, empty if no EPG
+        "tooltip",
+        "start_time",
+        "stop_time",
+        "progress",  # None hides progress bar
+        "icon",
+    ),
+)
+
+CHANNEL_ROW_ROLE = QtCore.Qt.ItemDataRole.UserRole + 1
+
+ICON_SIZE = 32
+ROW_MARGIN = 6
+ROW_SPACING = 5
+PROGRESS_HEIGHT = 5
+
+
+class ChannelListModel(QtCore.QStringListModel):
+    """Channel names of current group and search
+
+    Names are kept by QStringListModel, so view layout does not call
+    Python for every row. Row contents are made by
+    row_data_func(row, name) only when view asks for them.
+    """
+
+    def __init__(self, row_data_func, parent=None):
+        super().__init__(parent)
+        self.row_data_func = row_data_func
+        self.channels = []
+        self.rows = {}
+
+    def data(self, index, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.channels):
+            return None
+        if role == CHANNEL_ROW_ROLE:
+            return self.get_row(index.row())
+        if role == QtCore.Qt.ItemDataRole.UserRole:
+            return self.channels[index.row()]
+        if role == QtCore.Qt.ItemDataRole.ToolTipRole:
+            return self.get_row(index.row()).tooltip
+        return super().data(index, role)
+
+    def get_row(self, row):
+        if row not in self.rows:
+            try:
+                self.rows[row] = self.row_data_func(row, self.channels[row])
+            except Exception:
+                logger.warning(f"Failed to make row for '{self.channels[row]}'")
+                logger.warning(traceback.format_exc())
+                self.rows[row] = ChannelRow(
+                    self.channels[row], "", "", "", "", None, None
+                )
+        return self.rows[row]
+
+    def set_channels(self, channels):
+        """Replace channel list, returns False if it did not change"""
+        if channels is self.channels or channels == self.channels:
+            return False
+        self.channels = channels
+        self.rows = {}
+        self.setStringList(channels)
+        return True
+
+    def refresh(self, rows):
+        """Make rows again, dataChanged is emitted only for changed ones
+
+        Rows which are not in given range are forgotten
+        and will be made again when they are shown.
+        """
+        old_rows = self.rows
+        self.rows = {}
+        for row in rows:
+            if row not in old_rows:
+                continue
+            channel_row = self.get_row(row)
+            if channel_row != old_rows[row]:
+                self.dataChanged.emit(self.index(row), self.index(row))
+
+
+class ChannelDelegate(QtWidgets.QStyledItemDelegate):
+    """Paints channel name, current programme and logo"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.show_description = True
+
+    def get_line_height(self, option):
+        return option.fontMetrics.height()
+
+    def sizeHint(self, option, index):
+        line_height = self.get_line_height(option)
+        height = line_height
+        if self.show_description:
+            height += ROW_SPACING + line_height
+        height = max(height, ICON_SIZE)
+        if self.show_description:
+            height += ROW_SPACING + line_height
+        return QtCore.QSize(option.rect.width(), height + ROW_MARGIN * 2)
+
+    def paint(self, painter, option, index):
+        channel_row = index.data(CHANNEL_ROW_ROLE)
+        if channel_row is None:
+            return super().paint(painter, option, index)
+        painter.save()
+        widget = option.widget
+        style = widget.style() if widget else QtWidgets.QApplication.style()
+        # Selection and hover background
+        background_option = QtWidgets.QStyleOptionViewItem(option)
+        self.initStyleOption(background_option, index)
+        background_option.text = ""
+        background_option.icon = QtGui.QIcon()
+        style.drawControl(
+            QtWidgets.QStyle.ControlElement.CE_ItemViewItem,
+            background_option,
+            painter,
+            widget,
+        )
+        if option.state & QtWidgets.QStyle.StateFlag.State_Selected:
+            painter.setPen(
+                option.palette.color(QtGui.QPalette.ColorRole.HighlightedText)
+            )
+        else:
+            painter.setPen(option.palette.color(QtGui.QPalette.ColorRole.Text))
+
+        line_height = self.get_line_height(option)
+        rect = option.rect.adjusted(ROW_MARGIN, ROW_MARGIN, -ROW_MARGIN, -ROW_MARGIN)
+        text_height = line_height
+        if channel_row.description:
+            text_height += ROW_SPACING + line_height
+        top_height = max(text_height, ICON_SIZE)
+        if not self.show_description:
+            top_height = rect.height()
+
+        if channel_row.icon:
+            channel_row.icon.paint(
+                painter,
+                QtCore.QRect(
+                    rect.left(),
+                    rect.top() + (top_height - ICON_SIZE) // 2,
+                    ICON_SIZE,
+                    ICON_SIZE,
+                ),
+            )
+        text_left = rect.left() + ICON_SIZE + 10
+        text_top = rect.top() + (top_height - text_height) // 2
+        text_width = rect.right() - text_left
+
+        name_font = QtGui.QFont(option.font)
+        name_font.setBold(True)
+        painter.setFont(name_font)
+        painter.drawText(
+            QtCore.QRect(text_left, text_top, text_width, line_height),
+            QtCore.Qt.AlignmentFlag.AlignLeft | QtCore.Qt.AlignmentFlag.AlignVCenter,
+            channel_row.name,
+        )
+        painter.setFont(option.font)
+        if channel_row.description:
+            painter.drawText(
+                QtCore.QRect(
+                    text_left,
+                    text_top + line_height + ROW_SPACING,
+                    text_width,
+                    line_height,
+                ),
+                QtCore.Qt.AlignmentFlag.AlignLeft
+                | QtCore.Qt.AlignmentFlag.AlignVCenter,
+                channel_row.description,
+            )
+
+        if channel_row.description and channel_row.progress is not None:
+            progress_top = rect.top() + top_height + ROW_SPACING
+            start_width = option.fontMetrics.horizontalAdvance(channel_row.start_time)
+            stop_width = option.fontMetrics.horizontalAdvance(channel_row.stop_time)
+            painter.drawText(
+                QtCore.QRect(rect.left(), progress_top, start_width, line_height),
+                QtCore.Qt.AlignmentFlag.AlignVCenter,
+                channel_row.start_time,
+            )
+            painter.drawText(
+                QtCore.QRect(
+                    rect.right() - stop_width, progress_top, stop_width, line_height
+                ),
+                QtCore.Qt.AlignmentFlag.AlignVCenter,
+                channel_row.stop_time,
+            )
+            bar_rect = QtCore.QRect(
+                rect.left() + start_width + 10,
+                progress_top + (line_height - PROGRESS_HEIGHT) // 2,
+                max(rect.width() - start_width - stop_width - 20, 0),
+                PROGRESS_HEIGHT,
+            )
+            painter.fillRect(bar_rect, QtGui.QColor("#C0C6CA"))
+            progress = min(max(channel_row.progress, 0), 100)
+            painter.fillRect(
+                QtCore.QRect(
+                    bar_rect.left(),
+                    bar_rect.top(),
+                    bar_rect.width() * progress // 100,
+                    bar_rect.height(),
+                ),
+                QtGui.QColor("#7D94B0"),
+            )
+        painter.restore()
+
+
+class ChannelListView(QtWidgets.QListView):
+    """Scrollable list over whole channel list, paints only visible rows"""
+
+    def __init__(self, row_data_func, parent=None):
+        super().__init__(parent)
+        self.placeholder_text = ""
+        self.setModel(ChannelListModel(row_data_func, self))
+        self.setItemDelegate(ChannelDelegate(self))
+        # All rows are same height, so view doesn't ask every row for size
+        self.setUniformItemSizes(True)
+        self.setVerticalScrollMode(
+            QtWidgets.QAbstractItemView.ScrollMode.ScrollPerPixel
+        )
+        self.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.SingleSelection)
+
+    def set_show_description(self, show_description):
+        if self.itemDelegate().show_description != show_description:
+            self.itemDelegate().show_description = show_description
+            self.scheduleDelayedItemsLayout()
+
+    def visible_rows(self):
+        count = self.model().rowCount()
+        if not count:
+            return range(0)
+        first_row = self.indexAt(QtCore.QPoint(1, 1)).row()
+        if first_row == -1:
+            return range(0)
+        last_row = self.indexAt(QtCore.QPoint(1, self.viewport().height() - 1)).row()
+        if last_row == -1:
+            last_row = count - 1
+        return range(first_row, last_row + 1)
+
+    def count(self):
+        return self.model().rowCount()
+
+    def currentRow(self):
+        return self.currentIndex().row()
+
+    def setCurrentRow(self, row):
+        if 0 <= row < self.count():
+            self.setCurrentIndex(self.model().index(row))
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.placeholder_text and not self.count():
+            painter = QtGui.QPainter(self.viewport())
+            painter.drawText(
+                self.viewport().rect().adjusted(ROW_MARGIN, ROW_MARGIN, 0, 0),
+                QtCore.Qt.AlignmentFlag.AlignLeft | QtCore.Qt.AlignmentFlag.AlignTop,
+                self.placeholder_text,
+            )
+            painter.end()
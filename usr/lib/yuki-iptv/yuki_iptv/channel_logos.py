@@ -25,76 +25,168 @@ import os
 
 # import logging
 # import traceback
-import requests
-import io
-import base64
-import hashlib
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 from wand.image import Image
+from yuki_iptv.logo_atlas import LOGO_TILE_SIZE, LogoAtlas, LogoTranscoder
+from yuki_iptv.logo_cache import LogoCache
+from yuki_iptv.logo_service import LogoService
 
 # logger = logging.getLogger(__name__)
 
+LOGO_TRANSCODE_WORKERS = 2
 
-def fetch_remote_channel_icon(chan_name, logo_url, req_data_ua, req_data_ref):
-    LOCAL_DIR = str(Path(os.environ["HOME"], ".config", "yuki-iptv"))
 
-    icon_ret = None
+def transcode_logos(contents):
+    """Convert downloaded logos to PNG and RGBA tile, runs in pool worker"""
+    results = []
+    for content in contents:
+        try:
+            with Image(blob=content) as original:
+                with original.convert("png") as im_logo:
+                    im_logo.resize(LOGO_TILE_SIZE, LOGO_TILE_SIZE)
+                    results.append(
+                        (
+                            im_logo.make_blob("png"),
+                            bytes(
+                                im_logo.export_pixels(
+                                    channel_map="RGBA", storage="char"
+                                )
+                            ),
+                        )
+                    )
+        except Exception:
+            results.append(None)
+    return results
+
+
+def get_logo_executor():
+    """Process pool for logo conversion, threads if we can't have child processes
+
+    ImageMagick calls are made without GIL, so threads
+    are converting logos in parallel too.
+    """
+    if multiprocessing.current_process().daemon:
+        return ThreadPoolExecutor(max_workers=LOGO_TRANSCODE_WORKERS)
+    return ProcessPoolExecutor(
+        max_workers=LOGO_TRANSCODE_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def save_logo(cache_file, content, logo_atlas, logo_transcoder):
+    """Convert logo, save it to cache and atlas"""
+    logo = logo_transcoder.transcode(content)
+    if logo is None:
+        raise Exception("Logo is not an image")
+    if not os.path.isfile(cache_file):
+        cache_file_tmp = f"{cache_file}.{threading.get_ident()}.tmp"
+        with open(cache_file_tmp, "wb") as cache_fd:
+            cache_fd.write(logo[0])
+        os.replace(cache_file_tmp, cache_file)
+    logo_atlas.add_tile(os.path.basename(cache_file), logo[1])
+
+
+def fetch_remote_channel_icon(
+    session,
+    logo_url,
+    req_data_ua,
+    req_data_ref,
+    logo_cache=None,
+    logo_atlas=None,
+    logo_transcoder=None,
+):
     if not logo_url:
         return None
-    base64_enc = base64.b64encode(bytes(logo_url, "utf-8")).decode("utf-8")
-    sha512_hash = str(hashlib.sha512(bytes(base64_enc, "utf-8")).hexdigest()) + ".png"
-    cache_file = str(Path(LOCAL_DIR, "logo_cache", sha512_hash))
-    if os.path.isfile(cache_file):
+    if os.path.isfile(logo_url.strip()):
+        # logger.debug("is local icon")
+        return logo_url.strip()
+    icon_ret, req_data_headers = logo_cache.lookup(logo_url)
+    if req_data_headers is None:
         # logger.debug("is remote icon, cache available")
-        icon_ret = cache_file
-    else:
-        try:
-            if os.path.isfile(logo_url.strip()):
-                # logger.debug("is local icon")
-                icon_ret = logo_url.strip()
-            else:
-                # logger.debug(
-                #     "is remote icon, cache not available, fetching it..."
-                # )
-                req_data_headers = {"User-Agent": req_data_ua}
-                if req_data_ref:
-                    req_data_headers["Referer"] = req_data_ref
-                req_data1 = requests.get(
-                    logo_url,
-                    headers=req_data_headers,
-                    timeout=(3, 3),
-                    stream=True,
-                ).content
-                if req_data1:
-                    with io.BytesIO(req_data1) as im_logo_bytes:
-                        with Image(file=im_logo_bytes) as original:
-                            with original.convert("png") as im_logo:
-                                im_logo.resize(64, 64)
-                                im_logo.save(filename=cache_file)
-                            icon_ret = cache_file
-        except Exception:
-            icon_ret = None
+        if icon_ret and not logo_atlas.has_tile(os.path.basename(icon_ret)):
+            try:
+                with open(icon_ret, "rb") as icon_fd:
+                    save_logo(icon_ret, icon_fd.read(), logo_atlas, logo_transcoder)
+            except Exception:
+                pass
+        return icon_ret
+    try:
+        # logger.debug(
+        #     "is remote icon, cache not available or old, fetching it..."
+        # )
+        req_data_headers["User-Agent"] = req_data_ua
+        if req_data_ref:
+            req_data_headers["Referer"] = req_data_ref
+        req_data = session.get(
+            logo_url,
+            headers=req_data_headers,
+            timeout=(3, 3),
+        )
+        if req_data.status_code == 304 and icon_ret:
+            logo_cache.not_modified(logo_url)
+            return icon_ret
+        req_data.raise_for_status()
+        if not req_data.content:
+            raise Exception("Empty logo")
+        cache_file = logo_cache.get_content_file(req_data.content)
+        # Same image is already saved for other URL
+        if not os.path.isfile(cache_file) or not logo_atlas.has_tile(
+            os.path.basename(cache_file)
+        ):
+            save_logo(cache_file, req_data.content, logo_atlas, logo_transcoder)
+        icon_ret = logo_cache.store(
+            logo_url,
+            cache_file,
+            req_data.headers.get("ETag"),
+            req_data.headers.get("Last-Modified"),
+        )
+    except Exception:
+        logo_cache.failed(logo_url)
     return icon_ret
 
 
-def channel_logos_worker(requested_logos, update_dict):
+def channel_logos_worker(requested_logos_queue, logos_queue):
+    """Logo service process, takes requests until None is received
+
+    (channel name, [m3u logo, epg logo]) is put to logos_queue
+    for every channel when its logos are ready.
+    """
     # logger.debug("channel_logos_worker started")
-    update_dict["logos_inprogress"] = True
-    for logo_channel in requested_logos:
-        # logger.debug(f"Downloading logo for channel '{logo_channel}'...")
-        logo_m3u = fetch_remote_channel_icon(
-            logo_channel,
-            requested_logos[logo_channel][0],
-            requested_logos[logo_channel][2],
-            requested_logos[logo_channel][3],
-        )
-        logo_epg = fetch_remote_channel_icon(
-            logo_channel,
-            requested_logos[logo_channel][1],
-            requested_logos[logo_channel][2],
-            requested_logos[logo_channel][3],
-        )
-        update_dict[f"LOGO:::{logo_channel}"] = [logo_m3u, logo_epg]
+
+    def logo_ready(logo_channel, logos):
+        logos_queue.put((logo_channel, logos))
+
+    def logos_idle():
+        logo_cache.save()
+
+    logo_cache_dir = str(Path(os.environ["HOME"], ".config", "yuki-iptv", "logo_cache"))
+    logo_cache = LogoCache(logo_cache_dir)
+    logo_atlas = LogoAtlas(logo_cache_dir)
+    logo_executor = get_logo_executor()
+    logo_service = LogoService(
+        partial(
+            fetch_remote_channel_icon,
+            logo_cache=logo_cache,
+            logo_atlas=logo_atlas,
+            logo_transcoder=LogoTranscoder(transcode_logos, logo_executor),
+        ),
+        logo_ready,
+        logos_idle,
+    )
+    while True:
+        requested_logos = requested_logos_queue.get()
+        # Only latest request matters
+        while requested_logos is not None and not requested_logos_queue.empty():
+            requested_logos = requested_logos_queue.get()
+        if requested_logos is None:
+            break
+        # logger.debug("Channel logos request")
+        logo_service.request(requested_logos)
+    logo_service.stop()
+    logo_executor.shutdown(wait=False)
+    logo_cache.save()
     # logger.debug("channel_logos_worker ended")
-    update_dict["logos_inprogress"] = False
-    update_dict["logos_completed"] = True
@@ -0,0 +1,104 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import queue
+import threading
+from functools import partial
+
+PREFETCH_CHUNKS = 16
+PREFETCH_JOIN_TIMEOUT = 1
+
+
+def read_chunks(file, chunk_size):
+    """Read binary file object chunk by chunk"""
+    return iter(partial(file.read, chunk_size), b"")
+
+
+def peek_chunks(chunks, size):
+    """Read at least size bytes, returns head and unconsumed chunks"""
+    chunks = iter(chunks)
+    head = b""
+    for chunk in chunks:
+        head += chunk
+        if len(head) >= size:
+            break
+
+    def rest():
+        if head:
+            yield head
+        yield from chunks
+
+    return head[:size], rest()
+
+
+def prefetch_chunks(chunks, maxsize=PREFETCH_CHUNKS):
+    """Read chunks in background thread
+
+    Keeps up to maxsize chunks ahead of the consumer, so download
+    and decompression / parsing run at the same time.
+    """
+    chunks_queue = queue.Queue(maxsize=maxsize)
+    stop_event = threading.Event()
+    end_marker = object()
+
+    def producer():
+        try:
+            try:
+                for chunk in chunks:
+                    while not stop_event.is_set():
+                        try:
+                            chunks_queue.put(chunk, timeout=0.5)
+                            break
+                        except queue.Full:
+                            pass
+                    if stop_event.is_set():
+                        return
+                item = end_marker
+            except Exception as exc:
+                item = exc
+            while not stop_event.is_set():
+                try:
+                    chunks_queue.put(item, timeout=0.5)
+                    break
+                except queue.Full:
+                    pass
+        finally:
+            # Close source generator, so HTTP response is released too
+            if hasattr(chunks, "close"):
+                try:
+                    chunks.close()
+                except Exception:
+                    pass
+
+    producer_thread = threading.Thread(target=producer, daemon=True)
+    producer_thread.start()
+    try:
+        while True:
+            item = chunks_queue.get()
+            if item is end_marker:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop_event.set()
+        producer_thread.join(timeout=PREFETCH_JOIN_TIMEOUT)
@@ -25,56 +25,47 @@ import os
 import gettext
 import logging
 import json
-import codecs
 import time
 import requests
-import io
-import zipfile
+import multiprocessing
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
 from pathlib import Path
-from yuki_iptv.epg_xmltv import parse_as_xmltv
-from yuki_iptv.epg_zip import parse_epg_zip
-from yuki_iptv.epg_txt import parse_txt
+from yuki_iptv.epg_cache import EPGCache, write_epg_cache
+from yuki_iptv.epg_index import ProgrammeIndex
+from yuki_iptv.epg_merge import EPGMerger
+from yuki_iptv.chunks import prefetch_chunks, read_chunks
+from yuki_iptv.epg_stream import parse_epg_stream
 
 _ = gettext.gettext
 logger = logging.getLogger(__name__)
 
-EPG_CACHE_VERSION = 1
+EPG_CHUNK_SIZE = 64 * 1024
+EPG_FETCH_WORKERS = 4
+EPG_PROGRESS_INTERVAL = 0.25
 
 
 def load_epg(epg_url, user_agent):
-    """Load EPG file"""
+    """Load EPG file, yields raw chunks as they arrive"""
     logger.info("Loading EPG...")
     logger.info(f"Address: '{epg_url}'")
     if os.path.isfile(epg_url.strip()):
-        epg_file = open(epg_url.strip(), "rb")
-        epg = epg_file.read()
-        epg_file.close()
+        with open(epg_url.strip(), "rb") as epg_file:
+            yield from read_chunks(epg_file, EPG_CHUNK_SIZE)
     else:
-        epg_req = requests.get(
+        with requests.get(
             epg_url, headers={"User-Agent": user_agent}, stream=True, timeout=35
-        )
-        logger.info(f"EPG URL status code: {epg_req.status_code}")
-        epg = epg_req.content
+        ) as epg_req:
+            logger.info(f"EPG URL status code: {epg_req.status_code}")
+            yield from epg_req.iter_content(EPG_CHUNK_SIZE)
     logger.info("EPG loaded")
-    return epg
-
-
-def merge_two_dicts(dict1, dict2):
-    """Merge two dictionaries"""
-    dict_new = dict1.copy()
-    dict_new.update(dict2)
-    return dict_new
 
 
-def fetch_epg(settings, catchup_days1, return_dict1):
-    """Parsing EPG"""
-    programmes_epg = {}
-    prog_ids = {}
-    epg_ok = True
-    exc = None
-    epg_failures = []
-    epg_exceptions = []
-    epg_icons = {}
+def get_epg_urls(settings):
+    """Split EPG setting into list of sources"""
     epg_settings_url = [settings["epg"]]
     if "," in epg_settings_url[0]:
         epg_settings_url[0] = "^^::MULTIPLE::^^" + ":::^^^:::".join(
@@ -84,76 +75,110 @@ def fetch_epg(settings, catchup_days1, return_dict1):
         epg_settings_url = (
             epg_settings_url[0].replace("^^::MULTIPLE::^^", "").split(":::^^^:::")
         )
-    epg_i = 0
-    for epg_url_1 in epg_settings_url:
-        epg_i += 1
-        try:
-            return_dict1["epg_progress"] = _(
-                "Updating TV guide... (loading {}/{})"
-            ).format(epg_i, len(epg_settings_url))
+    return epg_settings_url
 
-            epg = load_epg(epg_url_1, settings["ua"])
 
-            return_dict1["epg_progress"] = _(
-                "Updating TV guide... (parsing {}/{})"
-            ).format(epg_i, len(epg_settings_url))
+def fetch_epg_source(epg_url, settings, return_dict1, progress_key):
+    """Download and parse one EPG source, runs in a pool worker"""
+    return_dict1[progress_key] = "loading"
+
+    def set_progress(stage):
+        return_dict1[progress_key] = stage
+
+    # Download, unpacking and parsing are running at the same time
+    pr_epg = parse_epg_stream(
+        prefetch_chunks(load_epg(epg_url, settings["ua"])),
+        settings,
+        set_progress,
+    )
+
+    # Sort EPG entries by start time
+    for program_epg in pr_epg[0]:
+        pr_epg[0][program_epg].sort(key=lambda programme: programme["start"])
+
+    return_dict1[progress_key] = "done"
+    return pr_epg
 
-            try:
-                # XMLTV
-                pr_xmltv = parse_as_xmltv(
-                    epg, settings, catchup_days1, return_dict1, epg_i, epg_settings_url
-                )
-                programmes_epg = merge_two_dicts(programmes_epg, pr_xmltv[0])
-                prog_ids = merge_two_dicts(prog_ids, pr_xmltv[1])
-                try:
-                    epg_icons = merge_two_dicts(epg_icons, pr_xmltv[2])
-                except Exception:
-                    pass
-            except Exception:
-                zip_epg = io.BytesIO(epg)
-                if zipfile.is_zipfile(zip_epg):  # ZIP
-                    logger.info("ZIP file detected")
-                    epg = ""
-                    pr_zip = parse_epg_zip(zip_epg)
-                    if isinstance(pr_zip, list) and pr_zip[0] == "xmltv":
-                        # XMLTV
-                        pr_xmltv = parse_as_xmltv(
-                            pr_zip[1],
-                            settings,
-                            catchup_days1,
-                            return_dict1,
-                            epg_i,
-                            epg_settings_url,
-                        )
-                        programmes_epg = merge_two_dicts(programmes_epg, pr_xmltv[0])
-                        prog_ids = merge_two_dicts(prog_ids, pr_xmltv[1])
-                        try:
-                            epg_icons = merge_two_dicts(epg_icons, pr_xmltv[2])
-                        except Exception:
-                            pass
-                    else:
-                        programmes_epg = merge_two_dicts(programmes_epg, pr_zip)
-                elif epg[0:6] == b"tv.all":  # TXT (TV.ALL)
-                    zip_epg = None
-                    programmes_epg = merge_two_dicts(programmes_epg, parse_txt(epg))
-                else:
-                    zip_epg = None
-                    raise Exception("Unknown EPG format or parsing failed!")
 
-            # Sort EPG entries by start time
-            for program_epg in programmes_epg:
-                programmes_epg[program_epg].sort(
-                    key=lambda programme: programme["start"]
-                )
+def get_epg_executor(sources_count):
+    """Process pool for EPG sources, threads if we can't have child processes"""
+    max_workers = min(sources_count, EPG_FETCH_WORKERS)
+    if multiprocessing.current_process().daemon:
+        return ThreadPoolExecutor(max_workers=max_workers)
+    return ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+    )
 
-            epg_failures.append(False)
-            logger.info("Parsing done!")
-            logger.info("Parsing EPG...")
-        except Exception as exc0:
-            logger.warning("Failed parsing EPG!")
-            epg_failures.append(True)
-            epg_exceptions.append(exc0)
-    if False not in epg_failures:
+
+def format_epg_progress(stages):
+    """Progress string for EPG sources"""
+    if len(stages) == 1:
+        if stages[0] == "unpacking":
+            return _("Updating TV guide... (unpacking {}/{})").format(1, 1)
+        if stages[0] == "parsing":
+            return _("Updating TV guide... (parsing {}/{})").format(1, 1)
+        return _("Updating TV guide... (loading {}/{})").format(1, 1)
+    return _("Updating TV guide... ({}/{} done, {} loading, {} parsing)").format(
+        stages.count("done"),
+        len(stages),
+        stages.count("loading"),
+        stages.count("unpacking") + stages.count("parsing"),
+    )
+
+
+def fetch_epg(settings, catchup_days1, return_dict1):
+    """Parsing EPG"""
+    epg_ok = True
+    exc = None
+    epg_exceptions = []
+    epg_settings_url = get_epg_urls(settings)
+    progress_keys = [
+        f"epg_progress:::{epg_i}" for epg_i in range(len(epg_settings_url))
+    ]
+    for progress_key in progress_keys:
+        return_dict1[progress_key] = "waiting"
+    return_dict1["epg_progress"] = format_epg_progress(
+        ["loading"] * len(epg_settings_url)
+    )
+    results = []
+    with get_epg_executor(len(epg_settings_url)) as executor:
+        futures = [
+            executor.submit(
+                fetch_epg_source, epg_url_1, settings, return_dict1, progress_key
+            )
+            for epg_url_1, progress_key in zip(epg_settings_url, progress_keys)
+        ]
+        not_done = futures
+        while not_done:
+            not_done = wait(not_done, timeout=EPG_PROGRESS_INTERVAL)[1]
+            try:
+                stages = []
+                for progress_key in progress_keys:
+                    stages.append(return_dict1[progress_key])
+                return_dict1["epg_progress"] = format_epg_progress(stages)
+            except Exception:
+                pass
+        for future in futures:
+            try:
+                results.append(future.result())
+                logger.info("Parsing done!")
+            except Exception as exc0:
+                logger.warning("Failed parsing EPG!")
+                logger.warning(str(exc0))
+                epg_exceptions.append(exc0)
+    for progress_key in progress_keys:
+        try:
+            del return_dict1[progress_key]
+        except Exception:
+            pass
+    # Merge in configured source order
+    epg_merger = EPGMerger(settings["epgmerge"])
+    for pr_epg in results:
+        epg_merger.add(pr_epg[0], pr_epg[1], pr_epg[2])
+    programmes_epg = epg_merger.programmes
+    prog_ids = epg_merger.prog_ids
+    epg_icons = epg_merger.icons
+    if not results:
         epg_ok = False
         exc = epg_exceptions[0]
     return_dict1["epg_progress"] = ""
@@ -175,57 +200,47 @@ def is_program_actual(sets0, epg_ready, force=False, future=False):
         current_time = time.time() + 86400  # 1 day
     else:
         current_time = time.time()
-    if sets0:
-        for prog1 in sets0:
-            pr1 = sets0[prog1]
-            for p in pr1:
-                if current_time > p["start"] and current_time < p["stop"]:
-                    return True
-    return False
+    if not isinstance(sets0, ProgrammeIndex):
+        sets0 = ProgrammeIndex(sets0)
+    return sets0.has_programme_at(current_time)
 
 
 def load_epg_cache(settings_m3u, settings_epg, epg_ready):
     LOCAL_DIR = str(Path(os.environ["HOME"], ".config", "yuki-iptv"))
 
+    file1_json = {}
     try:
-        file_epg1 = open(str(Path(LOCAL_DIR, "epg.cache")), "rb")
-        file1_json = json.loads(
-            codecs.decode(codecs.decode(file_epg1.read(), "zlib"), "utf-8")
-        )
-        file_epg1.close()
-        epg_cache_version = -1
+        epg_cache = EPGCache(str(Path(LOCAL_DIR, "epg.cache")))
+    except Exception:
+        logger.info("Ignoring epg.cache, EPG cache version changed")
         try:
-            if "cache_version" in file1_json:
-                epg_cache_version = file1_json["cache_version"]
+            os.remove(str(Path(LOCAL_DIR, "epg.cache")))
         except Exception:
             pass
-        if epg_cache_version != EPG_CACHE_VERSION:
-            logger.info("Ignoring epg.cache, EPG cache version changed")
-            os.remove(str(Path(LOCAL_DIR, "epg.cache")))
-            file1_json = {}
+        return file1_json
+    try:
+        current_url = epg_cache.metadata["current_url"]
+        system_timezone = epg_cache.metadata["system_timezone"]
+        if (
+            current_url[0] == settings_m3u
+            and current_url[1] == settings_epg
+            and system_timezone == json.dumps(time.tzname)
+        ):
+            file1_json = {
+                "tvguide_sets": epg_cache,
+                "prog_ids": epg_cache.metadata["prog_ids"],
+                "epg_icons": epg_cache.metadata["epg_icons"],
+                # Channel names are saved in lowercase
+                "programmes_1": epg_cache,
+                "is_program_actual": is_program_actual(
+                    epg_cache, epg_ready, force=True, future=True
+                ),
+            }
         else:
-            current_url = file1_json["current_url"]
-            system_timezone = file1_json["system_timezone"]
-            if (
-                current_url[0] == settings_m3u
-                and current_url[1] == settings_epg
-                and system_timezone == json.dumps(time.tzname)
-            ):
-                pass
-            else:
-                logger.info("Ignoring epg.cache, something changed")
-                os.remove(str(Path(LOCAL_DIR, "epg.cache")))
-                file1_json = {}
+            logger.info("Ignoring epg.cache, something changed")
+            os.remove(str(Path(LOCAL_DIR, "epg.cache")))
     except Exception:
         file1_json = {}
-    if "tvguide_sets" in file1_json:
-        file1_json["programmes_1"] = {
-            prog3.lower(): file1_json["tvguide_sets"][prog3]
-            for prog3 in file1_json["tvguide_sets"]
-        }
-        file1_json["is_program_actual"] = is_program_actual(
-            file1_json["tvguide_sets"], epg_ready, force=True, future=True
-        )
     return file1_json
 
 
@@ -234,26 +249,16 @@ def save_epg_cache(tvguide_sets_arg, settings_arg, prog_ids_arg, epg_icons_arg):
 
     if tvguide_sets_arg:
         if not settings_arg["nocacheepg"]:
-            file2 = open(str(Path(LOCAL_DIR, "epg.cache")), "wb")
-            file2.write(
-                codecs.encode(
-                    bytes(
-                        json.dumps(
-                            {
-                                "cache_version": EPG_CACHE_VERSION,
-                                "system_timezone": json.dumps(time.tzname),
-                                "tvguide_sets": tvguide_sets_arg,
-                                "current_url": [
-                                    str(settings_arg["m3u"]),
-                                    str(settings_arg["epg"]),
-                                ],
-                                "prog_ids": prog_ids_arg,
-                                "epg_icons": epg_icons_arg,
-                            }
-                        ),
-                        "utf-8",
-                    ),
-                    "zlib",
-                )
+            write_epg_cache(
+                str(Path(LOCAL_DIR, "epg.cache")),
+                {prog3.lower(): tvguide_sets_arg[prog3] for prog3 in tvguide_sets_arg},
+                {
+                    "system_timezone": json.dumps(time.tzname),
+                    "current_url": [
+                        str(settings_arg["m3u"]),
+                        str(settings_arg["epg"]),
+                    ],
+                    "prog_ids": prog_ids_arg,
+                    "epg_icons": epg_icons_arg,
+                },
             )
-            file2.close()
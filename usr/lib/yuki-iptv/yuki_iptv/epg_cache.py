@@ -0,0 +1,193 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import os
+import sys
+import json
+import mmap
+import struct
+from array import array
+from collections.abc import Mapping
+
+EPG_CACHE_MAGIC = b"YUKIEPG\x00"
+EPG_CACHE_VERSION = 2
+EPG_CACHE_HEADER = struct.Struct("<8sIQ")  # magic, version, index size
+EPG_CACHE_ALIGN = 8
+
+# String table references
+NO_STRING = 0xFFFFFFFF  # key is missing
+NULL_STRING = 0xFFFFFFFE  # value is None
+
+STRING_COLUMNS = ("title", "desc", "catchup-id")
+
+
+def align(offset):
+    return (offset + EPG_CACHE_ALIGN - 1) // EPG_CACHE_ALIGN * EPG_CACHE_ALIGN
+
+
+def write_epg_cache(cache_file, programmes, metadata):
+    """Write EPG cache
+
+    Layout: header, JSON index, padding, then columns of
+    start (double), stop (double), title, desc, catchup-id (uint32
+    references into string table), string offsets (uint64)
+    and UTF-8 string data.
+    """
+    starts = array("d")
+    stops = array("d")
+    string_columns = [array("I") for _ in STRING_COLUMNS]
+    strings = {}
+    channels = {}
+    for channel_name, channel_programmes in programmes.items():
+        channels[channel_name] = [len(starts), len(channel_programmes)]
+        for programme in channel_programmes:
+            starts.append(programme["start"])
+            stops.append(programme["stop"])
+            for column, key in zip(string_columns, STRING_COLUMNS):
+                if key not in programme:
+                    column.append(NO_STRING)
+                elif programme[key] is None:
+                    column.append(NULL_STRING)
+                else:
+                    column.append(strings.setdefault(programme[key], len(strings)))
+
+    string_data = [string.encode("utf-8") for string in strings]
+    string_offsets = array("Q", [0])
+    for string in string_data:
+        string_offsets.append(string_offsets[-1] + len(string))
+
+    index = dict(metadata)
+    index.update(
+        {
+            "byteorder": sys.byteorder,
+            "channels": channels,
+            "programmes": len(starts),
+            "strings": len(string_data),
+        }
+    )
+    index = json.dumps(index).encode("utf-8")
+
+    # Write to temporary file first, old cache may still be mapped
+    cache_file_tmp = cache_file + ".tmp"
+    with open(cache_file_tmp, "wb") as cache_fd:
+        cache_fd.write(
+            EPG_CACHE_HEADER.pack(EPG_CACHE_MAGIC, EPG_CACHE_VERSION, len(index))
+        )
+        cache_fd.write(index)
+        cache_fd.write(b"\x00" * (align(cache_fd.tell()) - cache_fd.tell()))
+        for column in [starts, stops] + string_columns:
+            column.tofile(cache_fd)
+        cache_fd.write(b"\x00" * (align(cache_fd.tell()) - cache_fd.tell()))
+        string_offsets.tofile(cache_fd)
+        for string in string_data:
+            cache_fd.write(string)
+    os.replace(cache_file_tmp, cache_file)
+
+
+class EPGCache(Mapping):
+    """Memory-mapped EPG cache
+
+    Only the index is read on open, programmes of a channel
+    are decoded when the channel is looked up for the first time.
+    """
+
+    def __init__(self, cache_file):
+        with open(cache_file, "rb") as cache_fd:
+            self.mmap = mmap.mmap(cache_fd.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, index_size = EPG_CACHE_HEADER.unpack_from(self.mmap)
+        if magic != EPG_CACHE_MAGIC or version != EPG_CACHE_VERSION:
+            raise Exception("EPG cache version changed")
+        offset = EPG_CACHE_HEADER.size
+        self.metadata = json.loads(self.mmap[offset : offset + index_size])
+        if self.metadata.pop("byteorder") != sys.byteorder:
+            raise Exception("EPG cache byte order changed")
+        self.channels = self.metadata.pop("channels")
+        programmes_count = self.metadata.pop("programmes")
+        strings_count = self.metadata.pop("strings")
+
+        view = memoryview(self.mmap)
+        offset = align(offset + index_size)
+        self.starts = view[offset : offset + 8 * programmes_count].cast("d")
+        offset += 8 * programmes_count
+        self.stops = view[offset : offset + 8 * programmes_count].cast("d")
+        offset += 8 * programmes_count
+        self.string_columns = []
+        for _ in STRING_COLUMNS:
+            self.string_columns.append(
+                view[offset : offset + 4 * programmes_count].cast("I")
+            )
+            offset += 4 * programmes_count
+        offset = align(offset)
+        self.string_offsets = view[offset : offset + 8 * (strings_count + 1)].cast("Q")
+        self.string_data = offset + 8 * (strings_count + 1)
+        self.strings = {}
+        self.decoded = {}
+
+    def get_string(self, string_index):
+        if string_index == NULL_STRING:
+            return None
+        try:
+            return self.strings[string_index]
+        except KeyError:
+            string = self.mmap[
+                self.string_data
+                + self.string_offsets[string_index] : self.string_data
+                + self.string_offsets[string_index + 1]
+            ].decode("utf-8")
+            self.strings[string_index] = string
+            return string
+
+    def __getitem__(self, channel_name):
+        try:
+            return self.decoded[channel_name]
+        except KeyError:
+            pass
+        first, count = self.channels[channel_name]
+        channel_programmes = []
+        for row in range(first, first + count):
+            programme = {"start": self.starts[row], "stop": self.stops[row]}
+            for column, key in zip(self.string_columns, STRING_COLUMNS):
+                if column[row] != NO_STRING:
+                    programme[key] = self.get_string(column[row])
+            channel_programmes.append(programme)
+        self.decoded[channel_name] = channel_programmes
+        return channel_programmes
+
+    def __contains__(self, channel_name):
+        return channel_name in self.channels
+
+    def __iter__(self):
+        return iter(self.channels)
+
+    def __len__(self):
+        return len(self.channels)
+
+    def __reduce__(self):
+        # Pickle as plain dict, mmap can't be sent to other processes
+        return (dict, (dict(self.items()),))
+
+    def has_programme_at(self, current_time):
+        """Check if any programme is running at given time without decoding"""
+        for start, stop in zip(self.starts, self.stops):
+            if current_time > start and current_time < stop:
+                return True
+        return False
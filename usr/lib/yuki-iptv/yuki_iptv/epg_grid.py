@@ -0,0 +1,148 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import time
+import logging
+import traceback
+from yuki_iptv.qt import get_qt_library
+from yuki_iptv.epg_index import split_into_slots
+
+qt_library, QtWidgets, QtCore, QtGui, QShortcut = get_qt_library()
+logger = logging.getLogger(__name__)
+
+EPG_GRID_SLOT_SIZE = 30 * 60
+EPG_GRID_SLOTS = 12  # 6 hours
+EPG_GRID_WINDOW = EPG_GRID_SLOT_SIZE * EPG_GRID_SLOTS
+
+
+def get_window_start(current_time=None):
+    """Start of slot with given time, slots are aligned on local time"""
+    if current_time is None:
+        current_time = time.time()
+    utc_offset = time.localtime(current_time).tm_gmtoff
+    return current_time - (current_time + utc_offset) % EPG_GRID_SLOT_SIZE
+
+
+class EPGGridModel(QtCore.QAbstractTableModel):
+    """TV guide grid, channels are rows and time slots are columns
+
+    Programmes of channel are taken by
+    get_programmes_func(epg_name, window_start, window_stop)
+    only when view asks for its row, and kept until window moves.
+    """
+
+    def __init__(self, get_programmes_func, parent=None):
+        super().__init__(parent)
+        self.get_programmes_func = get_programmes_func
+        self.channels = []
+        self.window_start = get_window_start()
+        self.rows = {}
+
+    def set_channels(self, channels):
+        """channels - list of (channel name, EPG name)"""
+        self.beginResetModel()
+        self.channels = channels
+        self.rows = {}
+        self.endResetModel()
+
+    def set_window_start(self, window_start):
+        self.window_start = window_start
+        self.rows = {}
+        if self.channels:
+            self.dataChanged.emit(
+                self.index(0, 0),
+                self.index(len(self.channels) - 1, EPG_GRID_SLOTS - 1),
+            )
+        self.headerDataChanged.emit(
+            QtCore.Qt.Orientation.Horizontal, 0, EPG_GRID_SLOTS - 1
+        )
+
+    def get_row(self, row):
+        """Programmes of each slot for channel row"""
+        try:
+            return self.rows[row]
+        except KeyError:
+            pass
+        try:
+            slots = split_into_slots(
+                self.get_programmes_func(
+                    self.channels[row][1],
+                    self.window_start,
+                    self.window_start + EPG_GRID_WINDOW,
+                ),
+                self.window_start,
+                EPG_GRID_SLOT_SIZE,
+                EPG_GRID_SLOTS,
+            )
+        except Exception:
+            logger.warning("Failed to get programmes for TV guide grid")
+            logger.warning(traceback.format_exc())
+            slots = [[] for _ in range(EPG_GRID_SLOTS)]
+        self.rows[row] = slots
+        return slots
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.channels)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return EPG_GRID_SLOTS
+
+    def headerData(self, section, orientation, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if role != QtCore.Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == QtCore.Qt.Orientation.Horizontal:
+            return time.strftime(
+                "%H:%M",
+                time.localtime(self.window_start + section * EPG_GRID_SLOT_SIZE),
+            )
+        if 0 <= section < len(self.channels):
+            return self.channels[section][0]
+        return None
+
+    def data(self, index, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role not in (
+            QtCore.Qt.ItemDataRole.DisplayRole,
+            QtCore.Qt.ItemDataRole.ToolTipRole,
+        ):
+            return None
+        programmes = self.get_row(index.row())[index.column()]
+        lines = []
+        for programme in programmes:
+            line = (
+                time.strftime("%H:%M", time.localtime(programme["start"]))
+                + " "
+                + programme.get("title", "")
+            )
+            if role == QtCore.Qt.ItemDataRole.ToolTipRole:
+                line = (
+                    line
+                    + " - "
+                    + time.strftime("%H:%M", time.localtime(programme["stop"]))
+                )
+                if programme.get("desc", ""):
+                    line += "\n" + programme["desc"]
+            lines.append(line)
+        return "\n".join(lines) if lines else None
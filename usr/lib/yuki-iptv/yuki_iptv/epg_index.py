@@ -0,0 +1,164 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import time
+from bisect import bisect_left, bisect_right
+from yuki_iptv.epg_cache import EPGCache
+
+
+class ChannelIndex:
+    """Start/stop arrays of one channel programmes
+
+    prefix_stops[i] is the latest stop of programmes 0..i, it never
+    decreases, so programmes which stopped before some moment can be
+    skipped with bisection even if programmes overlap.
+    """
+
+    __slots__ = ("programmes", "starts", "prefix_stops", "is_sorted")
+
+    def __init__(self, programmes):
+        self.programmes = programmes
+        self.starts = [programme["start"] for programme in programmes]
+        self.prefix_stops = []
+        latest_stop = float("-inf")
+        for programme in programmes:
+            if programme["stop"] > latest_stop:
+                latest_stop = programme["stop"]
+            self.prefix_stops.append(latest_stop)
+        self.is_sorted = all(
+            self.starts[i] <= self.starts[i + 1] for i in range(len(self.starts) - 1)
+        )
+
+    def get_range_positions(self, time_start, time_stop):
+        """Positions of programmes with stop > time_start and start < time_stop"""
+        if self.is_sorted:
+            first = bisect_right(self.prefix_stops, time_start)
+            last = bisect_left(self.starts, time_stop)
+        else:
+            first = 0
+            last = len(self.programmes)
+        return [
+            position
+            for position in range(first, last)
+            if self.programmes[position]["stop"] > time_start
+            and self.programmes[position]["start"] < time_stop
+        ]
+
+
+class ProgrammeIndex:
+    """Time index for programmes, channel indexes are built on first use"""
+
+    def __init__(self, programmes):
+        self.programmes = programmes
+        self.channels = {}
+
+    def get_channel(self, channel_name):
+        channel_programmes = self.programmes[channel_name]
+        try:
+            channel_index = self.channels[channel_name]
+            if channel_index.programmes is channel_programmes:
+                return channel_index
+        except KeyError:
+            pass
+        channel_index = ChannelIndex(channel_programmes)
+        self.channels[channel_name] = channel_index
+        return channel_index
+
+    def get_range_positions(self, channel_name, time_start, time_stop):
+        """Positions of programmes which overlap (time_start, time_stop)"""
+        if channel_name not in self.programmes:
+            return []
+        return self.get_channel(channel_name).get_range_positions(time_start, time_stop)
+
+    def get_range(self, channel_name, time_start, time_stop):
+        """Programmes which overlap (time_start, time_stop)"""
+        if channel_name not in self.programmes:
+            return []
+        channel_index = self.get_channel(channel_name)
+        return [
+            channel_index.programmes[position]
+            for position in channel_index.get_range_positions(time_start, time_stop)
+        ]
+
+    def get_current(self, channel_name, current_time=None):
+        """Programme running now or None"""
+        if current_time is None:
+            current_time = time.time()
+        if channel_name not in self.programmes:
+            return None
+        channel_index = self.get_channel(channel_name)
+        if channel_index.is_sorted:
+            first = bisect_right(channel_index.prefix_stops, current_time)
+            last = bisect_left(channel_index.starts, current_time)
+        else:
+            first = 0
+            last = len(channel_index.programmes)
+        for position in range(first, last):
+            programme = channel_index.programmes[position]
+            if current_time > programme["start"] and current_time < programme["stop"]:
+                return programme
+        return None
+
+    def get_next(self, channel_name, count=1, current_time=None):
+        """Next programmes which have not started yet"""
+        if current_time is None:
+            current_time = time.time()
+        if channel_name not in self.programmes:
+            return []
+        channel_index = self.get_channel(channel_name)
+        if channel_index.is_sorted:
+            first = bisect_right(channel_index.starts, current_time)
+            return channel_index.programmes[first : first + count]
+        return [
+            programme
+            for programme in channel_index.programmes
+            if programme["start"] > current_time
+        ][:count]
+
+    def has_programme_at(self, current_time):
+        """Check if any channel has programme running at given time"""
+        if isinstance(self.programmes, EPGCache):
+            return self.programmes.has_programme_at(current_time)
+        for channel_name in self.programmes:
+            if self.get_current(channel_name, current_time) is not None:
+                return True
+        return False
+
+
+def split_into_slots(programmes, window_start, slot_size, slots_count):
+    """Programmes overlapping each time slot of window
+
+    programmes must be sorted by start, slot i is
+    (window_start + i * slot_size, window_start + (i + 1) * slot_size).
+    """
+    slots = [[] for _ in range(slots_count)]
+    window_stop = window_start + slot_size * slots_count
+    for programme in programmes:
+        start = max(programme["start"], window_start)
+        stop = min(programme["stop"], window_stop)
+        if stop <= start:
+            continue
+        first_slot = int((start - window_start) // slot_size)
+        last_slot = int(-((window_start - stop) // slot_size))
+        for slot in range(first_slot, min(last_slot, slots_count)):
+            slots[slot].append(programme)
+    return slots
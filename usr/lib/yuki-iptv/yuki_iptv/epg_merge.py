@@ -0,0 +1,89 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import heapq
+
+EPG_MERGE_LAST = 0
+EPG_MERGE_FIRST = 1
+EPG_MERGE_UNION = 2
+
+
+class EPGMerger:
+    """Accumulates parsed EPG sources in place
+
+    Sources are expected to have their programme lists sorted by start time.
+    For channels present in several sources the policy decides which
+    programmes are kept: last source wins, first source wins, or union
+    of all sources without duplicates (same start and title).
+    """
+
+    def __init__(self, policy=EPG_MERGE_LAST):
+        self.policy = policy
+        self.programmes = {}
+        self.prog_ids = {}
+        self.icons = {}
+        self.seen = {}
+
+    def add(self, programmes, prog_ids, icons):
+        """Merge one source, cost depends only on the size of the source"""
+        if self.policy == EPG_MERGE_FIRST:
+            for target, source in (
+                (self.programmes, programmes),
+                (self.prog_ids, prog_ids),
+                (self.icons, icons),
+            ):
+                for key, value in source.items():
+                    target.setdefault(key, value)
+        elif self.policy == EPG_MERGE_UNION:
+            self.add_union(programmes, prog_ids)
+            self.icons.update(icons)
+        else:
+            self.programmes.update(programmes)
+            self.prog_ids.update(prog_ids)
+            self.icons.update(icons)
+
+    def add_union(self, programmes, prog_ids):
+        for name, channel_programmes in programmes.items():
+            seen = self.seen.setdefault(name, set())
+            new_programmes = []
+            for programme in channel_programmes:
+                programme_key = (programme["start"], programme["title"])
+                if programme_key not in seen:
+                    seen.add(programme_key)
+                    new_programmes.append(programme)
+            existing = self.programmes.get(name)
+            if existing is None:
+                self.programmes[name] = new_programmes
+            elif new_programmes:
+                # Both are sorted already, so they are merged, not sorted again
+                self.programmes[name] = list(
+                    heapq.merge(
+                        existing,
+                        new_programmes,
+                        key=lambda programme: programme["start"],
+                    )
+                )
+        for prog_id, names in prog_ids.items():
+            existing_names = self.prog_ids.setdefault(prog_id, [])
+            for name in names:
+                if name not in existing_names:
+                    existing_names.append(name)
@@ -0,0 +1,85 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+EPG_SOURCE_EPGNAME = "epgname"
+EPG_SOURCE_TVG_ID = "tvg-id"
+EPG_SOURCE_TVG_NAME = "tvg-name"
+EPG_SOURCE_TITLE = "title"
+EPG_SOURCE_NONE = "none"
+EPG_SOURCES = (
+    EPG_SOURCE_EPGNAME,
+    EPG_SOURCE_TVG_ID,
+    EPG_SOURCE_TVG_NAME,
+    EPG_SOURCE_TITLE,
+    EPG_SOURCE_NONE,
+)
+
+
+def resolve_epg_name(name, channel, channel_settings, programmes, prog_ids):
+    """EPG name for channel and where it was found
+
+    Checked in order: EPG name from channel settings, tvg-id,
+    tvg-name (also with spaces replaced by underscores), channel name.
+    """
+    # First, match EPG name from settings
+    if name in channel_settings and channel_settings[name].get("epgname"):
+        epg_name = str(channel_settings[name]["epgname"]).lower()
+        if epg_name in programmes:
+            return epg_name, EPG_SOURCE_EPGNAME
+
+    # Second, match from tvg-id
+    tvg_id = channel.get("tvg-ID")
+    if tvg_id and str(tvg_id) in prog_ids:
+        prog_search_lst = prog_ids[str(tvg_id)]
+        if prog_search_lst:
+            return prog_search_lst[0].lower(), EPG_SOURCE_TVG_ID
+
+    # Third, match from tvg-name
+    tvg_name = channel.get("tvg-name")
+    if tvg_name:
+        if str(tvg_name).lower() in programmes:
+            return str(tvg_name).lower(), EPG_SOURCE_TVG_NAME
+        spaces_replaced_name = str(tvg_name).replace(" ", "_").lower()
+        if spaces_replaced_name in programmes:
+            return spaces_replaced_name, EPG_SOURCE_TVG_NAME
+
+    # Last, match from channel name
+    if name.lower() in programmes:
+        return name.lower(), EPG_SOURCE_TITLE
+    return name.lower(), EPG_SOURCE_NONE
+
+
+def resolve_epg_names(array, channel_settings, programmes, prog_ids):
+    """EPG names for whole playlist
+
+    Returns map from lowercase channel name to EPG name
+    and number of channels matched by each source.
+    """
+    epg_names = {}
+    report = dict.fromkeys(EPG_SOURCES, 0)
+    for name, channel in array.items():
+        epg_name, source = resolve_epg_name(
+            name, channel, channel_settings, programmes, prog_ids
+        )
+        epg_names[name.lower()] = epg_name
+        report[source] += 1
+    return epg_names, report
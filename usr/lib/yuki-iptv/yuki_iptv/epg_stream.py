@@ -0,0 +1,136 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import zlib
+import lzma
+import logging
+import tempfile
+import xml.etree.ElementTree as ET
+from yuki_iptv.chunks import peek_chunks
+from yuki_iptv.epg_xmltv import parse_xmltv_chunks
+from yuki_iptv.epg_zip import parse_epg_zip
+from yuki_iptv.epg_txt import parse_txt
+
+logger = logging.getLogger(__name__)
+
+GZIP_MAGIC = b"\x1f\x8b"
+XZ_MAGIC = b"\xfd7zXZ\x00"
+ZIP_MAGIC = b"PK\x03\x04"
+TXT_MAGIC = b"tv.all"
+MAGIC_SIZE = 6
+
+
+def detect_epg_format(head):
+    """Detect EPG format by magic bytes"""
+    if head.startswith(GZIP_MAGIC):
+        return "gzip"
+    if head.startswith(XZ_MAGIC):
+        return "xz"
+    if head.startswith(ZIP_MAGIC):
+        return "zip"
+    if head.startswith(TXT_MAGIC):
+        return "txt"
+    return "xml"
+
+
+def gzip_chunks(chunks):
+    """Streaming gzip decompression (multiple members supported)"""
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    member_start = False
+    pending = b""
+    for chunk in chunks:
+        chunk = pending + chunk
+        pending = b""
+        while chunk:
+            if member_start:
+                if len(chunk) < len(GZIP_MAGIC):
+                    # Magic of next member is split between chunks
+                    pending = chunk
+                    break
+                if not chunk.startswith(GZIP_MAGIC):
+                    # Trailing garbage, ignore it like gzip module does
+                    return
+                member_start = False
+            data = decompressor.decompress(chunk)
+            if data:
+                yield data
+            chunk = b""
+            if decompressor.eof:
+                chunk = decompressor.unused_data
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                member_start = True
+    if not member_start:
+        tail = decompressor.flush()
+        if tail:
+            yield tail
+
+
+def xz_chunks(chunks):
+    """Streaming xz decompression"""
+    decompressor = lzma.LZMADecompressor()
+    for chunk in chunks:
+        if decompressor.eof:
+            break
+        data = decompressor.decompress(chunk)
+        if data:
+            yield data
+
+
+def parse_epg_stream(chunks, settings, set_progress=None):
+    """Detect format and parse EPG from iterable of chunks
+
+    Returns [programmes, ids, icons]
+    """
+    head, chunks = peek_chunks(chunks, MAGIC_SIZE)
+    epg_format = detect_epg_format(head)
+    if epg_format in ("gzip", "xz"):
+        logger.info(f"{epg_format} stream detected, unpacking on the fly")
+        if set_progress:
+            set_progress("unpacking")
+        if epg_format == "gzip":
+            chunks = gzip_chunks(chunks)
+        else:
+            chunks = xz_chunks(chunks)
+        return parse_epg_stream(chunks, settings, set_progress)
+    if epg_format == "zip":
+        logger.info("ZIP file detected")
+        # ZIP central directory is at the end of file,
+        # so spool it to disk instead of keeping it in memory
+        with tempfile.TemporaryFile() as zip_epg:
+            for chunk in chunks:
+                zip_epg.write(chunk)
+            zip_epg.seek(0)
+            if set_progress:
+                set_progress("parsing")
+            pr_zip = parse_epg_zip(zip_epg, settings)
+        if isinstance(pr_zip, list) and pr_zip[0] == "xmltv":
+            return pr_zip[1]
+        return [pr_zip, {}, {}]
+    if set_progress:
+        set_progress("parsing")
+    if epg_format == "txt":
+        return [parse_txt(b"".join(chunks)), {}, {}]
+    logger.info("Trying parsing as XMLTV...")
+    try:
+        return parse_xmltv_chunks(chunks, settings)
+    except ET.ParseError:
+        raise Exception("Unknown EPG format or parsing failed!")
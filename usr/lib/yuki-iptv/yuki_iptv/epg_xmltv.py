@@ -22,13 +22,9 @@
 # https://creativecommons.org/licenses/by/4.0/
 #
 import logging
-import gettext
-import gzip
-import lzma
 import datetime
 import xml.etree.ElementTree as ET
 
-_ = gettext.gettext
 logger = logging.getLogger(__name__)
 
 
@@ -60,88 +56,165 @@ def parse_timestamp(ts_string, settings):
     return ts
 
 
-def parse_as_xmltv(
-    epg, settings, catchup_days1, progress_dict, epg_i, epg_settings_url
-):
-    """Load EPG file"""
-    logger.info("Trying parsing as XMLTV...")
-    logger.info(f"catchup-days = {catchup_days1}")
-    try:
-        tree = ET.ElementTree(ET.fromstring(epg))
-    except ET.ParseError:
-        progress_dict["epg_progress"] = _(
-            "Updating TV guide... (unpacking {}/{})"
-        ).format(epg_i, len(epg_settings_url))
-        try:
-            logger.info("Trying to unpack as gzip...")
-            tree = ET.ElementTree(ET.fromstring(gzip.decompress(epg)))
-        except Exception:
-            logger.info("Trying to unpack as xz...")
-            tree = ET.ElementTree(
-                ET.fromstring(lzma.LZMADecompressor().decompress(epg))
-            )
-    progress_dict["epg_progress"] = _("Updating TV guide... (parsing {}/{})").format(
-        epg_i, len(epg_settings_url)
-    )
-    ids = {}
-    programmes_epg = {}
-    icons = {}
-    for channel_epg in tree.findall("./channel"):
+XMLTV_CHUNK_SIZE = 1024 * 1024
+
+
+class XMLTVParser:
+    """Incremental XMLTV parser
+
+    Handles <channel> and <programme> elements as they arrive and
+    clears them right after, so memory usage does not depend on
+    document size. Programmes are emitted per channel as soon as
+    the next channel's programmes start.
+    """
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.ids = {}
+        self.icons = {}
+        self.parser = ET.XMLPullParser(events=("start", "end"))
+        self.root = None
+        self.depth = 0
+        self.channel_id = None
+        self.channel_programmes = []
+        # Programmes which arrived before their <channel> element
+        self.orphans = {}
+
+    def feed(self, data):
+        """Feed chunk of XMLTV data, returns finished channels"""
+        self.parser.feed(data)
+        return self.read_events()
+
+    def close(self):
+        """Finish parsing, returns remaining channels"""
+        self.parser.close()
+        finished = self.read_events()
+        finished.extend(self.flush())
+        for orphan_id in self.orphans:
+            if orphan_id in self.ids:
+                finished.append((self.ids[orphan_id], self.orphans[orphan_id]))
+        self.orphans = {}
+        return finished
+
+    def read_events(self):
+        finished = []
+        for event, element in self.parser.read_events():
+            if event == "start":
+                if self.root is None:
+                    self.root = element
+                self.depth += 1
+                continue
+            self.depth -= 1
+            if self.depth == 1:
+                if element.tag == "channel":
+                    self.parse_channel(element)
+                elif element.tag == "programme":
+                    finished.extend(self.parse_programme(element))
+                # Processed elements are not needed anymore
+                self.root.clear()
+        return finished
+
+    def flush(self):
+        finished = []
+        if self.channel_programmes:
+            if self.channel_id in self.ids:
+                finished.append((self.ids[self.channel_id], self.channel_programmes))
+            else:
+                self.orphans.setdefault(self.channel_id, []).extend(
+                    self.channel_programmes
+                )
+        self.channel_id = None
+        self.channel_programmes = []
+        return finished
+
+    def parse_channel(self, channel_epg):
         for display_name in channel_epg.findall("./display-name"):
             if display_name.text:
-                if not channel_epg.attrib["id"].strip() in ids:
-                    ids[channel_epg.attrib["id"].strip()] = []
-                ids[channel_epg.attrib["id"].strip()].append(display_name.text.strip())
+                if not channel_epg.attrib["id"].strip() in self.ids:
+                    self.ids[channel_epg.attrib["id"].strip()] = []
+                self.ids[channel_epg.attrib["id"].strip()].append(
+                    display_name.text.strip()
+                )
             try:
                 all_icons = channel_epg.findall("./icon")
                 if all_icons:
                     for icon in all_icons:
                         try:
                             if "src" in icon.attrib:
-                                icons[display_name.text.strip().lower()] = icon.attrib[
-                                    "src"
-                                ].strip()
+                                self.icons[
+                                    display_name.text.strip().lower()
+                                ] = icon.attrib["src"].strip()
                         except Exception:
                             pass
             except Exception:
                 pass
-    for programme in tree.findall("./programme"):
+
+    def parse_programme(self, programme):
+        finished = []
         try:
-            start = parse_timestamp(programme.attrib["start"], settings)
+            channel_id = programme.attrib["channel"].strip()
+        except Exception:
+            return finished
+        if channel_id != self.channel_id:
+            finished = self.flush()
+            self.channel_id = channel_id
+        try:
+            start = parse_timestamp(programme.attrib["start"], self.settings)
         except Exception:
             start = 0
         try:
-            stop = parse_timestamp(programme.attrib["stop"], settings)
+            stop = parse_timestamp(programme.attrib["stop"], self.settings)
         except Exception:
             stop = 0
+        catchup_id = ""
         try:
-            chans = ids[programme.attrib["channel"].strip()]
-            catchup_id = ""
-            try:
-                if "catchup-id" in programme.attrib:
-                    catchup_id = programme.attrib["catchup-id"]
-            except Exception:
-                pass
-            for channel_epg_1 in chans:
-                if channel_epg_1 not in programmes_epg:
-                    programmes_epg[channel_epg_1] = []
-                try:
-                    prog_title = programme.find("./title").text
-                except Exception:
-                    prog_title = ""
-                try:
-                    prog_desc = programme.find("./desc").text
-                except Exception:
-                    prog_desc = ""
-                programmes_epg[channel_epg_1].append(
-                    {
-                        "start": start,
-                        "stop": stop,
-                        "title": prog_title,
-                        "desc": prog_desc,
-                        "catchup-id": catchup_id,
-                    }
-                )
+            if "catchup-id" in programme.attrib:
+                catchup_id = programme.attrib["catchup-id"]
         except Exception:
             pass
-    return [programmes_epg, ids, icons]
+        try:
+            prog_title = programme.find("./title").text
+        except Exception:
+            prog_title = ""
+        try:
+            prog_desc = programme.find("./desc").text
+        except Exception:
+            prog_desc = ""
+        self.channel_programmes.append(
+            {
+                "start": start,
+                "stop": stop,
+                "title": prog_title,
+                "desc": prog_desc,
+                "catchup-id": catchup_id,
+            }
+        )
+        return finished
+
+
+def iterparse_xmltv(chunks, settings, parser=None):
+    """Parse XMLTV chunk by chunk, yields (channel names, programmes)"""
+    if parser is None:
+        parser = XMLTVParser(settings)
+    for chunk in chunks:
+        for channel in parser.feed(chunk):
+            yield channel
+    for channel in parser.close():
+        yield channel
+
+
+def merge_xmltv_channels(channels, programmes_epg):
+    """Append per-channel programme lists to programmes dict"""
+    for channel_names, channel_programmes in channels:
+        for channel_epg_1 in channel_names:
+            if channel_epg_1 not in programmes_epg:
+                programmes_epg[channel_epg_1] = []
+            programmes_epg[channel_epg_1].extend(channel_programmes)
+    return programmes_epg
+
+
+def parse_xmltv_chunks(chunks, settings):
+    """Parse XMLTV from iterable of chunks"""
+    parser = XMLTVParser(settings)
+    programmes_epg = merge_xmltv_channels(iterparse_xmltv(chunks, settings, parser), {})
+    return [programmes_epg, parser.ids, parser.icons]
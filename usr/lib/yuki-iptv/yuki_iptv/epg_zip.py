@@ -22,13 +22,15 @@
 #
 import logging
 import zipfile
+from yuki_iptv.chunks import read_chunks
 from yuki_iptv.epg_txt import parse_txt
+from yuki_iptv.epg_xmltv import XMLTV_CHUNK_SIZE, parse_xmltv_chunks
 from yuki_iptv.epg_jtv import parse_epg_zip_jtv
 
 logger = logging.getLogger(__name__)
 
 
-def parse_epg_zip(zip_file):
+def parse_epg_zip(zip_file, settings):
     found = False
     with zipfile.ZipFile(zip_file) as myzip:
         namelist = myzip.namelist()
@@ -44,7 +46,13 @@ def parse_epg_zip(zip_file):
                 logger.info("XMLTV inside ZIP detected, trying to parse...")
                 found = True
                 with myzip.open(name) as myfile:
-                    return ["xmltv", myfile.read()]
+                    return [
+                        "xmltv",
+                        parse_xmltv_chunks(
+                            read_chunks(myfile, XMLTV_CHUNK_SIZE),
+                            settings,
+                        ),
+                    ]
                 break
             if name.endswith(".ndx"):
                 logger.info("JTV format detected, trying to parse...")
@@ -0,0 +1,218 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import os
+import mmap
+import threading
+from concurrent.futures import Future
+from functools import partial
+
+LOGO_ATLAS_FILE = "atlas.rgba"
+LOGO_ATLAS_INDEX_FILE = "atlas.csv"
+LOGO_TILE_SIZE = 64
+LOGO_TILE_BYTES = LOGO_TILE_SIZE * LOGO_TILE_SIZE * 4
+LOGO_ATLAS_MAX_TILES = 2048
+LOGO_BATCH_SIZE = 32
+LOGO_BATCH_DELAY = 0.05
+
+
+class LogoAtlas:
+    """Logo tiles packed into one memory-mapped file
+
+    Atlas file is array of LOGO_TILE_SIZE px RGBA tiles, index file
+    has "tile,name" line for every tile, appended after tile is written.
+    Logo service adds tiles, UI reads only new index lines and maps
+    atlas file again when it grew. Full atlas is started again
+    as new files, readers notice it by changed inode of index.
+    """
+
+    def __init__(self, atlas_dir, max_tiles=LOGO_ATLAS_MAX_TILES):
+        self.atlas_file = os.path.join(atlas_dir, LOGO_ATLAS_FILE)
+        self.index_file = os.path.join(atlas_dir, LOGO_ATLAS_INDEX_FILE)
+        self.max_tiles = max_tiles
+        self.tiles = {}
+        self.index_offset = 0
+        self.index_inode = None
+        self.atlas_map = None
+        self.mapped_size = 0
+        self.lock = threading.Lock()
+        with self.lock:
+            self.refresh()
+
+    def close(self):
+        if self.atlas_map is not None:
+            self.atlas_map.close()
+            self.atlas_map = None
+        self.mapped_size = 0
+
+    def reset(self):
+        self.close()
+        self.tiles = {}
+        self.index_offset = 0
+        self.index_inode = None
+
+    def refresh(self):
+        """Read index lines added since last time"""
+        try:
+            index_stat = os.stat(self.index_file)
+        except OSError:
+            self.reset()
+            return
+        if index_stat.st_ino != self.index_inode:
+            self.reset()
+            self.index_inode = index_stat.st_ino
+        if index_stat.st_size <= self.index_offset:
+            return
+        with open(self.index_file, "rb") as index_fd:
+            index_fd.seek(self.index_offset)
+            index_data = index_fd.read(index_stat.st_size - self.index_offset)
+        # Last line can be not written completely yet
+        index_end = index_data.rfind(b"\n") + 1
+        for line in index_data[:index_end].decode("utf-8").splitlines():
+            tile, name = line.split(",", 1)
+            self.tiles[name] = int(tile)
+        self.index_offset += index_end
+
+    def map(self):
+        self.close()
+        try:
+            with open(self.atlas_file, "rb") as atlas_fd:
+                atlas_size = os.fstat(atlas_fd.fileno()).st_size
+                if atlas_size:
+                    self.atlas_map = mmap.mmap(
+                        atlas_fd.fileno(), atlas_size, access=mmap.ACCESS_READ
+                    )
+                    self.mapped_size = atlas_size
+        except OSError:
+            pass
+
+    def get_tile(self, name):
+        """RGBA pixels of logo or None if it is not in atlas"""
+        with self.lock:
+            self.refresh()
+            if name not in self.tiles:
+                return None
+            tile_start = self.tiles[name] * LOGO_TILE_BYTES
+            if tile_start + LOGO_TILE_BYTES > self.mapped_size:
+                self.map()
+                if tile_start + LOGO_TILE_BYTES > self.mapped_size:
+                    return None
+            return self.atlas_map[tile_start : tile_start + LOGO_TILE_BYTES]
+
+    def has_tile(self, name):
+        with self.lock:
+            return name in self.tiles
+
+    def add_tile(self, name, pixels):
+        """Write logo to atlas, only one process may add tiles"""
+        if len(pixels) != LOGO_TILE_BYTES:
+            raise Exception("Wrong size of logo tile")
+        with self.lock:
+            if name in self.tiles:
+                return
+            if len(self.tiles) >= self.max_tiles or self.index_inode is None:
+                self.start_again()
+            tile = len(self.tiles)
+            with open(self.atlas_file, "r+b") as atlas_fd:
+                atlas_fd.seek(tile * LOGO_TILE_BYTES)
+                atlas_fd.write(pixels)
+            index_line = f"{tile},{name}\n".encode("utf-8")
+            with open(self.index_file, "ab") as index_fd:
+                index_fd.write(index_line)
+            self.tiles[name] = tile
+            self.index_offset += len(index_line)
+
+    def start_again(self):
+        """Replace atlas with empty one"""
+        for atlas_file in (self.atlas_file, self.index_file):
+            with open(atlas_file + ".tmp", "wb"):
+                pass
+            os.replace(atlas_file + ".tmp", atlas_file)
+        self.reset()
+        self.index_inode = os.stat(self.index_file).st_ino
+
+
+class LogoTranscoder:
+    """Converts logos coming from many threads in batches
+
+    transcode_func(contents) returns result for every content and
+    runs on executor, batch is sent when it is full or after short
+    delay. transcode() waits for result of its content.
+    """
+
+    def __init__(
+        self,
+        transcode_func,
+        executor,
+        batch_size=LOGO_BATCH_SIZE,
+        batch_delay=LOGO_BATCH_DELAY,
+    ):
+        self.transcode_func = transcode_func
+        self.executor = executor
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.batch = []
+        self.timer = None
+        self.lock = threading.Lock()
+
+    def transcode(self, content):
+        future = Future()
+        with self.lock:
+            self.batch.append((content, future))
+            if len(self.batch) >= self.batch_size:
+                self.submit_batch()
+            elif self.timer is None:
+                self.timer = threading.Timer(self.batch_delay, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+        return future.result()
+
+    def flush(self):
+        with self.lock:
+            self.submit_batch()
+
+    def submit_batch(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        batch, self.batch = self.batch, []
+        if not batch:
+            return
+        try:
+            batch_future = self.executor.submit(
+                self.transcode_func, [content for content, future in batch]
+            )
+        except Exception as exc:
+            for content, future in batch:
+                future.set_exception(exc)
+            return
+        batch_future.add_done_callback(partial(self.batch_done, batch))
+
+    def batch_done(self, batch, batch_future):
+        try:
+            results = batch_future.result()
+        except Exception as exc:
+            for content, future in batch:
+                future.set_exception(exc)
+            return
+        for (content, future), result in zip(batch, results):
+            future.set_result(result)
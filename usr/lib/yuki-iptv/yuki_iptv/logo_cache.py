@@ -0,0 +1,212 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import os
+import json
+import time
+import base64
+import hashlib
+import logging
+import threading
+import traceback
+
+logger = logging.getLogger(__name__)
+
+LOGO_CACHE_MANIFEST = "manifest.json"
+LOGO_CACHE_MAX_SIZE = 64 * 1024 * 1024
+# Logo is checked for changes after this time
+LOGO_REFRESH_AGE = 7 * 24 * 3600
+# Failed logo is tried again after delay, doubled on every failure
+LOGO_RETRY_DELAY = 60
+LOGO_RETRY_MAX_DELAY = 24 * 3600
+
+
+def get_legacy_logo_file(logo_url):
+    """Name of logo file in cache made by older versions"""
+    base64_enc = base64.b64encode(bytes(logo_url, "utf-8")).decode("utf-8")
+    return str(hashlib.sha512(bytes(base64_enc, "utf-8")).hexdigest()) + ".png"
+
+
+class LogoCache:
+    """logo_cache directory with manifest of logo URLs
+
+    Logo files are named by hash of downloaded content, so same
+    image used by many URLs is stored once. Manifest keeps file,
+    ETag and Last-Modified of every URL, failures with time
+    of next try and last use of files for eviction.
+    """
+
+    def __init__(self, cache_dir, max_size=LOGO_CACHE_MAX_SIZE):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.manifest_file = os.path.join(cache_dir, LOGO_CACHE_MANIFEST)
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.changed = False
+        self.load()
+
+    def load(self):
+        if not os.path.isfile(self.manifest_file):
+            return
+        try:
+            with open(self.manifest_file, "r", encoding="utf8") as manifest_fd:
+                self.entries = json.loads(manifest_fd.read())["entries"]
+        except Exception:
+            logger.warning("Failed to load logo cache manifest")
+            logger.warning(traceback.format_exc())
+
+    def save(self):
+        """Evict old logos and write manifest, if something changed"""
+        with self.lock:
+            if not self.changed:
+                return
+            try:
+                self.evict()
+                manifest_file_tmp = self.manifest_file + ".tmp"
+                with open(manifest_file_tmp, "w", encoding="utf8") as manifest_fd:
+                    manifest_fd.write(json.dumps({"entries": self.entries}))
+                os.replace(manifest_file_tmp, self.manifest_file)
+                self.changed = False
+            except Exception:
+                logger.warning("Failed to save logo cache manifest")
+                logger.warning(traceback.format_exc())
+
+    def get_path(self, logo_file):
+        return os.path.join(self.cache_dir, logo_file)
+
+    def get_content_file(self, content):
+        """Path of logo file for downloaded content"""
+        return self.get_path(hashlib.sha256(content).hexdigest() + ".png")
+
+    def lookup(self, logo_url, current_time=None):
+        """Returns (logo file or None, request headers)
+
+        Request headers are None if logo should not be downloaded now,
+        else they make request conditional when logo is already cached.
+        """
+        if current_time is None:
+            current_time = time.time()
+        with self.lock:
+            entry = self.entries.get(logo_url)
+            if entry is None:
+                legacy_file = get_legacy_logo_file(logo_url)
+                if not os.path.isfile(self.get_path(legacy_file)):
+                    return None, {}
+                entry = {
+                    "file": legacy_file,
+                    "checked": os.path.getmtime(self.get_path(legacy_file)),
+                }
+                self.entries[logo_url] = entry
+            logo_file = None
+            if entry.get("file"):
+                if os.path.isfile(self.get_path(entry["file"])):
+                    logo_file = self.get_path(entry["file"])
+                    entry["used"] = current_time
+                    self.changed = True
+                else:
+                    # Removed from cache directory
+                    entry = self.entries[logo_url] = {}
+            if entry.get("retry", 0) > current_time:
+                return logo_file, None
+            if logo_file:
+                if current_time - entry.get("checked", 0) < LOGO_REFRESH_AGE:
+                    return logo_file, None
+                headers = {}
+                if entry.get("etag"):
+                    headers["If-None-Match"] = entry["etag"]
+                if entry.get("last_modified"):
+                    headers["If-Modified-Since"] = entry["last_modified"]
+                return logo_file, headers
+            return None, {}
+
+    def store(
+        self, logo_url, logo_path, etag=None, last_modified=None, current_time=None
+    ):
+        """Save downloaded logo, logo_path is from get_content_file()"""
+        if current_time is None:
+            current_time = time.time()
+        with self.lock:
+            self.entries[logo_url] = {
+                "file": os.path.basename(logo_path),
+                "etag": etag,
+                "last_modified": last_modified,
+                "checked": current_time,
+                "used": current_time,
+            }
+            self.changed = True
+        return logo_path
+
+    def not_modified(self, logo_url, current_time=None):
+        """Logo is not changed on server"""
+        if current_time is None:
+            current_time = time.time()
+        with self.lock:
+            entry = self.entries.get(logo_url)
+            if entry is not None:
+                entry["checked"] = current_time
+                entry.pop("failures", None)
+                entry.pop("retry", None)
+                self.changed = True
+
+    def failed(self, logo_url, current_time=None):
+        """Download failed, cached logo (if any) is kept"""
+        if current_time is None:
+            current_time = time.time()
+        with self.lock:
+            entry = self.entries.setdefault(logo_url, {})
+            entry["failures"] = entry.get("failures", 0) + 1
+            entry["retry"] = current_time + min(
+                LOGO_RETRY_DELAY * 2 ** (entry["failures"] - 1), LOGO_RETRY_MAX_DELAY
+            )
+            self.changed = True
+
+    def evict(self):
+        """Remove least recently used files over size limit"""
+        files_used = {}
+        for entry in self.entries.values():
+            if entry.get("file"):
+                files_used[entry["file"]] = max(
+                    files_used.get(entry["file"], 0), entry.get("used", 0)
+                )
+        files_size = {}
+        for logo_file in files_used:
+            try:
+                files_size[logo_file] = os.path.getsize(self.get_path(logo_file))
+            except Exception:
+                files_size[logo_file] = 0
+        total_size = sum(files_size.values())
+        evicted = set()
+        for logo_file in sorted(files_used, key=files_used.get):
+            # Newest file is always kept
+            if total_size <= self.max_size or len(evicted) + 1 == len(files_used):
+                break
+            try:
+                os.remove(self.get_path(logo_file))
+            except Exception:
+                pass
+            total_size -= files_size[logo_file]
+            evicted.add(logo_file)
+        if evicted:
+            logger.debug(f"Evicted {len(evicted)} logos from cache")
+            for logo_url in list(self.entries):
+                if self.entries[logo_url].get("file") in evicted:
+                    del self.entries[logo_url]
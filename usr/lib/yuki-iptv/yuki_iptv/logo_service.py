@@ -0,0 +1,199 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import logging
+import threading
+import traceback
+import urllib.parse
+from collections import OrderedDict
+import requests
+
+logger = logging.getLogger(__name__)
+
+LOGO_FETCH_WORKERS = 16
+
+
+class LogoService:
+    """Downloads channel logos in pool of worker threads
+
+    fetch_func(session, logo_url, user_agent, referer) returns logo file
+    or None, session is shared by all downloads from same host.
+    Same logo URL is fetched once for all channels which have it.
+    logo_func(channel_name, [m3u logo, epg logo]) is called when
+    both logos of channel are ready, idle_func() - when nothing
+    left to download.
+    """
+
+    def __init__(
+        self, fetch_func, logo_func, idle_func=None, workers=LOGO_FETCH_WORKERS
+    ):
+        self.fetch_func = fetch_func
+        self.logo_func = logo_func
+        self.idle_func = idle_func
+        self.workers = workers
+        self.sessions = {}
+        # Logo URL -> logo file, None if download failed
+        self.results = {}
+        # Logo URLs to download, first ones are on screen now
+        self.pending = OrderedDict()
+        self.in_progress = set()
+        # Channel name -> logo URLs, channels waiting for logos
+        self.channels = {}
+        # Logo URL -> names of channels waiting for it
+        self.url_channels = {}
+        self.condition = threading.Condition()
+        self.stopped = False
+        self.threads = []
+        for i in range(workers):
+            thread = threading.Thread(
+                target=self.worker, name=f"[yuki-iptv] logo_worker_{i}", daemon=True
+            )
+            thread.start()
+            self.threads.append(thread)
+
+    def request(self, requested_logos):
+        """requested_logos - {channel name: [m3u logo, epg logo, ua, referer]}
+
+        Logos of requested channels go to front of the queue,
+        older requests not yet started are kept after them.
+        """
+        ready = []
+        with self.condition:
+            pending = OrderedDict()
+            for channel_name, logo_request in requested_logos.items():
+                logo_urls = logo_request[:2]
+                for logo_url in logo_urls:
+                    if not logo_url or logo_url in self.in_progress:
+                        continue
+                    if logo_url in self.results:
+                        # Failed download is tried again
+                        if self.results[logo_url] is not None:
+                            continue
+                        del self.results[logo_url]
+                    if logo_url not in pending:
+                        pending[logo_url] = (logo_request[2], logo_request[3])
+                self.add_channel(channel_name, logo_urls)
+            for logo_url, headers in self.pending.items():
+                if logo_url not in pending:
+                    pending[logo_url] = headers
+            self.pending = pending
+            ready = self.pop_ready_channels(list(requested_logos))
+            self.condition.notify_all()
+        for channel_name, logos in ready:
+            self.logo_func(channel_name, logos)
+        if not pending:
+            self.check_idle()
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.pending.clear()
+            self.condition.notify_all()
+        for session in self.sessions.values():
+            session.close()
+
+    def is_busy(self):
+        with self.condition:
+            return bool(self.pending or self.in_progress)
+
+    def get_session(self, logo_url):
+        """Session with connection pool for host of logo URL"""
+        host = urllib.parse.urlsplit(logo_url).netloc
+        with self.condition:
+            if host not in self.sessions:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=1, pool_maxsize=self.workers
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self.sessions[host] = session
+            return self.sessions[host]
+
+    def add_channel(self, channel_name, logo_urls):
+        """Channel is waiting for logos, called with lock held"""
+        self.remove_channel(channel_name)
+        self.channels[channel_name] = logo_urls
+        for logo_url in logo_urls:
+            if logo_url:
+                self.url_channels.setdefault(logo_url, set()).add(channel_name)
+
+    def remove_channel(self, channel_name):
+        """Channel is not waiting for logos, called with lock held"""
+        for logo_url in self.channels.pop(channel_name, ()):
+            if logo_url in self.url_channels:
+                self.url_channels[logo_url].discard(channel_name)
+                if not self.url_channels[logo_url]:
+                    del self.url_channels[logo_url]
+
+    def pop_ready_channels(self, channel_names):
+        """Given channels with all logos downloaded, called with lock held"""
+        ready = []
+        for channel_name in channel_names:
+            logo_urls = self.channels.get(channel_name)
+            if logo_urls is None:
+                continue
+            if all(not logo_url or logo_url in self.results for logo_url in logo_urls):
+                ready.append(
+                    (
+                        channel_name,
+                        [
+                            self.results[logo_url] if logo_url else None
+                            for logo_url in logo_urls
+                        ],
+                    )
+                )
+        for channel_name, logos in ready:
+            self.remove_channel(channel_name)
+        return ready
+
+    def check_idle(self):
+        if self.idle_func and not self.is_busy():
+            self.idle_func()
+
+    def worker(self):
+        while True:
+            with self.condition:
+                while not self.pending and not self.stopped:
+                    self.condition.wait()
+                if self.stopped:
+                    return
+                logo_url, (user_agent, referer) = self.pending.popitem(last=False)
+                self.in_progress.add(logo_url)
+            logo_file = None
+            try:
+                logo_file = self.fetch_func(
+                    self.get_session(logo_url), logo_url, user_agent, referer
+                )
+            except Exception:
+                logger.warning(f"Failed to fetch logo '{logo_url}'")
+                logger.warning(traceback.format_exc())
+            with self.condition:
+                self.in_progress.discard(logo_url)
+                self.results[logo_url] = logo_file
+                # Only channels waiting for this logo can be ready now
+                ready = self.pop_ready_channels(
+                    list(self.url_channels.get(logo_url, ()))
+                )
+            for channel_name, logos in ready:
+                self.logo_func(channel_name, logos)
+            self.check_idle()
@@ -21,11 +21,95 @@
 # https://fontawesome.com/
 # https://creativecommons.org/licenses/by/4.0/
 #
+import io
 import re
+import codecs
 import logging
+import itertools
+from yuki_iptv.channel import Channel
+from yuki_iptv.chunks import peek_chunks, read_chunks
 
 logger = logging.getLogger(__name__)
 
+EXTINF_ATTRIBUTES = (
+    "tvg-url",
+    "url-tvg",
+    "group-title",
+    "tvg-group",
+    "catchup",
+    "catchup-type",
+    "tvg-name",
+    "tvg-id",
+    "tvg-ID",
+    "tvg-logo",
+    "catchup-source",
+    "catchup-days",
+    "user-agent",
+)
+# Value is matched in lookahead, so attributes found inside other attribute
+# values are still seen (same as separate search for every attribute).
+# No attribute name is a suffix of another one, so names can be consumed.
+EXTINF_ATTRIBUTES_REGEX = re.compile(
+    "(" + "|".join(re.escape(name) for name in EXTINF_ATTRIBUTES) + ')="(?=(.*?)")'
+)
+EXTINF_TITLE_REGEX = re.compile('\\="(.*?)"')
+
+M3U_CHUNK_SIZE = 64 * 1024
+M3U_PREFIX_SIZE = 64 * 1024
+
+
+def detect_m3u_encoding(prefix):
+    """Detect playlist encoding using only first bytes of playlist"""
+    try:
+        # Last character may be cut, so not final
+        codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    logger.warning("Playlist is not UTF-8 encoding")
+    logger.info("Trying to detect encoding...")
+    encoding = ""
+    try:
+        import chardet
+
+        encoding = chardet.detect(prefix)["encoding"]
+    except Exception:
+        pass
+    if not encoding:
+        raise UnicodeError("Unknown playlist encoding")
+    logger.info(f"Guessed encoding: {encoding}")
+    return encoding
+
+
+def iter_m3u_lines(m3u):
+    """Split playlist into lines without reading it whole"""
+    if isinstance(m3u, str):
+        yield from io.StringIO(m3u)
+        return
+    if hasattr(m3u, "read") and not isinstance(m3u, io.TextIOBase):
+        m3u = read_chunks(m3u, M3U_CHUNK_SIZE)
+    m3u = iter(m3u)
+    for first_chunk in m3u:
+        if isinstance(first_chunk, str):
+            # Already lines
+            yield first_chunk
+            yield from m3u
+            return
+        prefix, chunks = peek_chunks(
+            itertools.chain([first_chunk], m3u), M3U_PREFIX_SIZE
+        )
+        # Bytes not matching detected encoding later in playlist are replaced
+        decoder = codecs.getincrementaldecoder(detect_m3u_encoding(prefix))(
+            errors="replace"
+        )
+        line_buffer = ""
+        for chunk in chunks:
+            line_buffer += decoder.decode(chunk)
+            lines = line_buffer.split("\n")
+            line_buffer = lines.pop()
+            yield from lines
+        yield line_buffer + decoder.decode(b"", final=True)
+
 
 class M3UParser:
     """M3U parser"""
@@ -63,6 +147,27 @@ class M3UParser:
         res = res.strip()
         return res
 
+    def parse_attributes(self, line_info):
+        """Find all known EXTINF attributes in one pass
+
+        Same result as parse_regexp for every attribute:
+        first occurrence is used, values are stripped.
+        """
+        # Reversed, so first occurrence of attribute is kept
+        attributes = dict(reversed(EXTINF_ATTRIBUTES_REGEX.findall(line_info)))
+        for name in attributes:
+            attributes[name] = attributes[name].strip()
+        if "catchup-days" in attributes:
+            try:
+                attributes["catchup-days"] = str(int(attributes["catchup-days"]))
+            except Exception:
+                logger.warning(
+                    "M3U STANDARDS VIOLATION: catchup-days is not int "
+                    f"(got '{attributes['catchup-days']}')"
+                )
+                del attributes["catchup-days"]
+        return attributes
+
     def parse_url_kodi_arguments(self, url):
         """Parse Kodi-style URL arguments"""
         useragent = ""
@@ -99,7 +204,7 @@ class M3UParser:
         return url, useragent, referrer
 
     def get_title(self, line_info):
-        title_regex = re.sub('\\="(.*?)"', "", line_info).split(",", 1)
+        title_regex = EXTINF_TITLE_REGEX.sub("", line_info).split(",", 1)
         if len(title_regex) < 2:
             title = ""
         else:
@@ -119,38 +224,40 @@ class M3UParser:
             ch_url = ch_url.replace("//udp/", "/udp/").replace("//rtp/", "/rtp/")
             ch_url = ch_url.replace("@", "")
 
-        tvg_url = self.parse_regexp("tvg-url", line_info)
-        url_tvg = self.parse_regexp("url-tvg", line_info)
+        attributes = self.parse_attributes(line_info)
+
+        tvg_url = attributes.get("tvg-url", "")
+        url_tvg = attributes.get("url-tvg", "")
         if not tvg_url and url_tvg:
             tvg_url = url_tvg
 
-        group = self.parse_regexp("group-title", line_info, "")
+        group = attributes.get("group-title", "")
         if not group:
-            group = self.parse_regexp("tvg-group", line_info, self.all_channels)
+            group = attributes.get("tvg-group", self.all_channels)
             if not group:
                 group = self.all_channels
 
-        catchup_tag = self.parse_regexp("catchup", line_info, "")
+        catchup_tag = attributes.get("catchup", "")
         if not catchup_tag:
-            catchup_tag = self.parse_regexp("catchup-type", line_info, "default")
+            catchup_tag = attributes.get("catchup-type", "default")
 
         ch_array = {
             "title": self.get_title(line_info),
-            "tvg-name": self.parse_regexp("tvg-name", line_info),
-            "tvg-ID": self.parse_regexp("tvg-id", line_info),
-            "tvg-logo": self.parse_regexp("tvg-logo", line_info),
+            "tvg-name": attributes.get("tvg-name", ""),
+            "tvg-ID": attributes.get("tvg-id", ""),
+            "tvg-logo": attributes.get("tvg-logo", ""),
             "tvg-group": group,
             "tvg-url": tvg_url,
             "catchup": catchup_tag,
-            "catchup-source": self.parse_regexp("catchup-source", line_info),
-            "catchup-days": self.parse_regexp("catchup-days", line_info, "1"),
-            "useragent": self.parse_regexp("user-agent", line_info),
+            "catchup-source": attributes.get("catchup-source", ""),
+            "catchup-days": attributes.get("catchup-days", "1"),
+            "useragent": attributes.get("user-agent", ""),
             "referer": "",
             "url": ch_url,
         }
 
         # search also for tvg-ID
-        tvg_id_2 = self.parse_regexp("tvg-ID", line_info)
+        tvg_id_2 = attributes.get("tvg-ID", "")
         if tvg_id_2 and not ch_array["tvg-ID"]:
             ch_array["tvg-ID"] = tvg_id_2
 
@@ -168,18 +275,31 @@ class M3UParser:
         for override in overrides:
             ch_array[override] = overrides[override]
 
-        return ch_array
+        return Channel(ch_array)
 
     def parse_m3u(self, m3u_str):
         """Parse m3u string"""
+        channels = list(self.iter_m3u(m3u_str))
+        return [channels, self.epg_url_final]
+
+    def iter_m3u(self, m3u):
+        """Parse m3u, yields channels as soon as they are parsed
+
+        Accepts string, binary stream or iterable of lines / bytes chunks.
+        EPG URL is available in epg_url_final when parsing is finished.
+        """
         self.epg_urls = []
         self.m3u_epg = ""
         self.epg_url_final = ""
-        if not ("#EXTM3U" in m3u_str and "#EXTINF" in m3u_str):
-            raise Exception("Malformed M3U")
-        channels = []
+        is_extm3u_found = False
+        is_extinf_found = False
+        channels_count = 0
         buffer = []
-        for line in m3u_str.split("\n"):
+        for line in iter_m3u_lines(m3u):
+            if not is_extm3u_found and "#EXTM3U" in line:
+                is_extm3u_found = True
+            if not is_extinf_found and "#EXTINF" in line:
+                is_extinf_found = True
             line = line.rstrip("\n").rstrip().strip()
             if line.startswith("#EXTM3U"):
                 epg_m3u_url = ""
@@ -238,12 +358,17 @@ class M3UParser:
                             if parsed_chan["tvg-url"]:
                                 if parsed_chan["tvg-url"] not in self.epg_urls:
                                     self.epg_urls.append(parsed_chan["tvg-url"])
-                            channels.append(parsed_chan)
+                            if not is_extm3u_found:
+                                # Fail before any channel is used by caller
+                                raise Exception("Malformed M3U")
+                            channels_count += 1
+                            yield parsed_chan
                         buffer.clear()
         buffer.clear()
         self.epg_url_final = self.m3u_epg
         if self.epg_urls and not self.m3u_epg:
             self.epg_url_final = "^^::MULTIPLE::^^" + ":::^^^:::".join(self.epg_urls)
-        if not channels:
+        if not (is_extm3u_found and is_extinf_found):
+            raise Exception("Malformed M3U")
+        if not channels_count:
             raise Exception("No channels found")
-        return [channels, self.epg_url_final]
@@ -24,7 +24,7 @@
 import os
 import gettext
 from pathlib import Path
-from unidecode import unidecode
+from yuki_iptv.search import SearchIndexCache
 from yuki_iptv.m3u import M3UParser
 from yuki_iptv.xspf import parse_xspf
 from yuki_iptv.qt6compat import qaction
@@ -210,13 +210,18 @@ class M3UEditor(QtWidgets.QMainWindow):
                     self.table_changed = True
 
     def filter_table(self):
+        column1 = self.data["filter_selector"].currentIndex()
+        texts1 = []
         for row1 in range(self.table.rowCount()):
-            item1 = self.table.item(row1, self.data["filter_selector"].currentIndex())
+            item1 = self.table.item(row1, column1)
+            texts1.append(item1.text() if item1 else "")
+        found1 = set(
+            self.search_index.get(texts1).find(self.data["groupfilter_edit"].text())
+        )
+        for row1 in range(self.table.rowCount()):
+            item1 = self.table.item(row1, column1)
             if item1:
-                if (
-                    unidecode(self.data["groupfilter_edit"].text()).lower().strip()
-                    in unidecode(item1.text()).lower().strip()
-                ):
+                if row1 in found1:
                     self.table.showRow(row1)
                 else:
                     self.table.hideRow(row1)
@@ -359,6 +364,7 @@ class M3UEditor(QtWidgets.QMainWindow):
         self.data = {"settings": settings, "icons_folder": icons_folder}
         self.file_opened = False
         self.table_changed = False
+        self.search_index = SearchIndexCache()
 
         self.labels = [
             "title",
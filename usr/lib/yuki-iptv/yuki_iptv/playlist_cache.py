@@ -0,0 +1,121 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import os
+import marshal
+import struct
+from yuki_iptv.channel import Channel, CHANNEL_SLOTS, MISSING, restore_channel
+
+PLAYLIST_CACHE_MAGIC = b"YUKIPLS\x00"
+PLAYLIST_CACHE_VERSION = 1
+PLAYLIST_CACHE_HEADER = struct.Struct("<8sI")  # magic, version
+
+
+def pack_channels(channels):
+    """Channels as marshal-friendly tuples
+
+    Each channel is (name, values, missing, extra), missing is
+    bitmask of unset slots, so values need fixing only for them.
+    """
+    packed_channels = []
+    for name, channel in channels.items():
+        if not isinstance(channel, Channel):
+            packed_channels.append((name, None, 0, dict(channel)))
+            continue
+        values = []
+        missing = 0
+        for i, slot in enumerate(CHANNEL_SLOTS):
+            value = getattr(channel, slot)
+            if value is MISSING:
+                missing |= 1 << i
+                value = None
+            values.append(value)
+        packed_channels.append((name, tuple(values), missing, channel.extra))
+    return packed_channels
+
+
+def unpack_channels(packed_channels):
+    channels = {}
+    for name, values, missing, extra in packed_channels:
+        if values is None:
+            channels[name] = Channel(extra)
+            continue
+        if missing:
+            values = tuple(
+                MISSING if missing & (1 << i) else value
+                for i, value in enumerate(values)
+            )
+        channels[name] = restore_channel(values, extra)
+    return channels
+
+
+def get_playlist_validators(headers):
+    """Validators of downloaded playlist from HTTP response headers"""
+    return {
+        "etag": headers.get("ETag", ""),
+        "last-modified": headers.get("Last-Modified", ""),
+        "size": headers.get("Content-Length", ""),
+    }
+
+
+def get_revalidation_headers(validators):
+    """Headers for conditional request, empty if server gave no validators"""
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last-modified"):
+        headers["If-Modified-Since"] = validators["last-modified"]
+    return headers
+
+
+def save_playlist_cache(cache_file, url, validators, array, groups, movies, epg_url):
+    """Write parsed playlist, raw playlist text is not stored"""
+    data = marshal.dumps(
+        {
+            "url": url,
+            "validators": validators,
+            "array": pack_channels(array),
+            "groups": groups,
+            "movies": pack_channels(movies),
+            "epgurl": epg_url,
+        }
+    )
+    cache_file_tmp = cache_file + ".tmp"
+    with open(cache_file_tmp, "wb") as cache_fd:
+        cache_fd.write(
+            PLAYLIST_CACHE_HEADER.pack(PLAYLIST_CACHE_MAGIC, PLAYLIST_CACHE_VERSION)
+        )
+        cache_fd.write(data)
+    os.replace(cache_file_tmp, cache_file)
+
+
+def load_playlist_cache(cache_file):
+    """Read parsed playlist, raises exception if cache is broken or outdated"""
+    with open(cache_file, "rb") as cache_fd:
+        data = cache_fd.read()
+    magic, version = PLAYLIST_CACHE_HEADER.unpack_from(data)
+    if magic != PLAYLIST_CACHE_MAGIC or version != PLAYLIST_CACHE_VERSION:
+        raise Exception("Playlist cache version changed")
+    playlist_cache = marshal.loads(memoryview(data)[PLAYLIST_CACHE_HEADER.size :])
+    playlist_cache["array"] = unpack_channels(playlist_cache["array"])
+    playlist_cache["movies"] = unpack_channels(playlist_cache["movies"])
+    return playlist_cache
@@ -21,159 +21,65 @@
 # https://fontawesome.com/
 # https://creativecommons.org/licenses/by/4.0/
 #
+import os
+import time
 import logging
 import gettext
+from functools import partial
 from yuki_iptv.qt import get_qt_library
+from yuki_iptv.record_progress import (
+    RECORD_RETRIES,
+    RecordingProgress,
+    get_retry_delay,
+    get_part_file,
+)
+from yuki_iptv.record_segments import SegmentIndex, get_segment_args
 
 qt_library, QtWidgets, QtCore, QtGui, QShortcut = get_qt_library()
 
 logger = logging.getLogger(__name__)
 _ = gettext.gettext
 
+RECORD_STATE_RECORDING = "recording"
+RECORD_STATE_RETRYING = "retrying"
+RECORD_STATE_FINISHED = "finished"
+RECORD_STATE_FAILED = "failed"
+# Failures after this many seconds of recording start retries from scratch
+RECORD_RETRY_RESET = 60
+
 
 class YukiData:
-    ffmpeg_proc = None
-    ffmpeg_processes = None
+    recordings = {}
+    next_record_id = 1
+    manual_record_id = None
     show_record_exception = None
+    # Recordings not needed by their owner, removed once finished
+    released_records = set()
 
 
-def is_ffmpeg_recording():
-    ret = -2
-    if YukiData.ffmpeg_proc:
-        if YukiData.ffmpeg_proc.processId() == 0:
-            YukiData.ffmpeg_proc = None
-            ret = True
-        else:
-            ret = False
-    return ret
-
-
-def exit_handler(exit_code, exit_status):
-    if exit_status != QtCore.QProcess.ExitStatus.NormalExit:
-        logger.warning("ffmpeg process crashed")
-        ffmpeg_process_found = False
-        if YukiData.show_record_exception:
-            try:
-                if (
-                    YukiData.ffmpeg_proc
-                    and YukiData.ffmpeg_proc.processId() == 0
-                    and YukiData.ffmpeg_proc.exitCode() == exit_code
-                    and YukiData.ffmpeg_proc.exitStatus() == exit_status
-                ):
-                    standard_output = YukiData.ffmpeg_proc.readAllStandardOutput()
-                    try:
-                        standard_output = bytes(standard_output).decode("utf-8")
-                        standard_output = "\n".join(standard_output.split("\n")[-15:])
-                    except Exception:
-                        pass
-                    standard_error = YukiData.ffmpeg_proc.readAllStandardError()
-                    try:
-                        standard_error = bytes(standard_error).decode("utf-8")
-                        standard_error = "\n".join(standard_error.split("\n")[-15:])
-                    except Exception:
-                        pass
-                    ffmpeg_process_found = True
-                    YukiData.show_record_exception(
-                        _("ffmpeg crashed!") + "\n"
-                        "" + _("exit code:") + " " + str(exit_code) + ""
-                        "\nstdout:\n" + str(standard_output) + ""
-                        "\nstderr:\n" + str(standard_error)
-                    )
-                else:
-                    if YukiData.ffmpeg_processes:
-                        for ffmpeg_process in YukiData.ffmpeg_processes:
-                            if (
-                                ffmpeg_process
-                                and ffmpeg_process.processId() == 0
-                                and ffmpeg_process[0].exitCode() == exit_code
-                                and ffmpeg_process[0].exitStatus() == exit_status
-                            ):
-                                standard_output = ffmpeg_process[
-                                    0
-                                ].readAllStandardOutput()
-                                try:
-                                    standard_output = bytes(standard_output).decode(
-                                        "utf-8"
-                                    )
-                                    standard_output = "\n".join(
-                                        standard_output.split("\n")[-15:]
-                                    )
-                                except Exception:
-                                    pass
-                                standard_error = ffmpeg_process[
-                                    0
-                                ].readAllStandardError()
-                                try:
-                                    standard_error = bytes(standard_error).decode(
-                                        "utf-8"
-                                    )
-                                    standard_error = "\n".join(
-                                        standard_error.split("\n")[-15:]
-                                    )
-                                except Exception:
-                                    pass
-                                ffmpeg_process_found = True
-                                YukiData.show_record_exception(
-                                    _("ffmpeg crashed!") + "\n"
-                                    "" + _("exit code:") + " " + str(exit_code) + ""
-                                    "\nstdout:\n" + str(standard_output) + ""
-                                    "\nstderr:\n" + str(standard_error)
-                                )
-            except Exception:
-                pass
-            if not ffmpeg_process_found:
-                YukiData.show_record_exception(_("ffmpeg crashed!"))
-
-
-def record(
-    input_url,
-    out_file,
-    channel_name,
-    http_referer,
-    get_ua_ref_for_channel,
-    is_return=False,
-):
-    if http_referer == "Referer: ":
-        http_referer = ""
-    useragent_ref, referer_ref = get_ua_ref_for_channel(channel_name)
-    user_agent = useragent_ref
-    if referer_ref:
-        http_referer = f"Referer: {referer_ref}"
-    logger.info(f"Using user agent '{user_agent}' for record channel '{channel_name}'")
-    logger.info(f"HTTP headers: '{http_referer}'")
+def get_ffmpeg_args(input_url, output_args, user_agent, http_referer):
     if input_url.startswith("http://") or input_url.startswith("https://"):
-        arr = [
-            "-nostats",
-            "-hide_banner",
-            "-loglevel",
-            "warning",
+        input_args = [
             "-user_agent",
             user_agent,
             "-headers",
             http_referer,
             "-i",
             input_url,
-            "-map",
-            "-0:s?",
-            "-sn",
-            "-map",
-            "-0:d?",
-            "-codec",
-            "copy",
-            "-acodec",
-            "aac",
-            "-max_muxing_queue_size",
-            "4096",
-            out_file,
         ]
     else:
-        arr = [
+        input_args = ["-i", input_url]
+    return (
+        [
             "-nostats",
             "-hide_banner",
             "-loglevel",
             "warning",
-            "-i",
-            input_url,
+            "-progress",
+            "pipe:1",
+        ]
+        + input_args
+        + [
             "-map",
             "-0:s?",
             "-sn",
@@ -185,32 +91,326 @@ def record(
             "aac",
             "-max_muxing_queue_size",
             "4096",
-            out_file,
         ]
+        + output_args
+    )
+
+
+class RecordingJob:
+    """One recording with its own ffmpeg process
+
+    If network stream fails, ffmpeg is started again after a delay
+    which grows with every attempt, to next part file.
+    With segment_options ({"time", "max_size", "max_age", "max_count"})
+    out_file is a folder of segments with index.m3u8.
+    Without report_errors failures are only logged, not shown to user.
+    finished_func(record_id) is called after recording finished or failed.
+    """
+
+    def __init__(
+        self,
+        record_id,
+        input_url,
+        out_file,
+        channel_name,
+        ffmpeg_args_func,
+        segment_options=None,
+        report_errors=True,
+        finished_func=None,
+    ):
+        self.record_id = record_id
+        self.input_url = input_url
+        self.out_file = out_file
+        self.channel_name = channel_name
+        self.ffmpeg_args_func = ffmpeg_args_func
+        self.report_errors = report_errors
+        self.finished_func = finished_func
+        self.is_network = input_url.startswith("http://") or input_url.startswith(
+            "https://"
+        )
+        self.progress = RecordingProgress()
+        self.state = RECORD_STATE_RECORDING
+        self.stopped = False
+        self.part = 0
+        self.attempt = 0
+        self.start_time = time.time()
+        self.process = None
+        self.process_start_time = 0
+        self.retry_timer = QtCore.QTimer()
+        self.retry_timer.setSingleShot(True)
+        self.retry_timer.timeout.connect(self.retry)
+        self.segment_time = 0
+        self.segment_index = None
+        self.segment_index_time = 0
+        if segment_options:
+            self.segment_time = segment_options["time"]
+            self.segment_index = SegmentIndex(
+                out_file,
+                segment_options["max_size"],
+                segment_options["max_age"],
+                segment_options.get("max_count", 0),
+            )
+
+    def get_output_args(self):
+        if self.segment_index:
+            return get_segment_args(
+                self.out_file, self.segment_time, self.segment_index.next_number
+            )
+        return [get_part_file(self.out_file, self.part)]
+
+    def start_process(self):
+        self.process = QtCore.QProcess()
+        self.process.readyReadStandardOutput.connect(self.read_output)
+        self.process.readyReadStandardError.connect(self.read_errors)
+        self.process.finished.connect(self.process_finished)
+        self.process.errorOccurred.connect(self.process_error)
+        self.process_start_time = time.time()
+        self.state = RECORD_STATE_RECORDING
+        self.process.start("ffmpeg", self.ffmpeg_args_func(self.get_output_args()))
+
+    def read_output(self):
+        self.progress.feed_output(bytes(self.process.readAllStandardOutput()))
+        # Segments are checked on ffmpeg progress, at most once a second
+        if self.segment_index and time.time() - self.segment_index_time >= 1:
+            self.segment_index_time = time.time()
+            self.segment_index.update()
+
+    def read_errors(self):
+        self.progress.feed_errors(bytes(self.process.readAllStandardError()))
+
+    def process_finished(self, exit_code, exit_status):
+        self.read_output()
+        self.read_errors()
+        if self.stopped or (
+            exit_code == 0 and exit_status == QtCore.QProcess.ExitStatus.NormalExit
+        ):
+            self.state = RECORD_STATE_FINISHED
+            if self.segment_index:
+                self.segment_index.finish()
+            self.job_finished()
+            return
+        logger.warning(
+            f"ffmpeg failed for record {self.record_id} "
+            f"(channel '{self.channel_name}', exit code {exit_code})"
+        )
+        if time.time() - self.process_start_time >= RECORD_RETRY_RESET:
+            self.attempt = 0
+        if self.is_network and self.attempt < RECORD_RETRIES:
+            retry_delay = get_retry_delay(self.attempt)
+            self.attempt += 1
+            logger.info(
+                f"Restarting record {self.record_id} in {retry_delay} s "
+                f"(attempt {self.attempt}/{RECORD_RETRIES})"
+            )
+            self.state = RECORD_STATE_RETRYING
+            self.retry_timer.start(retry_delay * 1000)
+            return
+        self.state = RECORD_STATE_FAILED
+        if self.segment_index:
+            self.segment_index.finish()
+        self.job_finished()
+        if self.report_errors and YukiData.show_record_exception:
+            YukiData.show_record_exception(
+                _("ffmpeg crashed!") + "\n"
+                "" + _("exit code:") + " " + str(exit_code) + ""
+                "\nstderr:\n" + "\n".join(self.progress.get_errors())
+            )
+
+    def process_error(self, error):
+        # finished is not emitted if ffmpeg could not be started
+        if error == QtCore.QProcess.ProcessError.FailedToStart:
+            logger.warning(f"Failed to start ffmpeg: {self.process.errorString()}")
+            self.state = RECORD_STATE_FAILED
+            self.job_finished()
+            if (
+                self.report_errors
+                and YukiData.show_record_exception
+                and not self.stopped
+            ):
+                YukiData.show_record_exception(
+                    _("ffmpeg crashed!") + "\n" + self.process.errorString()
+                )
+
+    def retry(self):
+        if self.stopped:
+            return
+        self.part += 1
+        self.progress.restart()
+        if self.segment_index:
+            self.segment_index.restart()
+        self.start_process()
+
+    def stop(self):
+        self.stopped = True
+        self.retry_timer.stop()
+        if (
+            self.process
+            and self.process.state() != QtCore.QProcess.ProcessState.NotRunning
+        ):
+            self.process.terminate()
+        elif self.is_running():
+            self.state = RECORD_STATE_FINISHED
+            self.job_finished()
+
+    def job_finished(self):
+        if self.finished_func:
+            # Not from signal handler of process, job can be deleted there
+            QtCore.QTimer.singleShot(0, partial(self.finished_func, self.record_id))
+
+    def is_running(self):
+        return self.state in (RECORD_STATE_RECORDING, RECORD_STATE_RETRYING)
+
+    def get_status(self):
+        return {
+            "id": self.record_id,
+            "channel": self.channel_name,
+            "file": self.out_file,
+            "state": self.state,
+            "time": time.time() - self.start_time,
+            # Segment muxer does not report size of its output
+            "size": (
+                self.segment_index.get_recorded_size()
+                if self.segment_index
+                else self.progress.size
+            ),
+            "bitrate": self.progress.bitrate,
+            "dropped_frames": self.progress.total_dropped_frames,
+            "retries": self.part,
+            "errors": self.progress.get_errors(),
+            "segments": len(self.segment_index.segments) if self.segment_index else 0,
+        }
+
+
+def record(
+    input_url,
+    out_file,
+    channel_name,
+    http_referer,
+    get_ua_ref_for_channel,
+    is_return=False,
+    segment_options=None,
+    report_errors=True,
+):
+    """Start recording, returns its id
+
+    segment_options - see RecordingJob, None records to one file.
+    """
+    if http_referer == "Referer: ":
+        http_referer = ""
+    useragent_ref, referer_ref = get_ua_ref_for_channel(channel_name)
+    user_agent = useragent_ref
+    if referer_ref:
+        http_referer = f"Referer: {referer_ref}"
+    logger.info(f"Using user agent '{user_agent}' for record channel '{channel_name}'")
+    logger.info(f"HTTP headers: '{http_referer}'")
+    if segment_options:
+        os.makedirs(out_file, exist_ok=True)
+    record_id = YukiData.next_record_id
+    YukiData.next_record_id += 1
+    recording_job = RecordingJob(
+        record_id,
+        input_url,
+        out_file,
+        channel_name,
+        lambda output_args: get_ffmpeg_args(
+            input_url, output_args, user_agent, http_referer
+        ),
+        segment_options,
+        report_errors,
+        forget_record,
+    )
+    YukiData.recordings[record_id] = recording_job
+    recording_job.start_process()
     if not is_return:
-        YukiData.ffmpeg_proc = QtCore.QProcess()
-        YukiData.ffmpeg_proc.start("ffmpeg", arr)
-        YukiData.ffmpeg_proc.finished.connect(exit_handler)
-    else:
-        ffmpeg_ret_proc = QtCore.QProcess()
-        ffmpeg_ret_proc.start("ffmpeg", arr)
-        ffmpeg_ret_proc.finished.connect(exit_handler)
-        return ffmpeg_ret_proc
+        if YukiData.manual_record_id is not None:
+            release_record(YukiData.manual_record_id)
+        YukiData.manual_record_id = record_id
+    return record_id
 
 
 def record_return(
-    input_url, out_file, channel_name, http_referer, get_ua_ref_for_channel
+    input_url,
+    out_file,
+    channel_name,
+    http_referer,
+    get_ua_ref_for_channel,
+    segment_options=None,
+    report_errors=True,
 ):
     return record(
-        input_url, out_file, channel_name, http_referer, get_ua_ref_for_channel, True
+        input_url,
+        out_file,
+        channel_name,
+        http_referer,
+        get_ua_ref_for_channel,
+        True,
+        segment_options,
+        report_errors,
+    )
+
+
+def forget_record(record_id):
+    """Remove recording if it is finished and released"""
+    if (
+        record_id in YukiData.released_records
+        and record_id in YukiData.recordings
+        and not YukiData.recordings[record_id].is_running()
+    ):
+        del YukiData.recordings[record_id]
+        YukiData.released_records.discard(record_id)
+
+
+def release_record(record_id):
+    """Recording is not needed by its owner anymore
+
+    It is removed once finished, its status is not available then.
+    """
+    YukiData.released_records.add(record_id)
+    forget_record(record_id)
+
+
+def stop_record(record_id=None):
+    """Stop recording, manual one if no id given"""
+    if record_id is None:
+        record_id = YukiData.manual_record_id
+    if record_id in YukiData.recordings:
+        YukiData.recordings[record_id].stop()
+
+
+def is_record_running(record_id):
+    return (
+        record_id in YukiData.recordings and YukiData.recordings[record_id].is_running()
     )
 
 
-def stop_record():
-    if YukiData.ffmpeg_proc:
-        YukiData.ffmpeg_proc.terminate()
+def get_record_status(record_id=None):
+    """Status of recording (manual one if no id given) or None"""
+    if record_id is None:
+        record_id = YukiData.manual_record_id
+    if record_id not in YukiData.recordings:
+        return None
+    return YukiData.recordings[record_id].get_status()
+
+
+def get_record_statuses():
+    return [
+        recording_job.get_status() for recording_job in YukiData.recordings.values()
+    ]
+
+
+def is_ffmpeg_recording():
+    """-2 if manual recording was not started, False while it is running,
+    True once when it finished"""
+    ret = -2
+    if YukiData.manual_record_id is not None:
+        if not is_record_running(YukiData.manual_record_id):
+            release_record(YukiData.manual_record_id)
+            YukiData.manual_record_id = None
+            ret = True
+        else:
+            ret = False
+    return ret
 
 
-def init_record(show_exception, ffmpeg_processes):
+def init_record(show_exception):
     YukiData.show_record_exception = show_exception
-    YukiData.ffmpeg_processes = ffmpeg_processes
@@ -0,0 +1,116 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import os
+from collections import deque
+
+RECORD_ERROR_LINES = 50
+RECORD_RETRIES = 5
+RECORD_RETRY_DELAY = 2
+RECORD_RETRY_MAX_DELAY = 60
+
+
+def get_retry_delay(attempt):
+    """Seconds before retry, doubled on every attempt"""
+    return min(RECORD_RETRY_DELAY * 2**attempt, RECORD_RETRY_MAX_DELAY)
+
+
+def get_part_file(out_file, part):
+    """Output file for recording restarted after failure"""
+    if part == 0:
+        return out_file
+    file_name, file_ext = os.path.splitext(out_file)
+    return f"{file_name}_part{part + 1}{file_ext}"
+
+
+class RecordingProgress:
+    """ffmpeg -progress output and last stderr lines of one recording
+
+    Sizes of previous ffmpeg runs (restarts after failure)
+    are added to size of current one.
+    """
+
+    def __init__(self):
+        self.previous_size = 0
+        self.total_size = 0
+        self.bitrate = ""
+        self.dropped_frames = 0
+        self.previous_dropped_frames = 0
+        self.out_time = 0
+        self.speed = ""
+        self.output_buffer = b""
+        self.errors_buffer = b""
+        self.errors = deque(maxlen=RECORD_ERROR_LINES)
+
+    @property
+    def size(self):
+        return self.previous_size + self.total_size
+
+    @property
+    def total_dropped_frames(self):
+        return self.previous_dropped_frames + self.dropped_frames
+
+    def restart(self):
+        """New ffmpeg run of same recording"""
+        self.previous_size += self.total_size
+        self.previous_dropped_frames += self.dropped_frames
+        self.total_size = 0
+        self.dropped_frames = 0
+        self.output_buffer = b""
+        self.errors_buffer = b""
+
+    def set_value(self, key, value):
+        try:
+            if key == "total_size":
+                self.total_size = int(value)
+            elif key == "drop_frames":
+                self.dropped_frames = int(value)
+            elif key == "out_time_us":
+                self.out_time = int(value) / 1000000
+            elif key == "bitrate":
+                self.bitrate = value
+            elif key == "speed":
+                self.speed = value
+        except ValueError:
+            # N/A before first packet
+            pass
+
+    def feed_output(self, data):
+        """Parse key=value lines written by ffmpeg -progress"""
+        lines = (self.output_buffer + data).split(b"\n")
+        self.output_buffer = lines.pop()
+        for line in lines:
+            key, _, value = line.decode("utf-8", "replace").strip().partition("=")
+            if key:
+                self.set_value(key, value.strip())
+
+    def feed_errors(self, data):
+        lines = (self.errors_buffer + data).split(b"\n")
+        self.errors_buffer = lines.pop()
+        for line in lines:
+            line = line.decode("utf-8", "replace").rstrip()
+            if line:
+                self.errors.append(line)
+
+    def get_errors(self, count=15):
+        """Last stderr lines"""
+        return list(self.errors)[-count:]
@@ -0,0 +1,192 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import os
+import math
+import time
+import logging
+import traceback
+from collections import deque, namedtuple
+
+logger = logging.getLogger(__name__)
+
+# Written by ffmpeg segment muxer, one "file,start,end" line per segment
+SEGMENT_LIST_FILE = "segments.csv"
+SEGMENT_INDEX_FILE = "index.m3u8"
+SEGMENT_FILE_FORMAT = "segment_%06d.ts"
+
+Segment = namedtuple("Segment", ("name", "duration", "size", "mtime"))
+
+
+def get_segment_args(segment_dir, segment_time, start_number):
+    """ffmpeg output options for segmented recording"""
+    return [
+        "-f",
+        "segment",
+        "-segment_time",
+        str(segment_time),
+        "-segment_format",
+        "mpegts",
+        "-segment_start_number",
+        str(start_number),
+        "-segment_list",
+        os.path.join(segment_dir, SEGMENT_LIST_FILE),
+        "-segment_list_type",
+        "csv",
+        os.path.join(segment_dir, SEGMENT_FILE_FORMAT),
+    ]
+
+
+class SegmentIndex:
+    """Finished segments of recording, oldest first
+
+    Keeps index.m3u8 next to segments, so recording can be played
+    or joined without remuxing. Oldest segments are deleted when
+    total size is over max_size bytes, they are older than
+    max_age seconds or there are more than max_count of them
+    (0 - no limit).
+    """
+
+    def __init__(self, segment_dir, max_size=0, max_age=0, max_count=0):
+        self.segment_dir = segment_dir
+        self.max_size = max_size
+        self.max_age = max_age
+        self.max_count = max_count
+        self.segments = deque()
+        self.total_size = 0
+        self.removed_count = 0
+        self.removed_size = 0
+        self.next_number = 0
+        self.list_offset = 0
+        self.ended = False
+
+    def read_segment_list(self):
+        """Add segments finished since last call"""
+        try:
+            with open(
+                os.path.join(self.segment_dir, SEGMENT_LIST_FILE), "rb"
+            ) as list_fd:
+                list_fd.seek(self.list_offset)
+                data = list_fd.read()
+        except FileNotFoundError:
+            return False
+        # Last line may be not written completely yet
+        data = data[: data.rfind(b"\n") + 1]
+        self.list_offset += len(data)
+        changed = False
+        for line in data.decode("utf-8", "replace").splitlines():
+            try:
+                name, start, end = line.rsplit(",", 2)
+                segment_stat = os.stat(os.path.join(self.segment_dir, name))
+            except Exception:
+                logger.warning(f"Bad segment list line: '{line}'")
+                logger.warning(traceback.format_exc())
+                continue
+            self.segments.append(
+                Segment(
+                    name,
+                    max(float(end) - float(start), 0),
+                    segment_stat.st_size,
+                    segment_stat.st_mtime,
+                )
+            )
+            self.total_size += segment_stat.st_size
+            self.next_number += 1
+            changed = True
+        return changed
+
+    def prune(self, current_time=None):
+        """Delete oldest segments over size and age limits"""
+        if current_time is None:
+            current_time = time.time()
+        changed = False
+        while len(self.segments) > 1 and (
+            (self.max_size and self.total_size > self.max_size)
+            or (self.max_count and len(self.segments) > self.max_count)
+            or (self.max_age and current_time - self.segments[0].mtime > self.max_age)
+        ):
+            segment = self.segments.popleft()
+            self.total_size -= segment.size
+            self.removed_count += 1
+            self.removed_size += segment.size
+            changed = True
+            try:
+                os.remove(os.path.join(self.segment_dir, segment.name))
+            except FileNotFoundError:
+                pass
+        return changed
+
+    def get_recorded_size(self):
+        """Bytes written by ffmpeg, including removed and unfinished segments"""
+        try:
+            current_size = os.path.getsize(
+                os.path.join(self.segment_dir, SEGMENT_FILE_FORMAT % self.next_number)
+            )
+        except OSError:
+            current_size = 0
+        return self.removed_size + self.total_size + current_size
+
+    def update(self, current_time=None):
+        """Read new segments, apply limits and write index if changed"""
+        changed = self.read_segment_list()
+        changed = self.prune(current_time) or changed
+        if changed:
+            self.write_index()
+        return changed
+
+    def restart(self):
+        """ffmpeg is started again, it writes segment list from beginning"""
+        self.update()
+        self.list_offset = 0
+
+    def finish(self):
+        self.update()
+        self.ended = True
+        self.write_index()
+
+    def get_index(self):
+        """HLS playlist of segments"""
+        target_duration = max(
+            (math.ceil(segment.duration) for segment in self.segments), default=1
+        )
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:3",
+            f"#EXT-X-TARGETDURATION:{target_duration}",
+            f"#EXT-X-MEDIA-SEQUENCE:{self.removed_count}",
+        ]
+        for segment in self.segments:
+            lines.append(f"#EXTINF:{segment.duration:.3f},")
+            lines.append(segment.name)
+        if self.ended:
+            lines.append("#EXT-X-ENDLIST")
+        return "\n".join(lines) + "\n"
+
+    def write_index(self):
+        index_file = os.path.join(self.segment_dir, SEGMENT_INDEX_FILE)
+        try:
+            with open(index_file + ".tmp", "w", encoding="utf8") as index_fd:
+                index_fd.write(self.get_index())
+            os.replace(index_file + ".tmp", index_file)
+        except Exception:
+            logger.warning("Failed to write segment index")
+            logger.warning(traceback.format_exc())
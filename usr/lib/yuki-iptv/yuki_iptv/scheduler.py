@@ -0,0 +1,194 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import os
+import json
+import time
+import heapq
+import logging
+import traceback
+
+logger = logging.getLogger(__name__)
+
+# Longest time between checks, so clock changes and suspend
+# are noticed even if timer was armed for hours
+SCHEDULER_MAX_WAIT = 60
+# Stop goes before start at same time, one recording at a time
+SCHEDULER_EVENT_STOP = 0
+SCHEDULER_EVENT_START = 1
+
+
+class RecordingScheduler:
+    """Planned recordings, ordered by time and saved to JSON file
+
+    Jobs are dicts with id, channel, start and stop (epoch seconds).
+    Start and stop events are kept in heap, events of removed jobs
+    are skipped when they come out of it.
+    start_func(channel) returns recording, stop_func(recording) stops it.
+    """
+
+    def __init__(self, scheduler_file, start_func, stop_func):
+        self.scheduler_file = scheduler_file
+        self.start_func = start_func
+        self.stop_func = stop_func
+        self.jobs = {}
+        self.events = []
+        self.active = {}
+        self.next_id = 1
+        self.load()
+
+    def load(self):
+        if not os.path.isfile(self.scheduler_file):
+            return
+        try:
+            with open(self.scheduler_file, "r", encoding="utf8") as scheduler_fd:
+                jobs = json.loads(scheduler_fd.read())["jobs"]
+        except Exception:
+            logger.warning("Failed to load planned recordings")
+            logger.warning(traceback.format_exc())
+            return
+        for job in jobs:
+            self.add_job(job)
+        if self.jobs:
+            self.next_id = max(self.jobs) + 1
+        logger.info(f"Planned recordings loaded: {len(self.jobs)}")
+
+    def save(self):
+        try:
+            scheduler_file_tmp = self.scheduler_file + ".tmp"
+            with open(scheduler_file_tmp, "w", encoding="utf8") as scheduler_fd:
+                scheduler_fd.write(json.dumps({"jobs": self.get_jobs()}))
+            os.replace(scheduler_file_tmp, self.scheduler_file)
+        except Exception:
+            logger.warning("Failed to save planned recordings")
+            logger.warning(traceback.format_exc())
+
+    def add_job(self, job):
+        self.jobs[job["id"]] = job
+        heapq.heappush(self.events, (job["start"], SCHEDULER_EVENT_START, job["id"]))
+        heapq.heappush(self.events, (job["stop"], SCHEDULER_EVENT_STOP, job["id"]))
+
+    def add(self, channel, start, stop):
+        """Plan recording, returns job id"""
+        if stop <= start:
+            raise Exception("Recording must stop after it starts")
+        job = {"id": self.next_id, "channel": channel, "start": start, "stop": stop}
+        self.next_id += 1
+        self.add_job(job)
+        self.save()
+        logger.info(
+            f"Planned record (start_time='{time.ctime(start)}' "
+            f"end_time='{time.ctime(stop)}' channel='{channel}')"
+        )
+        return job["id"]
+
+    def remove(self, job_id):
+        """Remove planned recording, stops it if running"""
+        if job_id not in self.jobs:
+            return
+        self.stop_job(job_id)
+        del self.jobs[job_id]
+        self.save()
+
+    def stop_job(self, job_id):
+        if job_id in self.active:
+            job = self.jobs[job_id]
+            logger.info(
+                f"Stopping planned record (start_time='{time.ctime(job['start'])}' "
+                f"end_time='{time.ctime(job['stop'])}' channel='{job['channel']}')"
+            )
+            try:
+                self.stop_func(self.active.pop(job_id))
+            except Exception:
+                logger.warning("Failed to stop planned record")
+                logger.warning(traceback.format_exc())
+
+    def stop_all(self):
+        """Stop running recordings, they are still planned"""
+        for job_id in list(self.active):
+            self.stop_job(job_id)
+
+    def get_jobs(self):
+        """Planned recordings sorted by start"""
+        return sorted(self.jobs.values(), key=lambda job: (job["start"], job["id"]))
+
+    def get_next_time(self):
+        """Time of next event or None"""
+        while self.events:
+            event_time, event, job_id = self.events[0]
+            job = self.jobs.get(job_id)
+            if job is not None and event_time == (
+                job["start"] if event == SCHEDULER_EVENT_START else job["stop"]
+            ):
+                return event_time
+            heapq.heappop(self.events)
+        return None
+
+    def get_wait(self, current_time=None):
+        """Seconds until scheduler should run again, None if nothing planned"""
+        if current_time is None:
+            current_time = time.time()
+        next_time = self.get_next_time()
+        if next_time is None:
+            return None
+        return min(max(next_time - current_time, 0), SCHEDULER_MAX_WAIT)
+
+    def run(self, current_time=None):
+        """Start and stop recordings which are due
+
+        Jobs which should have started already (app was not running,
+        computer was suspended) start late, jobs which should have
+        finished already are dropped.
+        """
+        if current_time is None:
+            current_time = time.time()
+        changed = False
+        while True:
+            next_time = self.get_next_time()
+            if next_time is None or next_time > current_time:
+                break
+            event_time, event, job_id = heapq.heappop(self.events)
+            job = self.jobs[job_id]
+            changed = True
+            if event == SCHEDULER_EVENT_STOP:
+                self.stop_job(job_id)
+                del self.jobs[job_id]
+            elif job["stop"] <= current_time:
+                logger.warning(
+                    f"Missed planned record (start_time='{time.ctime(job['start'])}' "
+                    f"end_time='{time.ctime(job['stop'])}' "
+                    f"channel='{job['channel']}')"
+                )
+            elif job_id not in self.active:
+                logger.info(
+                    f"Starting planned record (start_time='{time.ctime(job['start'])}' "
+                    f"end_time='{time.ctime(job['stop'])}' "
+                    f"channel='{job['channel']}')"
+                )
+                try:
+                    self.active[job_id] = self.start_func(job["channel"])
+                except Exception:
+                    logger.warning("Failed to start planned record")
+                    logger.warning(traceback.format_exc())
+        if changed:
+            self.save()
+        return changed
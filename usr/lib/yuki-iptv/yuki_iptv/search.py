@@ -0,0 +1,163 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+from functools import lru_cache
+from unidecode import unidecode
+
+NGRAM_SIZE = 3
+
+
+@lru_cache(maxsize=262144)
+def normalize_search_text(text):
+    """Transliterated lowercase text, same one is done once"""
+    return unidecode(text).lower().strip()
+
+
+def get_ngrams(text):
+    return {text[i : i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+class SearchIndex:
+    """Search index over list of titles
+
+    Titles are transliterated and lowercased once and split into
+    words. Each word points to titles having it, and a trigram index
+    over words finds words containing the query. find() returns
+    titles which contain the query (as before), or, for several
+    words, titles where each query word starts one of title words.
+    """
+
+    def __init__(self, texts):
+        self.texts = list(texts)
+        self.normalized = [normalize_search_text(text) for text in self.texts]
+        # Title word -> positions of titles with it
+        self.words = {}
+        for position, text in enumerate(self.normalized):
+            for word in set(text.split()):
+                if word in self.words:
+                    self.words[word].append(position)
+                else:
+                    self.words[word] = [position]
+        # Trigram -> title words with it
+        self.ngrams = {}
+        join = "".join
+        for word in self.words:
+            for ngram in set(map(join, zip(word, word[1:], word[2:]))):
+                if ngram in self.ngrams:
+                    self.ngrams[ngram].append(word)
+                else:
+                    self.ngrams[ngram] = [word]
+
+    def __len__(self):
+        return len(self.texts)
+
+    def find_words(self, query_word):
+        """Title words containing query word"""
+        if len(query_word) >= NGRAM_SIZE:
+            words = min(
+                (self.ngrams.get(ngram, ()) for ngram in get_ngrams(query_word)),
+                key=len,
+            )
+        else:
+            words = self.words
+        return [word for word in words if query_word in word]
+
+    def get_positions(self, words):
+        positions = set()
+        for word in words:
+            positions.update(self.words[word])
+        return positions
+
+    def find(self, query):
+        """Sorted positions of titles matching query"""
+        query = normalize_search_text(query)
+        if not query:
+            return list(range(len(self.texts)))
+        query_words = query.split()
+        if len(query_words) == 1:
+            # Query without spaces can only be inside one title word
+            return sorted(self.get_positions(self.find_words(query)))
+        # First query word is inside a title word, next ones start
+        # title words. Most selective query word gives candidates,
+        # other words are checked on candidate titles only
+        query_words_found = []
+        for word_number, query_word in enumerate(query_words):
+            words = self.find_words(query_word)
+            if word_number:
+                words = [word for word in words if word.startswith(query_word)]
+            if not words:
+                return []
+            query_words_found.append(
+                (sum(len(self.words[word]) for word in words), word_number, words)
+            )
+        query_words_found.sort()
+        found = self.get_positions(query_words_found[0][2])
+        normalized = self.normalized
+        # Title words are separated by spaces
+        word_starts = [" " + query_word for query_word in query_words]
+        for words_count, word_number, words in query_words_found[1:]:
+            if word_number:
+                word_start = word_starts[word_number]
+                found = {
+                    position
+                    for position in found
+                    if word_start in " " + normalized[position]
+                }
+            else:
+                found = {
+                    position
+                    for position in found
+                    if query_words[0] in normalized[position]
+                }
+            if not found:
+                return []
+        return sorted(
+            position
+            for position in found
+            if query in normalized[position]
+            or word_starts[0] in " " + normalized[position]
+        )
+
+    def find_texts(self, query):
+        """Set of titles matching query"""
+        return {self.texts[position] for position in self.find(query)}
+
+
+class SearchIndexCache:
+    """Keeps index while titles stay the same
+
+    Titles are not compared, index is made again only when
+    version given by caller changes or after clear().
+    """
+
+    def __init__(self):
+        self.index = None
+        self.version = None
+
+    def get(self, texts, version=None):
+        if self.index is None or self.version != version:
+            self.index = SearchIndex(texts)
+            self.version = version
+        return self.index
+
+    def clear(self):
+        self.index = None
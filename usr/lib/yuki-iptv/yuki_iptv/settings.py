@@ -55,10 +55,15 @@ def parse_settings():
         "showplaylistmouse": True,
         "channellogos": 0,
         "nocacheepg": False,
+        "epgmerge": 0,
         "scrrecnosubfolders": False,
+        "recsegment": 0,
+        "recmaxsize": 0,
+        "recmaxage": 0,
         "hidetvprogram": False,
         "showcontrolsmouse": True,
         "catchupenable": False,
+        "timeshift": 0,
         "flpopacity": 0.7,
         "panelposition": 0,
         "videoaspect": 0,
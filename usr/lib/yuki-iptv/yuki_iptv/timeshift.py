@@ -0,0 +1,155 @@
+#
+# Copyright (c) 2023 Ame-chan-angel <amechanangel@proton.me>
+#
+# This file is part of yuki-iptv.
+#
+# yuki-iptv is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# yuki-iptv is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with yuki-iptv. If not, see <https://www.gnu.org/licenses/>.
+#
+# The Font Awesome pictograms are licensed under the CC BY 4.0 License.
+# https://fontawesome.com/
+# https://creativecommons.org/licenses/by/4.0/
+#
+import os
+import math
+import time
+import shutil
+import logging
+from yuki_iptv.record_segments import SEGMENT_INDEX_FILE
+
+logger = logging.getLogger(__name__)
+
+TIMESHIFT_SEGMENT_TIME = 4
+
+
+class Timeshift:
+    """Last minutes of playing live channel, kept on disk
+
+    Stream is recorded to ring of short segments by
+    record_func(url, segment_dir, channel_name, segment_options),
+    which returns recording id. Player goes back by playing
+    index.m3u8 of the ring from some segment before the end.
+    segments_func(recording id) gives count of finished segments,
+    running_func(recording id) - if its ffmpeg is still running.
+
+    Every ring has its own folder, stopped ring is deleted
+    only after its ffmpeg exited and stopped writing to it.
+    """
+
+    def __init__(
+        self,
+        timeshift_dir,
+        window,
+        record_func,
+        stop_func,
+        segments_func,
+        running_func,
+    ):
+        self.timeshift_dir = timeshift_dir
+        self.window = window
+        self.record_func = record_func
+        self.stop_func = stop_func
+        self.segments_func = segments_func
+        self.running_func = running_func
+        self.record_id = None
+        self.ring_dir = ""
+        self.ring_number = 0
+        # (recording id, folder) of stopped rings
+        self.stopped_rings = []
+        self.channel_name = ""
+        self.behind = 0
+        self.paused_since = None
+        # Rings left from previous run
+        shutil.rmtree(self.timeshift_dir, ignore_errors=True)
+
+    @property
+    def index_file(self):
+        return os.path.join(self.ring_dir, SEGMENT_INDEX_FILE)
+
+    def remove_stopped_rings(self):
+        for record_id, ring_dir in self.stopped_rings[:]:
+            if not self.running_func(record_id):
+                shutil.rmtree(ring_dir, ignore_errors=True)
+                self.stopped_rings.remove((record_id, ring_dir))
+
+    def start(self, channel_name, url):
+        self.stop()
+        self.ring_number += 1
+        self.ring_dir = os.path.join(self.timeshift_dir, str(self.ring_number))
+        os.makedirs(self.ring_dir, exist_ok=True)
+        logger.info(f"Starting timeshift for channel '{channel_name}'")
+        self.channel_name = channel_name
+        self.behind = 0
+        self.paused_since = None
+        self.record_id = self.record_func(
+            url,
+            self.ring_dir,
+            channel_name,
+            {
+                "time": TIMESHIFT_SEGMENT_TIME,
+                "max_size": 0,
+                "max_age": 0,
+                "max_count": math.ceil(self.window / TIMESHIFT_SEGMENT_TIME),
+            },
+        )
+
+    def stop(self):
+        if self.record_id is not None:
+            logger.info(f"Stopping timeshift for channel '{self.channel_name}'")
+            self.stop_func(self.record_id)
+            self.stopped_rings.append((self.record_id, self.ring_dir))
+            self.record_id = None
+            self.channel_name = ""
+        self.remove_stopped_rings()
+
+    def is_active(self, channel_name):
+        return self.record_id is not None and self.channel_name == channel_name
+
+    def get_available(self):
+        """Seconds which player can go back"""
+        if self.record_id is None:
+            return 0
+        return self.segments_func(self.record_id) * TIMESHIFT_SEGMENT_TIME
+
+    def get_behind(self, current_time=None):
+        """Seconds behind live"""
+        if current_time is None:
+            current_time = time.time()
+        behind = self.behind
+        if self.paused_since is not None:
+            behind += current_time - self.paused_since
+        return min(behind, self.get_available())
+
+    def get_start_index(self):
+        """live_start_index for player, negative - segments from the end"""
+        return -max(math.ceil(self.behind / TIMESHIFT_SEGMENT_TIME), 1)
+
+    def set_paused(self, paused, current_time=None):
+        if current_time is None:
+            current_time = time.time()
+        if paused and self.paused_since is None:
+            self.paused_since = current_time
+        elif not paused and self.paused_since is not None:
+            self.behind = self.get_behind(current_time)
+            self.paused_since = None
+
+    def seek(self, secs, current_time=None):
+        """Move position by secs, new seconds behind live
+        (0 - play live stream) or None if position is not changed"""
+        old_behind = self.get_behind(current_time)
+        behind = min(max(old_behind - secs, 0), self.get_available())
+        self.paused_since = None
+        self.behind = behind
+        if behind == old_behind and behind == 0:
+            return None
+        return behind
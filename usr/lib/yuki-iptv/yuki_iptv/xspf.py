@@ -24,6 +24,7 @@
 import logging
 import gettext
 import xml.etree.ElementTree as ET
+from yuki_iptv.channel import Channel
 
 logger = logging.getLogger(__name__)
 _ = gettext.gettext
@@ -45,19 +46,21 @@ def parse_xspf(xspf):
             group = all_channels
         location = track.find("{*}location").text.strip()
         array.append(
-            {
-                "title": title,
-                "tvg-name": "",
-                "tvg-ID": "",
-                "tvg-logo": "",
-                "tvg-group": group,
-                "tvg-url": "",
-                "catchup": "default",
-                "catchup-source": "",
-                "catchup-days": "1",
-                "useragent": "",
-                "referer": "",
-                "url": location,
-            }
+            Channel(
+                {
+                    "title": title,
+                    "tvg-name": "",
+                    "tvg-ID": "",
+                    "tvg-logo": "",
+                    "tvg-group": group,
+                    "tvg-url": "",
+                    "catchup": "default",
+                    "catchup-source": "",
+                    "catchup-days": "1",
+                    "useragent": "",
+                    "referer": "",
+                    "url": location,
+                }
+            )
         )
     return [array, []]